@@ -20,7 +20,7 @@ def custom_exception_handler(exc, context):
     start_time = getattr(request, "_start_time", timezone.now())
 
     if response is not None:
-        log_level = 'error' if response.status_code >= 500 else 'warning'
+        log_level = 'error' if response.status_code >= 500 else 'warn'
 
         if isinstance(exc, ProjectServiceException):
             log_details = f"{exc.message} | {exc.details}" if hasattr(exc, "details") and exc.details else str(exc)
@@ -49,6 +49,10 @@ INSTALLED_APPS = [
 
 # ========== Middleware ==========
 MIDDLEWARE = [
+    # first, so recorded latency covers the whole middleware stack
+    'tracker.middleware.TimingMiddleware',
+    'tracker.middleware.QueryInspectorMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -57,8 +61,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-
-    'tracker.middleware.TimingMiddleware'
 ]
 
 ROOT_URLCONF = 'bugtracker.urls'
@@ -94,21 +96,48 @@ DATABASES = {
         'OPTIONS': {
             'options': '-c search_path={}'.format(os.getenv('DB_SCHEMA'))
         },
+        # the async views' query threads keep their connection this long, 0 closes it after every query
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
 # ========== Redis Channel Layer ==========
+# project groups are consistently hashed across every host in CHANNEL_REDIS_HOSTS (comma separated urls)
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': 'bugtracker.utils.channel_layers.ShardedRedisChannelLayer',
         'CONFIG': {
-            "hosts": [('127.0.0.1', 6379)],
+            'hosts': [
+                host.strip() for host in os.getenv('CHANNEL_REDIS_HOSTS', 'redis://127.0.0.1:6379').split(',')
+                if host.strip()
+            ],
+            'replicas': int(os.getenv('CHANNEL_REDIS_RING_REPLICAS', 160)),
+            'pool': {
+                'max_connections': int(os.getenv('CHANNEL_REDIS_MAX_CONNECTIONS', 100)),
+                # seconds to wait for a free pooled connection
+                'timeout': int(os.getenv('CHANNEL_REDIS_POOL_TIMEOUT', 20)),
+                'health_check_interval': int(os.getenv('CHANNEL_REDIS_HEALTH_CHECK_INTERVAL', 30)),
+            },
         },
     },
 }
 
 
+# ========== Cache ==========
+# shared by every worker when CACHE_REDIS_URL is set (e.g. project access versions), per process otherwise
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_REDIS_URL,
+    } if CACHE_REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+
 # ========== REST Framework ==========
 REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'bugtracker.exceptions.exception_handler.custom_exception_handler',
@@ -119,6 +148,15 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'bugtracker.utils.pagination.SetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'bugtracker.utils.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'bugtracker.utils.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     # usage ?
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -128,6 +166,20 @@ REST_FRAMEWORK = {
 }
 
 
+# ========== JSON ==========
+# 'orjson' when installed, 'json' forces the standard library
+FAST_JSON = {
+    'BACKEND': os.getenv('JSON_BACKEND', 'orjson'),
+}
+
+
+# ========== Fast List Serializers ==========
+# list endpoints render values_list rows without model instances, same output
+FAST_SERIALIZERS = {
+    'ENABLED': os.getenv('FAST_SERIALIZERS_ENABLED', 'false').lower() == 'true',
+}
+
+
 # ========== JWT Settings ==========
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(get_env_var('ACCESS_TOKEN_LIFETIME_IN_MIN'))),
@@ -176,3 +228,122 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ========== Custom ENV ==========
 DEFAULT_PAGE_NUMBER = os.getenv("DEFAULT_PAGE_NUMBER")
 MAX_PAGE_NUMBER = os.getenv("MAX_PAGE_NUMBER")
+
+
+# ========== Api Log Buffer ==========
+API_LOG_BUFFER = {
+    'ENABLED': os.getenv('API_LOG_BUFFER_ENABLED', 'true').lower() == 'true',
+    'MAX_SIZE': int(os.getenv('API_LOG_BUFFER_MAX_SIZE', 10000)),
+    'BATCH_SIZE': int(os.getenv('API_LOG_BUFFER_BATCH_SIZE', 200)),
+    'FLUSH_INTERVAL': float(os.getenv('API_LOG_BUFFER_FLUSH_INTERVAL', 1.0)),
+    # drop_oldest | drop_newest | block
+    'OVERFLOW_POLICY': os.getenv('API_LOG_BUFFER_OVERFLOW_POLICY', 'drop_oldest'),
+}
+
+
+# ========== Project Access Cache ==========
+PROJECT_ACCESS_CACHE = {
+    'TTL': int(os.getenv('PROJECT_ACCESS_CACHE_TTL', 60)),
+    'MAX_USERS': int(os.getenv('PROJECT_ACCESS_CACHE_MAX_USERS', 10000)),
+    # CACHES alias holding each user's access version, revoking access reaches every worker through it
+    'CACHE_ALIAS': os.getenv('PROJECT_ACCESS_CACHE_ALIAS', 'default'),
+}
+
+
+# ========== Dashboard Stats Cache ==========
+DASHBOARD_STATS_CACHE = {
+    'TTL': int(os.getenv('DASHBOARD_STATS_CACHE_TTL', 30)),
+    'MAX_USERS': int(os.getenv('DASHBOARD_STATS_CACHE_MAX_USERS', 10000)),
+}
+
+
+# ========== Response Cache ==========
+# cached GET responses of the read endpoints, invalidated by project/user tags.
+# 'local' is per process, so only use it with a single worker; 'redis' is shared by every node
+RESPONSE_CACHE = {
+    'ENABLED': os.getenv('RESPONSE_CACHE_ENABLED', 'false').lower() == 'true',
+    'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'local'),
+    'TTL': int(os.getenv('RESPONSE_CACHE_TTL', 60)),
+    'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 5000)),
+    'REDIS_URL': os.getenv('RESPONSE_CACHE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+}
+
+
+# ========== Search ==========
+# 'auto' picks the PostgreSQL full text backend on postgres and the in-process index elsewhere
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+# in-process index: only the best scoring matches are handed to the query
+SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 1000))
+
+
+# ========== Query Inspector ==========
+QUERY_INSPECTOR = {
+    # off unless asked for, it wraps every query of a sampled request
+    'ENABLED': os.getenv('QUERY_INSPECTOR_ENABLED', 'false').lower() == 'true',
+    # fraction of requests instrumented
+    'SAMPLE_RATE': float(os.getenv('QUERY_INSPECTOR_SAMPLE_RATE', 1.0 if DEBUG else 0.05)),
+    # executions of one query shape within a request that count as N+1
+    'REPEAT_THRESHOLD': int(os.getenv('QUERY_INSPECTOR_REPEAT_THRESHOLD', 5)),
+    'HEADERS': DEBUG,
+}
+
+
+# ========== Notification Outbox ==========
+NOTIFICATION_OUTBOX = {
+    'BATCH_SIZE': int(os.getenv('NOTIFICATION_OUTBOX_BATCH_SIZE', 500)),
+    'POLL_INTERVAL': float(os.getenv('NOTIFICATION_OUTBOX_POLL_INTERVAL', 0.2)),
+    'MAX_ATTEMPTS': int(os.getenv('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)),
+    'MAX_BACKOFF_SECONDS': 60,
+    'RETENTION_HOURS': int(os.getenv('NOTIFICATION_OUTBOX_RETENTION_HOURS', 24)),
+    # most missed project events replayed on reconnect, a larger gap asks the client to resync
+    'REPLAY_LIMIT': int(os.getenv('NOTIFICATION_OUTBOX_REPLAY_LIMIT', 500)),
+}
+
+
+# ========== Bulk Bug Operations ==========
+BUG_BULK = {
+    'MAX_ITEMS': int(os.getenv('BUG_BULK_MAX_ITEMS', 500)),
+}
+
+
+# ========== Async Views ==========
+ASYNC_VIEWS = {
+    # independent queries of one async request run at the same time, each on its own thread and connection
+    'CONCURRENT_QUERIES': os.getenv('ASYNC_CONCURRENT_QUERIES', 'true').lower() == 'true',
+    # size this to the database connections a worker may hold
+    'QUERY_THREADS': int(os.getenv('ASYNC_QUERY_THREADS', 32)),
+    # seconds a query thread keeps its connection, instead of DB_CONN_MAX_AGE; 0 reconnects for every query
+    'CONNECTION_MAX_AGE': int(os.getenv('ASYNC_QUERY_CONN_MAX_AGE', 300)),
+}
+
+
+# ========== Project Members ==========
+PROJECT_MEMBERS = {
+    'BULK_MAX_ITEMS': int(os.getenv('MEMBER_BULK_MAX_ITEMS', 5000)),
+}
+
+
+# ========== Export / Import ==========
+DATA_TRANSFER = {
+    'EXPORT_CHUNK_SIZE': int(os.getenv('EXPORT_CHUNK_SIZE', 2000)),
+    'IMPORT_BATCH_SIZE': int(os.getenv('IMPORT_BATCH_SIZE', 500)),
+}
+
+
+# ========== Delta Sync ==========
+SYNC = {
+    'MAX_CHANGES': int(os.getenv('SYNC_MAX_CHANGES', 500)),
+    # older cursors are told to resync once their tombstones are purged
+    'TOMBSTONE_RETENTION_DAYS': int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', 30)),
+}
+
+
+# ========== Typing Indicator ==========
+TYPING_INDICATOR = {
+    # forwarded frames per second per connection, with burst capacity
+    'RATE': float(os.getenv('TYPING_INDICATOR_RATE', 2.0)),
+    'BURST': int(os.getenv('TYPING_INDICATOR_BURST', 5)),
+    'DEBOUNCE_SECONDS': float(os.getenv('TYPING_INDICATOR_DEBOUNCE_SECONDS', 0.5)),
+    # a repeated state is forwarded again after this long, as a keepalive
+    'KEEPALIVE_SECONDS': float(os.getenv('TYPING_INDICATOR_KEEPALIVE_SECONDS', 3.0)),
+}
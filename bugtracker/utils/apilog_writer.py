@@ -0,0 +1,184 @@
+import atexit
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from bugtracker.utils.logger import get_logger
+from tracker.models import ApiLog
+
+logger = get_logger(__name__)
+
+
+class ApiLogWriter:
+    """
+    buffers ApiLog records in memory and writes them with bulk_create
+    from a background thread, flushing on batch size or flush interval
+    """
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    BLOCK = 'block'
+    OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+    def __init__(self, max_size=10000, batch_size=200, flush_interval=1.0,
+                 overflow_policy=DROP_OLDEST, block_timeout=0.05):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown overflow policy: {overflow_policy}')
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._worker = None
+
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, record: ApiLog) -> bool:
+        """
+        enqueue a record for the next batch
+        :param record: unsaved ApiLog instance
+        :return: bool: False if the record was dropped
+        """
+        self._ensure_worker()
+
+        try:
+            if self.overflow_policy == self.BLOCK:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy != self.DROP_OLDEST:
+                self._count('dropped')
+                return False
+
+            try:
+                self._queue.get_nowait()
+                self._count('dropped')
+            except queue.Empty:
+                pass
+
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._count('dropped')
+                return False
+
+        self._count('enqueued')
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        write everything currently buffered
+        :return: int: number of records written
+        """
+        written = 0
+        while True:
+            count = self._flush_batch()
+            if not count:
+                return written
+            written += count
+
+    def shutdown(self, timeout=5.0):
+        """
+        stop the worker and flush the remaining records
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join(timeout)
+        self.flush()
+
+    def stats(self) -> dict:
+        return {
+            'enqueued': self.enqueued,
+            'flushed': self.flushed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'pending': self._queue.qsize(),
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name='apilog-writer', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _flush_batch(self) -> int:
+        # drain under the write lock so flush() never returns while a batch is in flight
+        with self._write_lock:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not batch:
+                return 0
+
+            try:
+                ApiLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            except Exception as err:
+                logger.error(f'Failed to write {len(batch)} api log(s) | {err}')
+                self._count('failed', len(batch))
+                return 0
+            finally:
+                close_old_connections()
+
+        self._count('flushed', len(batch))
+        return len(batch)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'API_LOG_BUFFER', {}).get('ENABLED', False)
+
+
+def get_writer() -> ApiLogWriter:
+    """
+    process wide writer, created lazily so forked workers start their own thread
+    """
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = getattr(settings, 'API_LOG_BUFFER', {})
+                _writer = ApiLogWriter(
+                    max_size=config.get('MAX_SIZE', 10000),
+                    batch_size=config.get('BATCH_SIZE', 200),
+                    flush_interval=config.get('FLUSH_INTERVAL', 1.0),
+                    overflow_policy=config.get('OVERFLOW_POLICY', ApiLogWriter.DROP_OLDEST),
+                )
+                atexit.register(_writer.shutdown)
+    return _writer
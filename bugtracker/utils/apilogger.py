@@ -1,4 +1,8 @@
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
 from tracker.models import ApiLog
+from bugtracker.utils import apilog_writer, query_inspector
 
 
 def _log(level, api_name, message, details=None, user=None, total_time=None):
@@ -8,15 +12,48 @@ def _log(level, api_name, message, details=None, user=None, total_time=None):
         except Exception:
             details = "Unserializable details"
 
-    ApiLog.objects.create(
+    record = ApiLog(
         api_name=api_name,
         level=level,
         message=message,
         details=details or "",
-        user=user,
-        total_time=total_time
+        user_id=getattr(user, 'pk', None),
+        total_time=total_time,
+        # taken now rather than at flush, the writer may hold the record for a while
+        created_at=timezone.now(),
     )
 
+    inspector = query_inspector.current()
+    if inspector is not None:
+        record.query_count = inspector.count
+        record.db_time = inspector.db_time
+        record.repeated_query_count = len(inspector.repeated())
+
+    if not apilog_writer.is_enabled():
+        record.save()
+        return
+
+    apilog_writer.get_writer().submit(record)
+
+async def _alog(level, api_name, message, details=None, user=None, total_time=None):
+    """
+    _log for async views, unbuffered records are saved off the event loop
+    """
+    if apilog_writer.is_enabled():
+        _log(level, api_name, message, details, user, total_time)
+    else:
+        await sync_to_async(_log)(level, api_name, message, details, user, total_time)
+
+def flush():
+    """
+    write any buffered logs immediately
+    """
+    if apilog_writer.is_enabled():
+        apilog_writer.get_writer().flush()
+
+def stats():
+    return apilog_writer.get_writer().stats()
+
 def info(api_name, message, details=None, user=None, total_time=None):
     _log(ApiLog.LevelChoice.INFO, api_name, message, details, user, total_time)
 
@@ -28,3 +65,12 @@ def error(api_name, message, details=None, user=None, total_time=None):
 
 def fatal(api_name, message, details=None, user=None, total_time=None):
     _log(ApiLog.LevelChoice.FATAL, api_name, message, details, user, total_time)
+
+async def ainfo(api_name, message, details=None, user=None, total_time=None):
+    await _alog(ApiLog.LevelChoice.INFO, api_name, message, details, user, total_time)
+
+async def awarn(api_name, message, details=None, user=None, total_time=None):
+    await _alog(ApiLog.LevelChoice.WARN, api_name, message, details, user, total_time)
+
+async def aerror(api_name, message, details=None, user=None, total_time=None):
+    await _alog(ApiLog.LevelChoice.ERROR, api_name, message, details, user, total_time)
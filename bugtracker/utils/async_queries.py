@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+
+_executor = None
+# per query thread: alias -> the connection it opened, to tell a new one from a kept one
+_thread_state = threading.local()
+
+
+def _get_config() -> dict:
+    return getattr(settings, 'ASYNC_VIEWS', {})
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_get_config().get('QUERY_THREADS', 32), thread_name_prefix='async-query'
+        )
+    return _executor
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    global _executor
+    if setting == 'ASYNC_VIEWS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _release_connections() -> None:
+    """
+    these threads outlive the request, its request_finished does not close their connections.
+    each thread keeps its connection for the next query instead of reconnecting every time
+    (what CONN_MAX_AGE=0 would do); it is closed once broken, left in a transaction or older
+    than CONNECTION_MAX_AGE
+    """
+    max_age = _get_config().get('CONNECTION_MAX_AGE', 300)
+    opened = _thread_state.__dict__.setdefault('opened', {})
+
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None and opened.get(conn.alias) is not conn.connection:
+            opened[conn.alias] = conn.connection
+            conn.close_at = None if max_age is None else time.monotonic() + max_age
+        # also schedules a CONN_HEALTH_CHECKS check before the next query
+        conn.close_if_unusable_or_obsolete()
+
+
+def _run_detached(query):
+    try:
+        return query()
+    finally:
+        _release_connections()
+
+
+async def run_query(query, *args):
+    """
+    call sync orm code from an async view, on the request's own thread like the async orm does
+    """
+    return await sync_to_async(query, thread_sensitive=True)(*args)
+
+
+async def gather_queries(*queries) -> list:
+    """
+    run independent sync orm callables at the same time, each on its own pooled thread and
+    connection. with ASYNC_VIEWS['CONCURRENT_QUERIES'] off they run one after another instead
+    :return: list: their results, in order
+    """
+    if not _get_config().get('CONCURRENT_QUERIES', True) or len(queries) < 2:
+        return [await run_query(query) for query in queries]
+
+    return list(await asyncio.gather(*(
+        sync_to_async(_run_detached, thread_sensitive=False, executor=_get_executor())(query)
+        for query in queries
+    )))
@@ -0,0 +1,125 @@
+from django.core.paginator import InvalidPage, Page
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from bugtracker.utils.async_queries import gather_queries, run_query
+from bugtracker.utils.fast_json import FastJSONRenderer
+
+
+async def paginate_page_number(pagination, queryset, request) -> list | None:
+    """
+    async PageNumberPagination.paginate_queryset: the count and the page rows are fetched together,
+    the pagination object is left ready for get_paginated_response
+    :return: list: the page, None when the request is not paginated
+    """
+    page_size = pagination.get_page_size(request)
+    if not page_size:
+        return None
+
+    paginator = pagination.django_paginator_class(queryset, page_size)
+    # not get_page_number, it resolves 'last' with a sync count
+    page_number = request.query_params.get(pagination.page_query_param) or 1
+
+    rows = None
+    if page_number in pagination.last_page_strings:
+        count = await run_query(queryset.count)
+    elif str(page_number).isdigit() and int(page_number) > 0:
+        # the page most likely exists, validated against the count below
+        offset = (int(page_number) - 1) * page_size
+        count, rows = await gather_queries(queryset.count, lambda: list(queryset[offset:offset + page_size]))
+    else:
+        count = 0
+
+    # Paginator caches count, set it so nothing below queries again
+    paginator.count = count
+    if page_number in pagination.last_page_strings:
+        page_number = paginator.num_pages
+
+    try:
+        number = paginator.validate_number(page_number)
+    except InvalidPage as exc:
+        raise exceptions.NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+    if rows is None:
+        offset = (number - 1) * page_size
+        rows = await run_query(lambda: list(queryset[offset:offset + page_size]))
+
+    pagination.page = Page(rows, number, paginator)
+    pagination.request = request
+    return rows
+
+
+class AsyncAPIView(View):
+    """
+    read-only endpoint handled on the event loop. authenticates with DRF's authentication
+    classes, answers errors through DRF's exception handler and renders FastJSONRenderer json,
+    so clients cannot tell it from an APIView. handlers get a DRF Request and return data
+    or an HttpResponse; orm work goes through run_query / gather_queries
+    """
+    api_name = None
+    http_method_names = ['get', 'head', 'options']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        self.request = request
+        self.headers = {}
+
+        try:
+            request.user, request.auth = await self.authenticate(request)
+
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+
+            result = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            return await self.handle_exception(exc)
+
+        return result if isinstance(result, HttpResponse) else self.render(result)
+
+    async def authenticate(self, request) -> tuple:
+        """
+        :return: tuple: (user, auth) of the first authenticator accepting the request
+        """
+        for authenticator in self.get_authenticators():
+            # simplejwt loads the user with the sync orm
+            result = await run_query(authenticator.authenticate, request)
+            if result is not None:
+                request._authenticator = authenticator
+                return result
+        raise exceptions.NotAuthenticated()
+
+    def get_authenticators(self) -> list:
+        return [authenticator() for authenticator in self.authentication_classes]
+
+    def render(self, data, status=200) -> HttpResponse:
+        renderer = FastJSONRenderer()
+        return HttpResponse(renderer.render(data), status=status, headers=self.headers, content_type=renderer.media_type)
+
+    async def handle_exception(self, exc) -> HttpResponse:
+        """
+        same status codes, headers and body as APIView.handle_exception
+        """
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.get_authenticators()
+            auth_header = authenticators[0].authenticate_header(self.request) if authenticators else None
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+
+        exception_handler = api_settings.EXCEPTION_HANDLER
+        context = {'view': self, 'args': self.args, 'kwargs': self.kwargs, 'request': self.request}
+        # the handler writes an ApiLog row
+        response = await run_query(exception_handler, exc, context)
+        if response is None:
+            raise exc
+
+        for header in ('WWW-Authenticate', 'Retry-After'):
+            if header in response:
+                self.headers[header] = response[header]
+        return self.render(response.data, status=response.status_code)
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import time
+from bisect import bisect
+
+from channels_redis.core import RedisChannelLayer
+from channels_redis.utils import create_pool
+from redis import asyncio as aioredis
+
+from bugtracker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# lookups remembered per ring, project groups and per process channel names repeat on every send
+_CACHE_SIZE = 65536
+
+# channels_redis' group send script with the expired message cleanup folded in, so a shard costs one round trip
+_GROUP_SEND_LUA = """
+    local over_capacity = 0
+    local current_time = ARGV[#ARGV - 1]
+    local expiry = ARGV[#ARGV]
+    local expired = tonumber(current_time) - tonumber(expiry)
+    for i=1,#KEYS do
+        redis.call('ZREMRANGEBYSCORE', KEYS[i], 0, expired)
+        if redis.call('ZCOUNT', KEYS[i], '-inf', '+inf') < tonumber(ARGV[i + #KEYS]) then
+            redis.call('ZADD', KEYS[i], current_time, ARGV[i])
+            redis.call('EXPIRE', KEYS[i], expiry)
+        else
+            over_capacity = over_capacity + 1
+        end
+    end
+    return over_capacity
+"""
+
+
+def _point(value) -> int:
+    if isinstance(value, str):
+        value = value.encode('utf8')
+    return int.from_bytes(hashlib.md5(value, usedforsecurity=False).digest()[:8], 'big')
+
+
+def shard_name(host: dict) -> str:
+    """
+    identity of a decoded channels_redis host on the ring, independent of its position in the list
+    """
+    if 'address' in host:
+        return str(host['address'])
+    if 'master_name' in host:
+        return str(host['master_name'])
+    return f"{host.get('host', 'localhost')}:{host.get('port', 6379)}"
+
+
+class HashRing:
+    """
+    consistent hash ring with replicas virtual points per node; adding or removing a node
+    only moves the keys between it and its neighbours, about 1/n of them
+    :param nodes: node names, get_node returns an index into this list
+    """
+
+    def __init__(self, nodes: list, replicas: int = 160):
+        points = sorted(
+            (_point(f'{node}-{replica}'), index)
+            for index, node in enumerate(nodes) for replica in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._indexes = [index for _, index in points]
+        self._cache = {}
+
+    def get_node(self, key) -> int:
+        index = self._cache.get(key)
+        if index is None:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            position = bisect(self._points, _point(key)) % len(self._points)
+            index = self._cache[key] = self._indexes[position]
+        return index
+
+
+class ShardedRedisChannelLayer(RedisChannelLayer):
+    """
+    RedisChannelLayer placing groups and channels on its hosts with a HashRing instead of
+    crc32 modulo the host count, so adding a shard keeps most project groups where they are.
+    every host gets a blocking connection pool per event loop, bounded by pool['max_connections'].
+    group_send costs one round trip on the group's shard plus one per shard holding members, sent concurrently
+    :param replicas: virtual points per host on the ring
+    :param pool: connection pool kwargs applied to every host, the host's own kwargs win
+    """
+
+    def __init__(self, hosts=None, replicas=160, pool=None, **kwargs):
+        super().__init__(hosts=hosts, **kwargs)
+        self.pool_kwargs = pool or {}
+        self.ring = HashRing([shard_name(host) for host in self.hosts], replicas)
+
+    def consistent_hash(self, value) -> int:
+        if self.ring_size == 1:
+            return 0
+        return self.ring.get_node(value)
+
+    def create_pool(self, index):
+        host = {**self.pool_kwargs, **self.hosts[index]}
+        if 'master_name' in host or 'max_connections' not in host:
+            return create_pool(host)
+
+        # waits for a free connection instead of failing once max_connections are in use
+        address = host.pop('address', None)
+        if address is not None:
+            return aioredis.BlockingConnectionPool.from_url(address, **host)
+        return aioredis.BlockingConnectionPool(**host)
+
+    async def group_send(self, group, message):
+        assert self.valid_group_name(group), 'Group name not valid'
+        key = self._group_key(group)
+        now = time.time()
+
+        pipe = self.connection(self.consistent_hash(group)).pipeline(transaction=False)
+        pipe.zremrangebyscore(key, min=0, max=int(now) - self.group_expiry)
+        pipe.zrange(key, 0, -1)
+        _, members = await pipe.execute()
+        if not members:
+            return
+
+        channel_names = [member.decode('utf8') for member in members]
+        connection_to_channel_keys, channel_keys_to_message, channel_keys_to_capacity = (
+            self._map_channel_keys_to_connection(channel_names, message)
+        )
+
+        async def send_to_shard(index, channel_keys):
+            args = [channel_keys_to_message[channel_key] for channel_key in channel_keys]
+            args += [channel_keys_to_capacity[channel_key] for channel_key in channel_keys]
+            over_capacity = await self.connection(index).eval(
+                _GROUP_SEND_LUA, len(channel_keys), *channel_keys, *args, now, int(self.expiry)
+            )
+            if over_capacity > 0:
+                logger.info(f'{over_capacity} of {len(channel_names)} channels over capacity in group {group}')
+
+        await asyncio.gather(*(
+            send_to_shard(index, channel_keys) for index, channel_keys in connection_to_channel_keys.items()
+        ))
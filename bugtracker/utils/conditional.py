@@ -0,0 +1,120 @@
+import hashlib
+
+from django.db.models import Count, F, Max, Model, QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import ParseError
+
+
+def get_expected_version(request) -> int | None:
+    """
+    version the client last read, sent as If-Match: "<version>"
+    :return: int, None when the header is missing or *
+    """
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+
+    tag = header.split(',')[0].strip().removeprefix('W/').strip('"')
+    if not tag.isdigit():
+        raise ParseError('If-Match must carry the version of the resource, e.g. If-Match: "3"')
+    return int(tag)
+
+
+def claim_version(instance: Model, expected_version: int = None) -> bool:
+    """
+    compare-and-set the row's version column, in the caller's transaction. the UPDATE keeps
+    the row locked until commit, so nothing can land between this check and the caller's save
+    :param instance: loaded instance, its version is advanced on success
+    :param expected_version: version the client read, defaults to the one loaded
+    :return: False when the row has moved on since that version
+    """
+    if expected_version is None:
+        expected_version = instance.version
+    elif expected_version != instance.version:
+        return False
+
+    claimed = type(instance)._default_manager.filter(
+        pk=instance.pk, version=expected_version
+    ).update(version=F('version') + 1)
+    if claimed:
+        instance.version = expected_version + 1
+    return bool(claimed)
+
+
+class ConditionalGetMixin:
+    """
+    viewset mixin answering list/retrieve with 304 while If-None-Match / If-Modified-Since
+    still match, before the page is fetched or serialized. the validators come from one
+    aggregate over the same queryset: newest updated_at and row count, plus the newest
+    updated_at of each relation in conditional_related that the representation embeds.
+    lists get no Last-Modified: deleted rows and lost access never advance the newest
+    updated_at, only the etag (which includes the count) notices them
+    """
+    last_modified_field = 'updated_at'
+    conditional_related = ()
+
+    def get_conditional_queryset(self, detail: bool) -> QuerySet:
+        queryset = self.filter_queryset(self.get_queryset())
+        if detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_validators(self, detail: bool) -> tuple | None:
+        """
+        :return: tuple: (strong etag, last modified timestamp or None for lists), None for a missing object
+        """
+        aggregates = {
+            'last_modified': Max(self.last_modified_field),
+            'count': Count('pk'),
+        }
+        for relation in self.conditional_related:
+            aggregates[relation] = Max(f'{relation}__{self.last_modified_field}')
+        fingerprint = self.get_conditional_queryset(detail).order_by().aggregate(**aggregates)
+
+        if detail and not fingerprint['count']:
+            return None
+
+        # the same rows render differently per url (page, filters) and per renderer
+        key = '|'.join([
+            str(self.request.user.pk),
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            *(str(fingerprint[name]) for name in sorted(fingerprint)),
+        ])
+        etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+        if not detail:
+            return etag, None
+
+        last_modified = max(
+            (value for name, value in fingerprint.items() if name != 'count' and value), default=None
+        )
+        # Last-Modified has whole seconds, compare If-Modified-Since at that precision
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def check_not_modified(self, request, detail: bool):
+        """
+        :return: 304 response when the client's copy is current, otherwise None
+        """
+        self._validators = self.get_validators(detail)
+        if self._validators is None:
+            return None
+
+        etag, last_modified = self._validators
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        validators = getattr(self, '_validators', None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.check_not_modified(request, detail=False) or super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.check_not_modified(request, detail=True) or super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,73 @@
+import json
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# datetimes go through DRF's encoder too, so both backends produce the same text
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+# types DRF knows and orjson does not (Decimal, lazy strings, querysets, ...)
+_default = JSONEncoder().default
+
+
+def use_orjson() -> bool:
+    """
+    FAST_JSON['BACKEND'] is 'orjson' (falls back to json when it is not installed) or 'json'
+    """
+    return orjson is not None and getattr(settings, 'FAST_JSON', {}).get('BACKEND', 'orjson') == 'orjson'
+
+
+def dumps(data) -> bytes:
+    """
+    compact utf-8 json
+    """
+    if use_orjson():
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def dumps_str(data) -> str:
+    return dumps(data).decode()
+
+
+def loads(data):
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer output through orjson; indented (browsable or ?indent) responses keep the stdlib path
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not use_orjson() or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        # same escaping as JSONRenderer, these are valid json but break javascript string literals
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if not use_orjson() or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read() if stream is not None else b'')
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
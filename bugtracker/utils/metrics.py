@@ -0,0 +1,133 @@
+import bisect
+import threading
+
+# upper bounds in seconds, the last bucket is +Inf
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class LatencyHistogram:
+    """
+    fixed-bucket histogram, constant memory regardless of request volume
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        estimate by linear interpolation inside the bucket holding the rank
+        :param fraction: 0 < fraction <= 1
+        :return: float: seconds, the largest finite bound when the rank falls in +Inf
+        """
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def cumulative_counts(self) -> list:
+        total = 0
+        cumulative = []
+        for bucket_count in self.counts:
+            total += bucket_count
+            cumulative.append(total)
+        return cumulative
+
+
+class LatencyRegistry:
+    """
+    histograms keyed by (route, method, status class)
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status_code: int, seconds: float) -> None:
+        key = (route, method, f'{status_code // 100}xx')
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [
+                {
+                    'route': route,
+                    'method': method,
+                    'status': status_class,
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'p50': histogram.percentile(0.5),
+                    'p95': histogram.percentile(0.95),
+                    'p99': histogram.percentile(0.99),
+                    'buckets': dict(zip([*map(str, self.buckets), '+Inf'], histogram.cumulative_counts())),
+                }
+                for (route, method, status_class), histogram in sorted(self._histograms.items())
+            ]
+
+    def render_prometheus(self, name='http_request_duration_seconds') -> str:
+        lines = [
+            f'# HELP {name} Request latency by route, method and status class.',
+            f'# TYPE {name} histogram',
+        ]
+        quantile_lines = [
+            f'# HELP {name}_quantile Estimated latency quantiles from the histogram buckets.',
+            f'# TYPE {name}_quantile gauge',
+        ]
+
+        for entry in self.snapshot():
+            labels = f'route="{_escape(entry["route"])}",method="{entry["method"]}",status="{entry["status"]}"'
+            for bound, cumulative in entry['buckets'].items():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {entry["sum"]:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {entry["count"]}')
+            for quantile in self.QUANTILES:
+                value = entry[f'p{int(quantile * 100)}']
+                quantile_lines.append(f'{name}_quantile{{{labels},quantile="{quantile}"}} {value:.6f}')
+
+        return '\n'.join(lines + quantile_lines) + '\n'
+
+
+def render_prometheus_values(name: str, help_text: str, metric_type: str, values: dict) -> str:
+    """
+    flat counters/gauges as one labelled metric family
+    :param values: label value -> number, label is `key`
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}']
+    lines += [f'{name}{{key="{_escape(key)}"}} {value}' for key, value in values.items()]
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_latency = LatencyRegistry()
@@ -1,8 +1,117 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from django.conf import settings
 
 class SetPagination(PageNumberPagination):
-    page_size = settings.DEFAULT_PAGE_NUMBER
+    page_size = int(settings.DEFAULT_PAGE_NUMBER) if settings.DEFAULT_PAGE_NUMBER else None
+    page_size_query_param = 'page_size'
+    max_page_size = int(settings.MAX_PAGE_NUMBER) if settings.MAX_PAGE_NUMBER else None
+
+class KeysetPagination(BasePagination):
+    """
+    newest-first keyset pagination on (ordering_field, id).
+    pages are fetched with a range predicate instead of COUNT + OFFSET,
+    so cost does not grow with table size or page depth
+    """
+    page_size = SetPagination.page_size or 10
     page_size_query_param = 'page_size'
-    max_page_size = settings.MAX_PAGE_NUMBER
\ No newline at end of file
+    max_page_size = SetPagination.max_page_size
+    cursor_query_param = 'cursor'
+    ordering_field = 'created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+
+        position = self.decode_cursor(request, queryset.model)
+        field = self.ordering_field
+
+        if position is None:
+            reverse = False
+            queryset = queryset.order_by(f'-{field}', '-id')
+        else:
+            value, pk, reverse = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk})
+                ).order_by(field, 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk})
+                ).order_by(f'-{field}', '-id')
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size) if self.max_page_size else size
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        value = getattr(row, self.ordering_field)
+        payload = json.dumps({
+            'v': value.isoformat() if hasattr(value, 'isoformat') else value,
+            'id': row.pk,
+            'r': int(reverse),
+        }, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        """
+        :return: (ordering value, id, reverse) or None for the first page
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            value = model._meta.get_field(self.ordering_field).to_python(payload['v'])
+            return value, int(payload['id']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,85 @@
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+_current = ContextVar('query_inspector', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_shape(sql: str) -> str:
+    """
+    sql with literals and parameters replaced, so the same query for different rows compares equal
+    """
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _IN_LIST.sub('IN (...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryInspector:
+    """
+    database execute wrapper counting queries, db time and repeated query shapes.
+    an async request's queries may run on several threads at once
+    """
+
+    def __init__(self, repeat_threshold=5):
+        self.repeat_threshold = repeat_threshold
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            shape = query_shape(sql)
+            with self._lock:
+                self.db_time += elapsed
+                self.count += 1
+                self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self) -> dict:
+        """
+        :return: dict: shape -> executions, for shapes at or above the threshold (likely N+1)
+        """
+        return {shape: total for shape, total in self.shapes.items() if total >= self.repeat_threshold}
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token) -> None:
+        _current.reset(token)
+
+
+def current() -> QueryInspector | None:
+    """
+    inspector of the request being handled, None when the request is not sampled
+    """
+    return _current.get()
+
+
+def _inspect(execute, sql, params, many, context):
+    inspector = _current.get()
+    if inspector is None:
+        return execute(sql, params, many, context)
+    return inspector(execute, sql, params, many, context)
+
+
+def install(sender, connection, **kwargs) -> None:
+    """
+    connection_created receiver: every connection reports to the inspector of the request
+    it runs for, sync_to_async carries that context to whichever thread executes the query
+    """
+    if _inspect not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_inspect)
@@ -0,0 +1,24 @@
+import time
+
+
+class TokenBucket:
+    """
+    refills `rate` tokens per second up to `capacity`; not thread safe, meant
+    to be owned by a single connection or event loop task
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, tokens: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
@@ -0,0 +1,279 @@
+import hashlib
+import threading
+
+import msgpack
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from django.utils.module_loading import import_string
+
+from bugtracker.utils.logger import get_logger
+from bugtracker.utils.lru_cache import TTLLRUCache
+
+logger = get_logger(__name__)
+
+# response headers kept with a cached body
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def encode_entry(entry) -> bytes:
+    """
+    entries shared through redis are plain data, never pickles: whoever can write to the
+    redis must not be able to run code in the workers reading it
+    """
+    return msgpack.packb(entry, use_bin_type=True)
+
+
+def decode_entry(raw) -> dict | None:
+    """
+    :return: dict: the entry, None when raw is not one encode_entry wrote
+    """
+    try:
+        entry = msgpack.unpackb(raw, raw=False)
+    except Exception:
+        return None
+
+    valid = (
+        isinstance(entry, dict)
+        and isinstance(entry.get('tags'), dict)
+        and isinstance(entry.get('status'), int)
+        and isinstance(entry.get('content_type'), str)
+        and isinstance(entry.get('content'), bytes)
+        and isinstance(entry.get('headers'), dict)
+        and all(isinstance(value, int) for value in entry['tags'].values())
+        and all(name in CACHED_HEADERS and isinstance(value, str) for name, value in entry['headers'].items())
+    )
+    return entry if valid else None
+
+
+class BaseResponseCacheBackend:
+    """
+    cached entries remember the version of every tag they were built under;
+    bumping a tag's version makes those entries stale without finding them
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, entry) -> None:
+        raise NotImplementedError
+
+    def get_tag_versions(self, tags) -> dict:
+        raise NotImplementedError
+
+    def bump_tags(self, tags) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LocalResponseCacheBackend(BaseResponseCacheBackend):
+    """
+    in-process LRU, for a single node
+    """
+
+    def __init__(self, max_entries=5000, ttl=60):
+        self.entries = TTLLRUCache(max_size=max_entries, ttl=ttl)
+        self.tag_versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries.set(key, entry)
+
+    def get_tag_versions(self, tags):
+        with self._lock:
+            return {tag: self.tag_versions.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+
+    def stats(self):
+        return self.entries.stats()
+
+
+class RedisResponseCacheBackend(BaseResponseCacheBackend):
+    """
+    shared by every node; redis evicts entries by its own maxmemory policy (allkeys-lru)
+    and the TTL. a redis error is a cache miss, never a failed request
+    """
+    prefix = 'response-cache'
+
+    def __init__(self, url='redis://127.0.0.1:6379/1', ttl=60):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key):
+        try:
+            raw = self.client.get(f'{self.prefix}:entry:{key}')
+        except Exception as err:
+            self._error('get', err)
+            return None
+
+        entry = decode_entry(raw) if raw is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, key, entry):
+        try:
+            self.client.set(f'{self.prefix}:entry:{key}', encode_entry(entry), ex=self.ttl)
+        except Exception as err:
+            self._error('set', err)
+
+    def get_tag_versions(self, tags):
+        tags = list(tags)
+        if not tags:
+            return {}
+        try:
+            values = self.client.mget([f'{self.prefix}:tag:{tag}' for tag in tags])
+        except Exception as err:
+            self._error('get_tag_versions', err)
+            # unknowable versions, nothing built now may be reused
+            return None
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def bump_tags(self, tags):
+        tags = list(tags)
+        if not tags:
+            return
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for tag in tags:
+                pipeline.incr(f'{self.prefix}:tag:{tag}')
+            pipeline.execute()
+        except Exception as err:
+            self._error('bump_tags', err)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _error(self, operation, err) -> None:
+        self.errors += 1
+        logger.warning(f'Response cache {operation} failed | {err}')
+
+
+_backend = None
+
+
+def get_response_cache() -> BaseResponseCacheBackend | None:
+    """
+    RESPONSE_CACHE['BACKEND'] is 'local', 'redis' or a dotted path; None when caching is disabled
+    """
+    global _backend
+
+    config = getattr(settings, 'RESPONSE_CACHE', {})
+    if not config.get('ENABLED', False):
+        return None
+
+    if _backend is None:
+        backend = config.get('BACKEND', 'local')
+        ttl = config.get('TTL', 60)
+        if backend == 'local':
+            _backend = LocalResponseCacheBackend(max_entries=config.get('MAX_ENTRIES', 5000), ttl=ttl)
+        elif backend == 'redis':
+            _backend = RedisResponseCacheBackend(url=config.get('REDIS_URL'), ttl=ttl)
+        else:
+            _backend = import_string(backend)(**config.get('OPTIONS', {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _backend
+    if setting == 'RESPONSE_CACHE':
+        _backend = None
+
+
+def bump_tags(tags) -> None:
+    backend = get_response_cache()
+    if backend is not None:
+        backend.bump_tags(set(tags))
+
+
+class CachedResponseMixin:
+    """
+    serves GET responses from the response cache. the key is user, route, path kwargs,
+    renderer and normalized query params; get_cache_tags names what the response depends on.
+    only 200s are stored, as the rendered body, so a hit skips the queries, serializer and renderer
+    """
+
+    def get_cache_tags(self) -> list:
+        raise NotImplementedError
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # wrapped here, after authentication and content negotiation, so the key knows both
+        if request.method == 'GET' and get_response_cache() is not None:
+            handler = self.get
+            self.get = lambda request, *args, **kwargs: self.cached_get(handler, request, *args, **kwargs)
+
+    def get_cache_key(self, request) -> str:
+        match = request.resolver_match
+        params = sorted(
+            (name, value) for name, values in request.query_params.lists() for value in values if value != ''
+        )
+        key = repr((
+            request.user.pk,
+            match.view_name if match else request.path,
+            sorted(self.kwargs.items()),
+            request.accepted_renderer.format,
+            params,
+        ))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def cached_get(self, handler, request, *args, **kwargs):
+        backend = get_response_cache()
+        key = self.get_cache_key(request)
+
+        entry = backend.get(key)
+        if entry is not None and backend.get_tag_versions(entry['tags']) == entry['tags']:
+            return self.cached_response(request, entry)
+
+        # versions read before the view runs, so a write racing the render leaves the entry stale
+        tag_versions = backend.get_tag_versions(self.get_cache_tags())
+        response = handler(request, *args, **kwargs)
+
+        if tag_versions is not None and response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            def store(rendered):
+                backend.set(key, {
+                    'tags': tag_versions,
+                    'status': rendered.status_code,
+                    'content_type': rendered['Content-Type'],
+                    'content': rendered.content,
+                    'headers': {name: rendered[name] for name in CACHED_HEADERS if name in rendered},
+                })
+            response.add_post_render_callback(store)
+        return response
+
+    @staticmethod
+    def cached_response(request, entry) -> HttpResponse:
+        response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+        for name, value in entry['headers'].items():
+            response[name] = value
+
+        last_modified = parse_http_date_safe(entry['headers'].get('Last-Modified', ''))
+        return get_conditional_response(
+            request, etag=entry['headers'].get('ETag'), last_modified=last_modified, response=response
+        )
@@ -0,0 +1,74 @@
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _parse_names(value) -> set:
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldset:
+    """
+    what a GET asked to be rendered. ?fields= selects top level fields, related objects among
+    them render as their id unless also named in ?expand= (which selects them too).
+    without ?fields= everything is rendered and embedded as before
+    """
+
+    def __init__(self, fields: set = None, expand: set = None):
+        self.fields = fields
+        self.expand = expand or set()
+
+    @classmethod
+    def from_request(cls, request) -> 'SparseFieldset':
+        params = request.query_params
+        if request.method != 'GET' or FIELDS_PARAM not in params:
+            return cls()
+        return cls(_parse_names(params.get(FIELDS_PARAM)), _parse_names(params.get(EXPAND_PARAM)))
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.fields is not None
+
+    def includes(self, name) -> bool:
+        return self.fields is None or name in self.fields or name in self.expand
+
+    def expands(self, name) -> bool:
+        return self.fields is None or name in self.expand
+
+
+class SparseFieldsMixin:
+    """
+    serializer mixin applying a SparseFieldset passed as sparse=: unselected fields are dropped,
+    fields in collapsed_fields render through the field their factory builds unless expanded
+    """
+    collapsed_fields = {}
+
+    def __init__(self, *args, sparse: SparseFieldset = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if sparse is None or not sparse.is_sparse:
+            return
+
+        for name in list(self.fields):
+            if not sparse.includes(name):
+                del self.fields[name]
+            elif name in self.collapsed_fields and not sparse.expands(name):
+                self.fields[name] = self.collapsed_fields[name]()
+
+
+class SparseFieldsViewMixin:
+    """
+    generic view mixin handing the request's SparseFieldset to its serializers,
+    get_queryset uses get_sparse_fieldset to skip joins and annotations nobody asked for
+    """
+
+    def get_sparse_fieldset(self) -> SparseFieldset:
+        if not hasattr(self, '_sparse_fieldset'):
+            self._sparse_fieldset = SparseFieldset.from_request(self.request)
+        return self._sparse_fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('sparse', self.get_sparse_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def use_values_serializer(self) -> bool:
+        # values serializers only render the full representation
+        return not self.get_sparse_fieldset().is_sparse and super().use_values_serializer()
@@ -0,0 +1,70 @@
+import csv
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+_DONE = object()
+
+
+class _LineBuffer:
+    """
+    file-like object for csv.writer that hands back what was written
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    """
+    :param header: column names, also the keys read from each row dict
+    :param rows: iterable of dicts
+    :return: generator of csv lines
+    """
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([row.get(column) for column in header])
+
+
+def batched_chunks(lines, lines_per_chunk=500):
+    """
+    join lines into larger chunks, one socket write per batch instead of per row
+    """
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= lines_per_chunk:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+async def _iterate_in_thread(iterator):
+    # each chunk is produced in the sync thread that owns the db connection and cursor
+    iterator = iter(iterator)
+    next_chunk = sync_to_async(lambda: next(iterator, _DONE), thread_sensitive=True)
+    while (chunk := await next_chunk()) is not _DONE:
+        yield chunk
+
+
+def streaming_response(request, chunks, content_type, filename=None) -> StreamingHttpResponse:
+    """
+    stream chunks without buffering them. under ASGI django would collect a sync
+    iterator into a list first, so it gets an async iterator there instead
+    :param request: django or drf request
+    :param chunks: sync iterable of str
+    :param content_type: response content type
+    :param filename: sent as an attachment when given
+    :return: StreamingHttpResponse
+    """
+    django_request = getattr(request, '_request', request)
+    if isinstance(django_request, ASGIRequest):
+        chunks = _iterate_in_thread(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
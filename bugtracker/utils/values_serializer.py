@@ -0,0 +1,162 @@
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import QuerySet
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# a column behind an empty relation, the key is left out like DRF's SkipField does
+_SKIP = object()
+
+_drf_datetime = serializers.DateTimeField().to_representation
+
+
+def _naive_iso_datetime(value):
+    # what DateTimeField renders for the naive values of a USE_TZ=False database, without its per-call lookups
+    if not value:
+        return None
+    if value.tzinfo is not None:
+        return _drf_datetime(value)
+    return value.isoformat()
+
+
+def _get_datetime_converter():
+    if not settings.USE_TZ and str(api_settings.DATETIME_FORMAT).lower() == ISO_8601:
+        return _naive_iso_datetime
+    return _drf_datetime
+
+
+def fast_serializers_enabled() -> bool:
+    return getattr(settings, 'FAST_SERIALIZERS', {}).get('ENABLED', False)
+
+
+class Nested:
+    """
+    a related object rendered as a dict of its columns, None when the relation is empty
+    :param relation: foreign key name on the serialized model
+    :param fields: output name -> column path on the related model
+    """
+
+    def __init__(self, relation: str, fields: dict):
+        self.relation = relation
+        self.fields = fields
+
+
+class ValuesSerializer:
+    """
+    read-only list serializer over values_list rows: no model instances, no DRF field objects.
+    fields maps output names to column paths ('project__name') or Nested; each is compiled once
+    per class into an accessor on the row tuple. subclasses must render exactly what the
+    model serializer they stand in for renders
+    """
+    model = None
+    fields = {}
+
+    def __init__(self, instance):
+        self.instance = instance
+
+    @classmethod
+    def compile(cls) -> tuple:
+        """
+        :return: (column paths to fetch, [(output name, accessor)])
+        """
+        compiled = cls.__dict__.get('_compiled')
+        if compiled is not None:
+            return compiled
+
+        # pk first and named 'pk', pagination reads it from the row like from an instance
+        columns = ['pk']
+
+        def column(path):
+            if path not in columns:
+                columns.append(path)
+            get = itemgetter(columns.index(path))
+            convert = cls.get_converter(path)
+            return get if convert is None else (lambda row: convert(get(row)))
+
+        def accessor(path):
+            value = column(path)
+            # a path through a relation needs the relation set, DRF skips the key otherwise
+            if '__' in path:
+                has_relation = column(path.split('__', 1)[0])
+                return lambda row: _SKIP if has_relation(row) is None else value(row)
+            return value
+
+        def nested(spec):
+            has_relation = column(spec.relation)
+            getters = [(name, column(f'{spec.relation}__{path}')) for name, path in spec.fields.items()]
+            return lambda row: None if has_relation(row) is None else {name: get(row) for name, get in getters}
+
+        accessors = [
+            (name, nested(spec) if isinstance(spec, Nested) else accessor(spec))
+            for name, spec in cls.fields.items()
+        ]
+        cls._compiled = (columns, accessors)
+        return cls._compiled
+
+    @classmethod
+    def get_converter(cls, path):
+        model = cls.model
+        *relations, name = path.split('__')
+        try:
+            for relation in relations:
+                model = model._meta.get_field(relation).related_model
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # annotation
+            return None
+
+        # model field type -> how DRF renders it, anything else is already a json primitive
+        if isinstance(field, models.DateTimeField):
+            return _get_datetime_converter()
+        if isinstance(field, models.DateField):
+            return serializers.DateField().to_representation
+        return None
+
+    @classmethod
+    def get_rows(cls, queryset: QuerySet) -> QuerySet:
+        """
+        :return: the queryset as named values_list rows carrying every compiled column
+        """
+        columns, _ = cls.compile()
+        return queryset.prefetch_related(None).values_list(*columns, named=True)
+
+    @classmethod
+    def to_representation(cls, row) -> dict:
+        _, accessors = cls.compile()
+        return {name: value for name, get in accessors if (value := get(row)) is not _SKIP}
+
+    @property
+    def data(self) -> list:
+        rows = self.instance
+        if isinstance(rows, QuerySet):
+            rows = self.get_rows(rows)
+        return [self.to_representation(row) for row in rows]
+
+
+class ValuesListMixin:
+    """
+    generic view mixin: when FAST_SERIALIZERS is enabled, the actions in values_actions page
+    and render values_list rows through values_serializer_class instead of serializer_class
+    """
+    values_serializer_class = None
+    values_actions = ('list', )
+
+    def use_values_serializer(self) -> bool:
+        return (
+            self.values_serializer_class is not None
+            and getattr(self, 'action', None) in self.values_actions
+            and fast_serializers_enabled()
+        )
+
+    def paginate_queryset(self, queryset):
+        if self.use_values_serializer():
+            queryset = self.values_serializer_class.get_rows(queryset)
+        return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and self.use_values_serializer():
+            return self.values_serializer_class(*args)
+        return super().get_serializer(*args, **kwargs)
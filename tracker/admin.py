@@ -1,12 +1,13 @@
 from django.contrib import admin
-from tracker.models import Project, Bug, Comment, ActivityLog
+from tracker.models import Project, Bug, Comment, ActivityLog, NotificationOutbox
 
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['name', 'owner', 'created_at']
+    list_display = ['name', 'owner', 'bug_count', 'open_bug_count', 'created_at']
     list_filter = ['created_at']
     search_fields = ['name', 'description']
+    readonly_fields = ['bug_count', 'open_bug_count', 'in_progress_bug_count', 'complete_bug_count']
 
 @admin.register(Bug)
 class BugAdmin(admin.ModelAdmin):
@@ -22,4 +23,9 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'project', 'action', 'created_at']
-    list_filter = ['action', 'created_at']
\ No newline at end of file
+    list_filter = ['action', 'created_at']
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'group', 'status', 'attempts', 'created_at', 'dispatched_at']
+    list_filter = ['status', 'created_at']
@@ -1,21 +1,25 @@
 from datetime import datetime
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.core.exceptions import PermissionDenied
 
 from tracker.models import ActivityLog
-from tracker.serializers import ActivityLogDetailSerializer, ActivityLogListSerializer
+from tracker.serializers import ActivityLogDetailSerializer, ActivityLogListSerializer, ActivityLogListValuesSerializer
 from tracker.services.activity_service import ActivityService
+from tracker.services.response_cache_service import ProjectCachedResponseMixin
 from bugtracker.utils.logger import get_logger
 from bugtracker.utils import apilogger
-from bugtracker.utils.pagination import SetPagination
+from bugtracker.utils.pagination import SetPagination, KeysetPagination
+from bugtracker.utils.sparse_fields import SparseFieldset
+from bugtracker.utils.values_serializer import fast_serializers_enabled
 
 logger = get_logger(__name__)
 
 
-class ActivityLogListApiView(APIView):
+class ActivityLogListApiView(ProjectCachedResponseMixin, APIView):
     api_name = 'v1-activity-list'
     permission_classes = (IsAuthenticated, )
 
@@ -46,9 +50,26 @@ class ActivityLogListApiView(APIView):
 
             queryset = queryset.order_by('-created_at')
 
-            paginator = SetPagination()
-            paginated_qs = paginator.paginate_queryset(queryset, request)
-            serializer = ActivityLogListSerializer(paginated_qs, many=True)
+            sparse = SparseFieldset.from_request(request)
+            if sparse.is_sparse:
+                related = [
+                    relation for relation, name in (('project', 'project_name'), ('user', 'created_by'))
+                    if sparse.includes(name)
+                ]
+                queryset = queryset.select_related(None).select_related(*related)
+
+            # ?pagination=cursor opts into keyset paging, which never counts the table
+            if request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params:
+                paginator = KeysetPagination()
+            else:
+                paginator = SetPagination()
+
+            if fast_serializers_enabled() and not sparse.is_sparse:
+                paginated_rows = paginator.paginate_queryset(ActivityLogListValuesSerializer.get_rows(queryset), request)
+                serializer = ActivityLogListValuesSerializer(paginated_rows)
+            else:
+                paginated_qs = paginator.paginate_queryset(queryset, request)
+                serializer = ActivityLogListSerializer(paginated_qs, many=True, sparse=sparse)
 
             apilogger.info(
                 api_name=self.api_name,
@@ -76,6 +97,19 @@ class ActivityLogListApiView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
+        except NotFound as not_found:
+            apilogger.warn(
+                api_name=self.api_name,
+                message='Response generated',
+                details=str(not_found.detail),
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return Response(
+                data={'detail': str(not_found.detail)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
         except Exception as e:
             logger.error(f'Unexpected error in activity list: {e}')
             apilogger.error(
@@ -90,7 +124,7 @@ class ActivityLogListApiView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-class ActivityLogDetailApiView(APIView):
+class ActivityLogDetailApiView(ProjectCachedResponseMixin, APIView):
     api_name = 'v1-activity-detail'
     permission_classes = (IsAuthenticated, )
 
@@ -148,7 +182,7 @@ class ActivityLogDetailApiView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         else:
-            data = ActivityLogDetailSerializer(activity).data
+            data = ActivityLogDetailSerializer(activity, sparse=SparseFieldset.from_request(request)).data
             apilogger.info(
                 api_name=self.api_name,
                 message='Response generated',
@@ -0,0 +1,249 @@
+from datetime import datetime
+
+from django.core.exceptions import PermissionDenied
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from bugtracker.utils import apilogger
+from bugtracker.utils.async_queries import run_query
+from bugtracker.utils.async_views import AsyncAPIView, paginate_page_number
+from bugtracker.utils.logger import get_logger
+from bugtracker.utils.pagination import KeysetPagination, SetPagination
+from bugtracker.utils.sparse_fields import SparseFieldset
+from bugtracker.utils.values_serializer import fast_serializers_enabled
+from tracker.models import ActivityLog
+from tracker.serializers import ActivityLogDetailSerializer, ActivityLogListSerializer, ActivityLogListValuesSerializer
+from tracker.services.activity_service import ActivityService
+from tracker.services.summary_service import SummaryService
+from tracker.views import BugViewSet
+
+logger = get_logger(__name__)
+
+
+class AsyncDashboardStatsApiView(AsyncAPIView):
+    """
+    DashboardStatsAPIView on the event loop
+    """
+    api_name = 'v1-async-dashboard-stats'
+
+    async def get(self, request):
+        start_time = datetime.now()
+        user = request.user
+
+        await apilogger.ainfo(
+            api_name=self.api_name,
+            message='Request received',
+            details=request.query_params.dict(),
+            user=user
+        )
+
+        try:
+            stats = await SummaryService.aget_dashboard_stats(user)
+        except Exception as e:
+            logger.error(f'Unexpected error: {e}')
+            await apilogger.aerror(
+                api_name=self.api_name,
+                message='Response generated',
+                details=e,
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render({'detail': 'Internal Server Error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        await apilogger.ainfo(
+            api_name=self.api_name,
+            message='Response generated',
+            details=stats,
+            user=user,
+            total_time=(datetime.now() - start_time).total_seconds()
+        )
+        return stats
+
+
+class AsyncActivityLogListApiView(AsyncAPIView):
+    """
+    ActivityLogListApiView on the event loop, a page's count and rows are fetched together
+    """
+    api_name = 'v1-async-activity-list'
+
+    async def get(self, request):
+        start_time = datetime.now()
+        user = request.user
+
+        await apilogger.ainfo(
+            api_name=self.api_name,
+            message='Request received',
+            details=request.query_params.dict(),
+            user=user
+        )
+
+        try:
+            queryset = await ActivityService.aget_user_activity_list(user)
+
+            action = request.query_params.get('action')
+            project = request.query_params.get('project')
+            bug = request.query_params.get('bug')
+
+            if action:
+                queryset = queryset.filter(action=action)
+            if project:
+                queryset = queryset.filter(project__id=project)
+            if bug:
+                queryset = queryset.filter(bug__id=bug)
+
+            queryset = queryset.order_by('-created_at')
+
+            sparse = SparseFieldset.from_request(request)
+            if sparse.is_sparse:
+                related = [
+                    relation for relation, name in (('project', 'project_name'), ('user', 'created_by'))
+                    if sparse.includes(name)
+                ]
+                queryset = queryset.select_related(None).select_related(*related)
+
+            use_values = fast_serializers_enabled() and not sparse.is_sparse
+            if use_values:
+                queryset = ActivityLogListValuesSerializer.get_rows(queryset)
+
+            # keyset pages are a single query
+            if request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params:
+                paginator = KeysetPagination()
+                page = await run_query(paginator.paginate_queryset, queryset, request)
+            else:
+                paginator = SetPagination()
+                page = await paginate_page_number(paginator, queryset, request)
+
+            if use_values:
+                serializer = ActivityLogListValuesSerializer(page)
+            else:
+                serializer = ActivityLogListSerializer(page, many=True, sparse=sparse)
+
+            await apilogger.ainfo(
+                api_name=self.api_name,
+                message='Response generated',
+                details=serializer.data,
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return paginator.get_paginated_response(serializer.data).data
+
+        except PermissionDenied as perm_err:
+            logger.warning(f'Unauthorized access from user-{user}. Error: {perm_err}')
+            await apilogger.ainfo(
+                api_name=self.api_name,
+                message='Response generated',
+                details=f'Unauthorized access from user-{user}: {perm_err}',
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render(
+                {'detail': 'You do not have permission to access activities'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        except NotFound as not_found:
+            await apilogger.awarn(
+                api_name=self.api_name,
+                message='Response generated',
+                details=str(not_found.detail),
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render({'detail': str(not_found.detail)}, status=status.HTTP_404_NOT_FOUND)
+
+        except Exception as e:
+            logger.error(f'Unexpected error in activity list: {e}')
+            await apilogger.aerror(
+                api_name=self.api_name,
+                message='Response generated',
+                details=str(e),
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render({'detail': f'Unexpected error: {e}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncActivityLogDetailApiView(AsyncAPIView):
+    """
+    ActivityLogDetailApiView on the event loop, the access check runs alongside the row fetch
+    """
+    api_name = 'v1-async-activity-detail'
+
+    async def get(self, request, pk):
+        start_time = datetime.now()
+        user = request.user
+
+        await apilogger.ainfo(
+            api_name=self.api_name,
+            message='Request received',
+            details=pk,
+            user=user
+        )
+
+        try:
+            activity = await ActivityService.aget_user_activity(user, pk)
+        except PermissionDenied as perm_err:
+            logger.warning(f'Unauthorized access from user-{user}. Error: {perm_err}')
+            await apilogger.ainfo(
+                api_name=self.api_name,
+                message='Response generated',
+                details=f'Unauthorized access from user-{user}: {perm_err}',
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render(
+                {'detail': 'You do not have permission to access this activity'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        except ActivityLog.DoesNotExist:
+            await apilogger.awarn(
+                api_name=self.api_name,
+                message='Response generated',
+                details=f'Activity-{pk} not found',
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render({'detail': 'Activity not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f'Unexpected error: {e}')
+            await apilogger.aerror(
+                api_name=self.api_name,
+                message='Response generated',
+                details=e,
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return self.render({'detail': 'Could not retrieve activity'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        data = ActivityLogDetailSerializer(activity, sparse=SparseFieldset.from_request(request)).data
+        await apilogger.ainfo(
+            api_name=self.api_name,
+            message='Response generated',
+            details=data,
+            user=user,
+            total_time=(datetime.now() - start_time).total_seconds()
+        )
+        return data
+
+
+class AsyncBugListApiView(AsyncAPIView):
+    """
+    BugViewSet.list on the event loop: same filters, ordering, search, ?fields= and values
+    fast path, without the ETag and response cache. a page's count and rows are fetched together
+    """
+    api_name = 'v1-async-bug-list'
+
+    async def get(self, request):
+        viewset = BugViewSet(request=request, action='list', args=(), kwargs={}, format_kwarg=None)
+
+        # the access lookup and django-filter's choice validation may query
+        queryset = await run_query(lambda: viewset.filter_queryset(viewset.get_queryset()))
+        if viewset.use_values_serializer():
+            queryset = viewset.values_serializer_class.get_rows(queryset)
+
+        paginator = viewset.paginator
+        page = await paginate_page_number(paginator, queryset, request)
+        if page is None:
+            return viewset.get_serializer(await run_query(list, queryset), many=True).data
+
+        return paginator.get_paginated_response(viewset.get_serializer(page, many=True).data).data
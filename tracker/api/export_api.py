@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from bugtracker.utils import apilogger
+from bugtracker.utils.streaming import batched_chunks, csv_lines, streaming_response
+from tracker.services.project_service import ProjectService
+from tracker.services.transfer_service import ExportService
+
+
+class ProjectExportApiView(APIView):
+    """
+    stream a project's bugs, comments or activity as NDJSON or CSV without loading them into memory.
+    ?resource=bugs|comments|activity, ?output=ndjson|csv
+    """
+    api_name = 'v1-project-export'
+    permission_classes = (IsAuthenticated, )
+    CONTENT_TYPES = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def get(self, request, project_id):
+        start_time = datetime.now()
+        resource = request.query_params.get('resource', 'bugs')
+        output = request.query_params.get('output', 'ndjson')
+
+        apilogger.info(
+            api_name=self.api_name,
+            message='Request received',
+            details=request.query_params.dict(),
+            user=request.user
+        )
+
+        if resource not in ExportService.RESOURCES or output not in self.CONTENT_TYPES:
+            return Response(
+                data={
+                    'detail': f'resource must be one of {sorted(ExportService.RESOURCES)} '
+                              f'and output one of {sorted(self.CONTENT_TYPES)}'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        project = ProjectService.get_project_by_id(request.user, project_id)
+
+        rows = ExportService.iter_rows(project.pk, resource)
+        if output == 'csv':
+            lines = csv_lines(ExportService.columns(resource), rows)
+        else:
+            lines = ExportService.ndjson_lines(rows)
+
+        apilogger.info(
+            api_name=self.api_name,
+            message='Response generated',
+            details=f'Streaming {resource} of project-{project.pk} as {output}',
+            user=request.user,
+            total_time=(datetime.now() - start_time).total_seconds()
+        )
+        return streaming_response(
+            request,
+            batched_chunks(lines),
+            content_type=self.CONTENT_TYPES[output],
+            filename=f'project-{project.pk}-{resource}.{output}'
+        )
@@ -0,0 +1,59 @@
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from bugtracker.utils import apilogger
+from bugtracker.utils.metrics import request_latency, render_prometheus_values
+from bugtracker.utils.response_cache import get_response_cache
+from tracker.consumers import typing_indicator_counters
+from tracker.services.notification_service import NotificationService
+from tracker.services.summary_service import SummaryService
+
+
+def _counters() -> dict:
+    response_cache = get_response_cache()
+    return {
+        'api_log_buffer': apilogger.stats(),
+        'dashboard_stats_cache': SummaryService.cache_stats(),
+        'notification_outbox': NotificationService.get_outbox_stats(),
+        'response_cache': response_cache.stats() if response_cache else {},
+        'typing_indicator': dict(typing_indicator_counters),
+    }
+
+
+class MetricsApiView(APIView):
+    """
+    latency percentiles and internal counters as json, staff only
+    """
+    api_name = 'v1-metrics'
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return Response(
+            data={
+                'latency': request_latency.snapshot(),
+                **_counters()
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class PrometheusMetricsApiView(APIView):
+    """
+    the same metrics in prometheus text exposition format, staff only
+    """
+    api_name = 'v1-metrics-prometheus'
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        body = request_latency.render_prometheus()
+        for name, values in _counters().items():
+            body += render_prometheus_values(
+                name=f'bugtracker_{name}',
+                help_text=f'{name.replace("_", " ").capitalize()} counters.',
+                metric_type='gauge',
+                values=values
+            )
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -4,28 +4,34 @@ from django.contrib.auth.models import User
 from django.db.models import QuerySet
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework.response import Response
 from rest_framework import status, filters
 from django.utils import timezone
 
 from bugtracker.utils import apilogger
+from bugtracker.utils.conditional import ConditionalGetMixin, get_expected_version
 from bugtracker.utils.logger import get_logger
-from tracker.serializers import ProjectSerializer
+from bugtracker.utils.sparse_fields import SparseFieldsViewMixin
+from bugtracker.utils.values_serializer import ValuesListMixin
+from tracker.filters import IndexedSearchFilter
+from tracker.serializers import ProjectMembersSerializer, ProjectSerializer, ProjectValuesSerializer, UserSerializer
 from tracker.services.project_service import ProjectService
+from tracker.services.response_cache_service import ProjectCachedResponseMixin
 
 
 logger = get_logger(__name__)
 
 
-class ProjectViewSet(ModelViewSet):
+class ProjectViewSet(ProjectCachedResponseMixin, ConditionalGetMixin, SparseFieldsViewMixin, ValuesListMixin, ModelViewSet):
     """
     ViewSet for handling Project CRUD operations with proper permissions
     """
     api_name = 'v1-project'
     serializer_class = ProjectSerializer
+    values_serializer_class = ProjectValuesSerializer
     permission_classes = (IsAuthenticated, )
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, IndexedSearchFilter)
     search_fields = ['name', 'description']
 
     def _log_api_request(self, message, details):
@@ -55,7 +61,10 @@ class ProjectViewSet(ModelViewSet):
         """
         return projects accessible to current user
         """
-        return ProjectService.get_project_list(self.authenticated_user)
+        return ProjectService.get_project_list(
+            self.authenticated_user,
+            with_owner=self.get_sparse_fieldset().expands('owner')
+        )
 
     def list(self, request, *args, **kwargs) -> Response:
         """
@@ -63,6 +72,10 @@ class ProjectViewSet(ModelViewSet):
         """
         self._log_api_request('Request received', request.query_params.dict())
 
+        not_modified = self.check_not_modified(request, detail=False)
+        if not_modified is not None:
+            return not_modified
+
         queryset = self.filter_queryset(self.get_queryset())
 
         if not queryset.exists():
@@ -117,6 +130,10 @@ class ProjectViewSet(ModelViewSet):
         project_id = kwargs.get('pk')
         self._log_api_request("Request (GET) received", project_id)
 
+        not_modified = self.check_not_modified(request, detail=True)
+        if not_modified is not None:
+            return not_modified
+
         project = ProjectService.get_project_by_id(
             request.user,
             project_id
@@ -149,7 +166,8 @@ class ProjectViewSet(ModelViewSet):
         project = ProjectService.update_project(
             request.user,
             project_id,
-            serializer.validated_data
+            serializer.validated_data,
+            expected_version=get_expected_version(request)
         )
         serializer.instance = project
 
@@ -198,4 +216,68 @@ class ProjectViewSet(ModelViewSet):
                 "message": f"Project-{project_id} deleted successfully",
             },
             status=status.HTTP_204_NO_CONTENT
-        )
\ No newline at end of file
+        )
+
+
+class ProjectMemberViewSet(GenericViewSet):
+    """
+    paginated, searchable members of a project; POST adds or removes many at once
+    """
+    api_name = 'v1-project-members'
+    serializer_class = UserSerializer
+    permission_classes = (IsAuthenticated, )
+    filter_backends = (filters.SearchFilter, )
+    search_fields = ['username', 'email', 'first_name', 'last_name']
+
+    def get_queryset(self) -> QuerySet:
+        return ProjectService.get_member_list(self.request.user, self.kwargs.get('project_pk'))
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return ProjectMembersSerializer
+        return UserSerializer
+
+    def list(self, request, *args, **kwargs) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            paginated = self.get_paginated_response(serializer.data).data
+            paginated['message'] = 'Project members retrieved'
+            return Response(paginated)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'message': 'Project members retrieved',
+            'data': serializer.data
+        })
+
+    def create(self, request, *args, **kwargs) -> Response:
+        """
+        {"action": "add" | "remove", "user_ids": [...]}
+        """
+        project_id = kwargs.get('project_pk')
+        apilogger.info(
+            api_name=self.api_name,
+            message='Request received',
+            details={'project': project_id, 'action': request.data.get('action')},
+            user=request.user
+        )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        project = ProjectService.change_members(
+            request.user,
+            project_id,
+            serializer.validated_data['user_ids'],
+            add=serializer.validated_data['action'] == 'add'
+        )
+        return Response(
+            data={
+                'message': 'Project members updated',
+                'data': {'id': project.pk, 'member_count': project.member_count}
+            },
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from tracker.serializers import BugSerializer, CommentSerializer
+from tracker.services.sync_service import SyncService
+from bugtracker.utils import apilogger
+
+
+class ChangesApiView(APIView):
+    """
+    bugs and comments changed since ?since=<cursor>, with ids of deleted ones.
+    start with since=0 and pass back the returned cursor; keep calling while has_more is true.
+    410 asks the client to drop its copy and sync again from since=0
+    """
+    api_name = 'v1-changes'
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        start_time = datetime.now()
+        user = request.user
+
+        apilogger.info(
+            api_name=self.api_name,
+            message='Request received',
+            details=request.query_params.dict(),
+            user=user
+        )
+
+        max_changes = getattr(settings, 'SYNC', {}).get('MAX_CHANGES', 500)
+        since_param = request.query_params.get('since', '0')
+        try:
+            since = SyncService.parse_cursor(since_param)
+            limit = min(int(request.query_params.get('limit', max_changes)), max_changes)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                data={'detail': 'since must be a cursor from a previous response and limit a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        changes = SyncService.get_changes(user, since, limit)
+        if changes is None:
+            apilogger.info(
+                api_name=self.api_name,
+                message='Response generated',
+                details=f'Cursor {since_param} is older than the retained tombstones or the accessible projects changed',
+                user=user,
+                total_time=(datetime.now() - start_time).total_seconds()
+            )
+            return Response(
+                data={'detail': 'Cursor expired, sync again from since=0', 'resync': True},
+                status=status.HTTP_410_GONE
+            )
+
+        data = {
+            'bugs': BugSerializer(changes['bugs'], many=True).data,
+            'comments': CommentSerializer(changes['comments'], many=True).data,
+            'deleted': {
+                'bugs': changes['deleted']['BUG'],
+                'comments': changes['deleted']['COMMENT'],
+            },
+            'cursor': changes['cursor'],
+            'has_more': changes['has_more'],
+        }
+
+        apilogger.info(
+            api_name=self.api_name,
+            message='Response generated',
+            details={'cursor': data['cursor'], 'bugs': len(data['bugs']), 'comments': len(data['comments'])},
+            user=user,
+            total_time=(datetime.now() - start_time).total_seconds()
+        )
+        return Response(data=data, status=status.HTTP_200_OK)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from bugtracker.utils import query_inspector
+        from tracker import signals  # noqa: F401
+
+        connection_created.connect(query_inspector.install)
@@ -1,20 +1,157 @@
+import asyncio
 import json
+import time
+from collections import Counter
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from tracker.models import Project
+from django.conf import settings
+
+from bugtracker.utils import fast_json
+from bugtracker.utils.rate_limit import TokenBucket
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.notification_service import NotificationService, encode_frame, with_frame
+
+# process wide, exposed by the metrics endpoint
+typing_indicator_counters = Counter()
+
+
+class TypingThrottle:
+    """
+    per connection filter for typing indicator frames:
+    repeats of the last forwarded state are dropped until keepalive has passed,
+    changes inside the debounce window are coalesced into one trailing send,
+    and forwarding is capped by a token bucket. a stop-typing frame that clears a
+    forwarded start is never rate limited, so indicators cannot get stuck on.
+    idle bugs are forgotten, an indicator left on is cleared first
+    """
+
+    def __init__(self, forward, rate, burst, debounce, keepalive):
+        self.forward = forward
+        self.bucket = TokenBucket(rate, burst)
+        self.debounce = debounce
+        self.keepalive = keepalive
+
+        self.last_sent = {}
+        self.pending = {}
+        self.timers = {}
+        self.counters = Counter()
+        self.pruned_at = time.monotonic()
+
+    async def offer(self, bug_id, is_typing: bool) -> None:
+        await self._prune()
+
+        if bug_id in self.timers:
+            self._count('coalesced')
+            self.pending[bug_id] = is_typing
+            return
+
+        last = self.last_sent.get(bug_id)
+        now = time.monotonic()
+
+        if last is not None and now - last[1] < self.debounce:
+            self.pending[bug_id] = is_typing
+            self.timers[bug_id] = asyncio.ensure_future(self._flush_later(bug_id, self.debounce - (now - last[1])))
+            return
+
+        await self._send(bug_id, is_typing)
+
+    async def _flush_later(self, bug_id, delay) -> None:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.timers.pop(bug_id, None)
+        await self._send(bug_id, self.pending.pop(bug_id))
+
+    async def _send(self, bug_id, is_typing: bool) -> None:
+        last = self.last_sent.get(bug_id)
+        now = time.monotonic()
+
+        if last is not None and last[0] == is_typing and now - last[1] < self.keepalive:
+            self._count('redundant')
+            return
+
+        clears_indicator = not is_typing and last is not None and last[0]
+        if not clears_indicator and not self.bucket.consume():
+            self._count('rate_limited')
+            return
+
+        self.last_sent[bug_id] = (is_typing, now)
+        self._count('forwarded')
+        await self.forward(bug_id, is_typing)
+
+    async def _prune(self) -> None:
+        """
+        drop last_sent entries too old to affect filtering, at most once per window,
+        so a long lived connection does not keep one entry per bug it ever typed on
+        """
+        now = time.monotonic()
+        window = max(self.debounce, self.keepalive)
+        if now - self.pruned_at < window:
+            return
+        self.pruned_at = now
+
+        for bug_id, (is_typing, sent_at) in list(self.last_sent.items()):
+            idle = now - sent_at
+            # a client still typing gets a repeat through once the keepalive has passed,
+            # an indicator not refreshed a keepalive after that has been abandoned
+            if idle < window or (is_typing and idle < window + self.keepalive) or bug_id in self.timers:
+                continue
+            del self.last_sent[bug_id]
+            if is_typing:
+                self._count('expired')
+                await self.forward(bug_id, False)
+
+    async def close(self) -> None:
+        """
+        cancel trailing sends and clear any indicator this connection left on
+        """
+        for timer in self.timers.values():
+            timer.cancel()
+        self.timers.clear()
+        self.pending.clear()
+
+        for bug_id, (is_typing, _) in list(self.last_sent.items()):
+            if is_typing:
+                self.last_sent[bug_id] = (False, time.monotonic())
+                self._count('forwarded')
+                await self.forward(bug_id, False)
+
+    def _count(self, name) -> None:
+        self.counters[name] += 1
+        typing_indicator_counters[name] += 1
 
 
 class BugTrackerConsumer(AsyncWebsocketConsumer):
+    BATCHABLE_HANDLERS = {
+        'bug_notification': 'bug_notification',
+        'bug_bulk_notification': 'bug_bulk_notification',
+        'comment_notification': 'comment_notification',
+        'activity_log': 'activity_log',
+    }
+
     async def connect(self):
         self.project_id = self.scope['url_route']['kwargs']['project_id']
         self.project_group_name = f'project_{self.project_id}'
+        # live events up to here were already sent by a replay
+        self.replayed_seq = 0
+
+        config = getattr(settings, 'TYPING_INDICATOR', {})
+        self.typing_throttle = TypingThrottle(
+            forward=self.broadcast_typing,
+            rate=config.get('RATE', 2.0),
+            burst=config.get('BURST', 5),
+            debounce=config.get('DEBOUNCE_SECONDS', 0.5),
+            keepalive=config.get('KEEPALIVE_SECONDS', 3.0),
+        )
 
         user = self.scope['user']
         if user.is_anonymous:
             await self.close()
             return
 
-        has_permission = self.check_project_permission(user, self.project_id)
+        has_permission = await self.check_project_permission(user, self.project_id)
         if not has_permission:
             await self.close()
             return
@@ -26,7 +163,14 @@ class BugTrackerConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
+        last_seq = parse_qs(self.scope.get('query_string', b'').decode()).get('last_seq')
+        if last_seq and last_seq[0].isdigit():
+            await self.replay(int(last_seq[0]))
+
     async def disconnect(self, code):
+        if not self.scope['user'].is_anonymous:
+            await self.typing_throttle.close()
+
         await self.channel_layer.group_discard(
             self.project_group_name,
             self.channel_name
@@ -34,57 +178,76 @@ class BugTrackerConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data=None, bytes_data=None):
         try:
-            text_data_json = json.loads(text_data)
+            text_data_json = fast_json.loads(text_data)
             message_type = text_data_json.get('type')
 
             if message_type == 'typing_indicator':
-                await self.channel_layer.group_send(
-                    self.project_group_name,
-                    {
-                        'type': 'typing_indicator',
-                        'user': self.scope.get('user').username,
-                        'bug_id': text_data_json.get('bug_id'),
-                        'is_typing': text_data_json.get('is_typing', False)
-                    }
-                )
+                bug_id = text_data_json.get('bug_id')
+                if isinstance(bug_id, int):
+                    await self.typing_throttle.offer(bug_id, bool(text_data_json.get('is_typing', False)))
+            elif message_type == 'replay':
+                last_seq = text_data_json.get('last_seq')
+                if isinstance(last_seq, int) and last_seq >= 0:
+                    await self.replay(last_seq)
         except json.JSONDecodeError:
             pass
 
-    async def bug_notification(self, event):
-        await self.send(
-            text_data=json.dumps({
-                'type': 'bug_notification',
-                'event_type': event.get('event_type'),
-                'bug_id': event.get('bug_id'),
-                'bug_title': event.get('bug_title'),
-                'bug_status': event.get('bug_status'),
-                'project_id': event.get('project_id'),
-                'user': event.get('user')
-            })
-        )
-
-    async def typing_indicator(self, event):
-        await self.send(
-            text_data=json.dumps({
+    async def broadcast_typing(self, bug_id, is_typing):
+        await self.channel_layer.group_send(
+            self.project_group_name,
+            with_frame({
                 'type': 'typing_indicator',
-                'user': event['user'],
-                'bug_id': event['bug_id'],
-                'is_typing': event['is_typing']
+                'user': self.scope.get('user').username,
+                'bug_id': bug_id,
+                'is_typing': is_typing
             })
         )
 
-    async def activity_log(self, event):
-        await self.send(
-            text_data=json.dumps({
-                'type': 'activity_log',
-                'activity': event['activity']
-            })
-        )
+    async def replay(self, last_seq):
+        """
+        send the project events after last_seq, or resync_required when they are no longer kept
+        :param last_seq: last sequence number the client has seen
+        :return:
+        """
+        payloads, current_seq, resync = await self.get_events_since(self.project_id, last_seq)
+
+        if resync:
+            await self.send(text_data=fast_json.dumps_str({'type': 'resync_required', 'seq': current_seq}))
+        else:
+            for payload in payloads:
+                handler = self.BATCHABLE_HANDLERS.get(payload.get('type'))
+                if handler is not None:
+                    await getattr(self, handler)(payload)
+        self.replayed_seq = max(self.replayed_seq, current_seq)
+
+    async def send_frame(self, event):
+        """
+        group events arrive with their frame already encoded by the sender, see with_frame.
+        replayed outbox payloads are encoded here
+        """
+        await self.send(text_data=event.get('frame') or encode_frame(event))
+
+    bug_notification = send_frame
+    bug_bulk_notification = send_frame
+    comment_notification = send_frame
+    typing_indicator = send_frame
+    activity_log = send_frame
+
+    async def notification_batch(self, event):
+        """
+        outbox dispatcher sends one message per group per batch, fan out to the usual frames
+        """
+        for item in event.get('events', []):
+            if item.get('seq') is not None and item['seq'] <= self.replayed_seq:
+                continue
+            handler = self.BATCHABLE_HANDLERS.get(item.get('type'))
+            if handler is not None:
+                await getattr(self, handler)(item)
 
     @database_sync_to_async
     def check_project_permission(self, user, project_id) -> bool:
-        try:
-            project = Project.objects.get(id=project_id)
-            return project.owner == user or user in project.members.all()
-        except Project.DoesNotExist:
-            return False
\ No newline at end of file
+        return ProjectAccessService.has_access(user, project_id)
+
+    @database_sync_to_async
+    def get_events_since(self, project_id, last_seq) -> tuple:
+        return NotificationService.get_project_events_since(project_id, last_seq)
\ No newline at end of file
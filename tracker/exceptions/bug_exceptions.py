@@ -0,0 +1,43 @@
+from rest_framework import status
+
+from tracker.exceptions.project_exceptions import ProjectServiceException
+
+
+class BugServiceException(ProjectServiceException):
+    """
+    Base exception for bug service errors
+    """
+    default_detail = 'A bug service error occurred.'
+    default_code = 'bug_service_error'
+
+class BugNotFoundError(BugServiceException):
+    """
+    Raised when requested bugs do not exist or are not accessible
+    """
+    status_code = status.HTTP_404_NOT_FOUND
+    default_detail = 'Bug not found.'
+    default_code = 'bug_not_found'
+
+class BugAccessDeniedError(BugServiceException):
+    """
+    Raised when user doesn't have access to the project of a bug
+    """
+    status_code = status.HTTP_403_FORBIDDEN
+    default_detail = 'Permission denied for requested bug.'
+    default_code = 'bug_access_denied'
+
+class BugConflictError(BugServiceException):
+    """
+    Raised when a bug was changed since the version the client read
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Bug was modified by someone else.'
+    default_code = 'bug_conflict'
+
+class BugValidationError(BugServiceException):
+    """
+    Raised when bug data refers to something that does not exist
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Invalid bug data.'
+    default_code = 'bug_validation_error'
@@ -53,6 +53,24 @@ class ProjectUpdateError(ProjectServiceException):
     default_code = 'project_update_error'
 
 
+class ProjectValidationError(ProjectServiceException):
+    """
+    Raised when project data refers to something that does not exist
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Invalid project data.'
+    default_code = 'project_validation_error'
+
+
+class ProjectConflictError(ProjectServiceException):
+    """
+    Raised when a project was changed since the version the client read
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Project was modified by someone else.'
+    default_code = 'project_conflict'
+
+
 class ProjectDeletionError(ProjectServiceException):
     """
     Raised when project deletion fails
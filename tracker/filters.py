@@ -0,0 +1,18 @@
+from rest_framework import filters
+
+from tracker.services.search_service import get_search_backend
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    ?search= served by the configured search backend instead of ILIKE scans.
+    place after OrderingFilter so relevance can lead the default ordering
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        explicit_ordering = bool(request.query_params.get('ordering'))
+        return get_search_backend().search(queryset, ' '.join(terms), rank=not explicit_ordering)
@@ -0,0 +1,221 @@
+import asyncio
+import shutil
+import subprocess
+import time
+from collections import defaultdict
+
+import msgpack
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from bugtracker.utils.channel_layers import HashRing, ShardedRedisChannelLayer
+
+
+class SimulatedShard:
+    """
+    one single threaded redis: requests queue behind each other and keep it busy service_time each
+    """
+
+    def __init__(self, service_time):
+        self.service_time = service_time
+        self.lock = asyncio.Lock()
+        self.groups = defaultdict(set)
+        self.queues = defaultdict(list)
+
+    async def request(self):
+        async with self.lock:
+            await asyncio.sleep(self.service_time)
+
+
+class InMemoryShardedLayer:
+    """
+    stand-in for ShardedRedisChannelLayer when no redis-server is around: same ring and the
+    same requests per shard for group_send, messages kept in process
+    """
+
+    def __init__(self, shards, service_time, replicas=160):
+        self.shards = [SimulatedShard(service_time) for _ in range(shards)]
+        self.ring = HashRing([f'memory-{index}' for index in range(shards)], replicas)
+        self.prefix = 'bench'
+
+    def consistent_hash(self, value) -> int:
+        return 0 if len(self.shards) == 1 else self.ring.get_node(value)
+
+    async def group_add(self, group, channel):
+        # setup only, not measured
+        self.shards[self.consistent_hash(group)].groups[group].add(channel)
+
+    async def group_send(self, group, message):
+        shard = self.shards[self.consistent_hash(group)]
+        # ZREMRANGEBYSCORE + ZRANGE pipeline
+        await shard.request()
+
+        channels_by_key = defaultdict(list)
+        for channel in shard.groups[group]:
+            channels_by_key[channel[:channel.index('!') + 1]].append(channel)
+
+        keys_by_index = defaultdict(list)
+        for key in channels_by_key:
+            keys_by_index[self.consistent_hash(key)].append(key)
+
+        async def send_to_shard(target, keys):
+            # EVAL
+            await target.request()
+            for key in keys:
+                target.queues[key].append(
+                    msgpack.packb({**message, '__asgi_channel__': channels_by_key[key]}, use_bin_type=True)
+                )
+
+        await asyncio.gather(*(send_to_shard(self.shards[index], keys) for index, keys in keys_by_index.items()))
+
+    async def queued(self, keys) -> int:
+        return sum(len(shard.queues[key]) for shard in self.shards for key in keys)
+
+    async def close(self):
+        pass
+
+
+class RedisBenchmarkLayer(ShardedRedisChannelLayer):
+
+    async def queued(self, keys) -> int:
+        total = 0
+        for key in keys:
+            total += await self.connection(self.consistent_hash(key)).zcard(self.prefix + key)
+        return total
+
+    async def close(self):
+        await self.flush()
+
+
+class Command(BaseCommand):
+    help = 'Measure group_send fan-out throughput of the sharded channel layer as shards are added'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', default='1,2,4,8', help='Comma separated shard counts to measure')
+        parser.add_argument('--backend', choices=['memory', 'redis'], default='memory')
+        parser.add_argument('--groups', type=int, default=400, help='Project groups')
+        parser.add_argument('--members', type=int, default=4, help='Sockets per group')
+        parser.add_argument('--workers', type=int, default=32, help='Server processes the sockets are spread over')
+        parser.add_argument('--messages', type=int, default=2, help='group_send calls per group')
+        parser.add_argument('--concurrency', type=int, default=64, help='group_send calls in flight')
+        parser.add_argument(
+            '--service-time', type=float, default=0.001,
+            help='memory backend: seconds a shard is busy per request'
+        )
+        parser.add_argument('--redis-server', default='redis-server', help='redis backend: binary to start shards with')
+        parser.add_argument('--base-port', type=int, default=6390, help='redis backend: port of the first shard')
+
+    def handle(self, *args, **options):
+        shard_counts = sorted({int(count) for count in options['shards'].split(',') if count.strip()})
+        if not shard_counts or shard_counts[0] < 1:
+            raise CommandError('--shards needs positive shard counts')
+
+        processes = []
+        if options['backend'] == 'redis':
+            processes = self.start_redis(options['redis_server'], options['base_port'], shard_counts[-1])
+
+        try:
+            self.stdout.write(
+                f'{"shards":>6}{"sends/s":>12}{"deliveries/s":>15}{"max/mean":>10}{"moved":>8}  delivered'
+            )
+            previous = None
+            for count in shard_counts:
+                result = asyncio.run(self.run_case(count, options))
+                moved = '' if previous is None else f'{self.moved(previous, result["placement"]):.0%}'
+                self.stdout.write(
+                    f'{count:>6}{result["sends"] / result["seconds"]:>12.0f}'
+                    f'{result["deliveries"] / result["seconds"]:>15.0f}{result["spread"]:>10.2f}{moved:>8}'
+                    f'  {result["delivered"]}'
+                )
+                previous = result['placement']
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    def make_layer(self, count, options):
+        if options['backend'] == 'memory':
+            return InMemoryShardedLayer(count, options['service_time'])
+
+        return RedisBenchmarkLayer(
+            hosts=[f'redis://127.0.0.1:{options["base_port"] + index}' for index in range(count)],
+            prefix='bench',
+            capacity=options['groups'] * options['messages'] + 1,
+            pool={'max_connections': options['concurrency'] * 2, 'timeout': 20},
+        )
+
+    async def run_case(self, count, options) -> dict:
+        groups, members, workers = options['groups'], options['members'], options['workers']
+        layer = self.make_layer(count, options)
+
+        # process local names, like the ones channels_redis hands each server process
+        group_names = [f'project_{group}' for group in range(groups)]
+        worker_keys = [f'specific.bench{worker}!' for worker in range(workers)]
+        expected = 0
+        for group, name in enumerate(group_names):
+            member_workers = {(group * members + member) % workers for member in range(members)}
+            expected += len(member_workers) * options['messages']
+            for member in range(members):
+                await layer.group_add(name, f'{worker_keys[(group * members + member) % workers]}{group}-{member}')
+
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        message = {'type': 'send_frame', 'frame': '{"type":"bug_updated","project_id":1,"seq":1}'}
+
+        async def send(name):
+            async with semaphore:
+                await layer.group_send(name, message)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(name) for name in group_names for _ in range(options['messages'])))
+        seconds = time.perf_counter() - started
+
+        queued = await layer.queued(worker_keys)
+        await layer.close()
+
+        placement = {name: layer.consistent_hash(name) for name in group_names}
+        per_shard = [0] * count
+        for index in placement.values():
+            per_shard[index] += 1
+
+        return {
+            'seconds': seconds,
+            'sends': groups * options['messages'],
+            'deliveries': groups * members * options['messages'],
+            'spread': max(per_shard) / (groups / count),
+            'placement': {name: f'shard-{index}' for name, index in placement.items()},
+            'delivered': 'ok' if queued == expected else f'{queued}/{expected}',
+        }
+
+    @staticmethod
+    def moved(previous, current) -> float:
+        """
+        share of groups whose shard changed, shards keep their name as more are added
+        """
+        return sum(previous[name] != current[name] for name in current) / len(current)
+
+    def start_redis(self, binary, base_port, count) -> list:
+        if shutil.which(binary) is None:
+            raise CommandError(f'{binary} not found, use --backend memory')
+
+        processes = []
+        for index in range(count):
+            port = base_port + index
+            processes.append(subprocess.Popen(
+                [binary, '--port', str(port), '--save', '', '--appendonly', 'no'],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ))
+            client = redis.Redis(port=port)
+            for _ in range(50):
+                try:
+                    client.ping()
+                    break
+                except redis.ConnectionError:
+                    time.sleep(0.1)
+            else:
+                for process in processes:
+                    process.terminate()
+                raise CommandError(f'redis-server on port {port} did not start')
+            client.close()
+
+        self.stdout.write(f'started {count} redis-server shards from port {base_port}')
+        return processes
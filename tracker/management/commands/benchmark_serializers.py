@@ -0,0 +1,107 @@
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tracker.models import ActivityLog, Bug, Comment, Project
+from tracker.serializers import (
+    ActivityLogListSerializer, ActivityLogListValuesSerializer, BugSerializer, BugValuesSerializer,
+    ProjectSerializer, ProjectValuesSerializer
+)
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.activity_service import ActivityService
+from tracker.services.project_service import ProjectService
+from tracker.views import BugViewSet
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of the model serializers and the values_list fast path on seeded list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per serializer, the best is kept')
+        parser.add_argument('--members', type=int, default=5, help='Members per seeded project')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+
+        # seeded and measured inside one transaction that is rolled back
+        with transaction.atomic():
+            user = self.seed(rows, options['members'])
+            ProjectAccessService.clear()
+
+            # a plain GET, so the full list queryset
+            request = SimpleNamespace(user=user, method='GET', query_params={})
+            bugs = BugViewSet(request=request).get_queryset().order_by('-created_at')
+            cases = (
+                ('bugs', bugs, BugSerializer, BugValuesSerializer),
+                ('projects', ProjectService.get_project_list(user), ProjectSerializer, ProjectValuesSerializer),
+                (
+                    'activity', ActivityService.get_user_activity_list(user).order_by('-created_at'),
+                    ActivityLogListSerializer, ActivityLogListValuesSerializer
+                ),
+            )
+
+            self.stdout.write(f'{"resource":<10}{"serializer":>14}{"values":>14}{"speedup":>10}  identical')
+            for name, queryset, serializer_class, values_serializer_class in cases:
+                page = queryset[:rows]
+                before, expected = self.measure(repeat, lambda: serializer_class(page, many=True).data)
+                after, actual = self.measure(repeat, lambda: values_serializer_class(page).data)
+
+                identical = JSONRenderer().render(expected) == JSONRenderer().render(actual)
+                self.stdout.write(
+                    f'{name:<10}{len(expected) / before:>10.0f} r/s{len(actual) / after:>10.0f} r/s'
+                    f'{before / after:>9.1f}x  {identical}'
+                )
+
+            transaction.set_rollback(True)
+        ProjectAccessService.clear()
+
+    @staticmethod
+    def measure(repeat, serialize) -> tuple:
+        """
+        :return: (best seconds for fetch + serialize, the serialized page)
+        """
+        best, data = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serialize()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
+
+    @staticmethod
+    def seed(rows, members_per_project) -> User:
+        user = User.objects.create(username='serializer-benchmark', email='bench@example.com')
+        members = User.objects.bulk_create([
+            User(username=f'serializer-benchmark-{i}', first_name='Bench', last_name=str(i))
+            for i in range(members_per_project)
+        ])
+
+        projects = Project.objects.bulk_create([
+            Project(name=f'Benchmark {i}', description='seeded', owner=user) for i in range(rows)
+        ])
+        Project.members.through.objects.bulk_create([
+            Project.members.through(project_id=project.pk, user_id=member.pk)
+            for project in projects for member in members
+        ])
+
+        bugs = Bug.objects.bulk_create([
+            Bug(
+                title=f'Benchmark bug {i}',
+                description='seeded',
+                project=projects[i % len(projects)],
+                created_by=user,
+                assigned_to=members[i % len(members)] if members and i % 2 else None,
+            )
+            for i in range(rows)
+        ])
+        Comment.objects.bulk_create([Comment(bug=bug, commenter=user, message='seeded') for bug in bugs[::2]])
+        ActivityLog.objects.bulk_create([
+            ActivityLog(user=user, project_id=bug.project_id, bug=bug, action='created', description=bug.title)
+            for bug in bugs
+        ])
+        return user
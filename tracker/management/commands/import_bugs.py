@@ -0,0 +1,57 @@
+import json
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.models import Project
+from tracker.services.transfer_service import ImportService
+
+
+class Command(BaseCommand):
+    help = 'Import bugs into a project from an NDJSON or CSV file, in batched transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON or CSV file, e.g. written by the project export endpoint')
+        parser.add_argument('--project', type=int, required=True, help='Target project id')
+        parser.add_argument('--user', help='Username recorded as creator, defaults to the project owner')
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction')
+        parser.add_argument('--errors', help='Write per-row errors to this NDJSON file instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.select_related('owner').get(pk=options['project'])
+        except Project.DoesNotExist:
+            raise CommandError(f'Project-{options["project"]} does not exist')
+
+        if options['user']:
+            request_user = User.objects.filter(username=options['user']).first()
+        else:
+            request_user = project.owner
+        if request_user is None:
+            raise CommandError('No creator: pass --user or give the project an owner')
+
+        file_format = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if file_format not in ('ndjson', 'jsonl', 'csv'):
+            raise CommandError('Unknown format, pass --format ndjson|csv')
+
+        importer = ImportService(project, request_user, batch_size=options['batch_size'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            rows = importer.read_csv(stream) if file_format == 'csv' else importer.read_ndjson(stream)
+            stats = importer.run(rows)
+
+        errors = stats.pop('errors')
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8') as error_file:
+                for error in errors:
+                    error_file.write(json.dumps(error, default=str) + '\n')
+        else:
+            for error in errors:
+                self.stderr.write(f'line {error["line"]}: {json.dumps(error["errors"], default=str)}')
+
+        style = self.style.SUCCESS if not errors else self.style.WARNING
+        self.stdout.write(style(
+            f'Imported {stats["imported"]}/{stats["rows"]} rows into project-{project.pk}, '
+            f'{stats["failed"]} failed, {stats["seconds"]}s ({stats["rows_per_second"]} rows/s)'
+        ))
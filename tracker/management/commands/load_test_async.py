@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.summary_service import SummaryService
+
+# (name, sync path, async path), the async views answer with the same bodies
+ENDPOINTS = (
+    ('dashboard', '/api/v1/dashboard-stats/', '/api/v1/async/dashboard-stats/'),
+    ('activity', '/api/v1/activity/?page=2&page_size=20', '/api/v1/async/activity/?page=2&page_size=20'),
+    ('bugs', '/api/bugs/?page=2&page_size=20', '/api/v1/async/bugs/?page=2&page_size=20'),
+)
+
+
+class InProcessClient:
+    """
+    drives the django asgi application directly, no server or sockets in between
+    """
+
+    def __init__(self):
+        self.application = get_asgi_application()
+
+    async def get(self, path, token) -> int:
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        status = None
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # the response is sent before the handler listens for a disconnect
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        await self.application(scope, receive, send)
+        return status
+
+    async def close(self):
+        pass
+
+
+class HttpClient:
+    """
+    minimal keep-alive http/1.1 client against a running server, one connection per worker
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise CommandError('--url must be an http:// address')
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.connections = asyncio.Queue()
+
+    async def get(self, path, token) -> int:
+        try:
+            reader, writer = self.connections.get_nowait()
+        except asyncio.QueueEmpty:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        writer.write((
+            f'GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+            f'Authorization: Bearer {token}\r\nConnection: keep-alive\r\n\r\n'
+        ).encode())
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length, chunked, keep_alive = 0, False, True
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'transfer-encoding':
+                chunked = 'chunked' in value
+            elif name == 'connection':
+                keep_alive = value != 'close'
+
+        if chunked:
+            while size := int((await reader.readline()).split(b';')[0], 16):
+                await reader.readexactly(size + 2)
+            await reader.readline()
+        else:
+            await reader.readexactly(length)
+
+        if keep_alive:
+            self.connections.put_nowait((reader, writer))
+        else:
+            writer.close()
+        return status
+
+    async def close(self):
+        while not self.connections.empty():
+            _, writer = self.connections.get_nowait()
+            writer.close()
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and latency of the sync read endpoints and their async counterparts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', required=True, dest='users',
+            help='Username to send requests as, repeat to spread requests over several users'
+        )
+        parser.add_argument('--requests', type=int, default=400, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=32, help='Requests in flight')
+        parser.add_argument('--url', help='Base url of a running server, the app is driven in process without it')
+
+    def handle(self, *args, **options):
+        usernames = options['users']
+        users = list(User.objects.filter(username__in=usernames))
+        missing = set(usernames) - {user.username for user in users}
+        if missing:
+            raise CommandError(f'Unknown users: {", ".join(sorted(missing))}')
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+
+        self.stdout.write(f'{"endpoint":<12}{"view":>6}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+        for name, sync_path, async_path in ENDPOINTS:
+            for view, path in (('sync', sync_path), ('async', async_path)):
+                if not options['url']:
+                    # every run starts cold, in process caches would favour the second one
+                    ProjectAccessService.clear()
+                    SummaryService.cache().clear()
+
+                result = asyncio.run(self.run_case(path, tokens, options))
+                self.stdout.write(
+                    f'{name:<12}{view:>6}{result["rate"]:>10.0f}{result["p50"]:>10.1f}'
+                    f'{result["p99"]:>10.1f}{result["errors"]:>8}'
+                )
+
+    async def run_case(self, path, tokens, options) -> dict:
+        client = HttpClient(options['url'].rstrip('/')) if options['url'] else InProcessClient()
+        total = options['requests']
+        token_cycle = itertools.cycle(tokens)
+        latencies = []
+        errors = 0
+
+        async def worker(count):
+            nonlocal errors
+            for _ in range(count):
+                started = time.perf_counter()
+                try:
+                    status = await client.get(path, next(token_cycle))
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    status = None
+                latencies.append(time.perf_counter() - started)
+                if status is None or status >= 400:
+                    errors += 1
+
+        concurrency = min(options['concurrency'], total)
+        counts = [total // concurrency + (index < total % concurrency) for index in range(concurrency)]
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(count) for count in counts))
+        seconds = time.perf_counter() - started
+        await client.close()
+
+        latencies.sort()
+        return {
+            'rate': total / seconds,
+            'p50': statistics.median(latencies) * 1000,
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+            'errors': errors,
+        }
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tracker.services.sync_service import SyncService
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'SYNC', {}).get('TOMBSTONE_RETENTION_DAYS', 30)
+        )
+
+    def handle(self, *args, **options):
+        deleted = SyncService.purge_tombstones(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstone(s)'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tracker.services.bug_counter_service import BugCounterService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored per-project bug counters from the bug table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', type=int, action='append', dest='project_ids',
+            help='Only rebuild this project id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        repaired = BugCounterService.rebuild(options.get('project_ids'))
+        self.stdout.write(self.style.SUCCESS(f'Repaired bug counters on {repaired} project(s)'))
@@ -0,0 +1,57 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bugtracker.utils.logger import get_logger
+from tracker.services.notification_service import NotificationDispatcher
+
+logger = get_logger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Drain the notification outbox to the channel layer until stopped'
+
+    def add_arguments(self, parser):
+        config = getattr(settings, 'NOTIFICATION_OUTBOX', {})
+        parser.add_argument('--poll-interval', type=float, default=config.get('POLL_INTERVAL', 0.2))
+        parser.add_argument('--stats-interval', type=float, default=60.0)
+        parser.add_argument('--once', action='store_true', help='Drain what is due and exit')
+
+    def handle(self, *args, **options):
+        config = getattr(settings, 'NOTIFICATION_OUTBOX', {})
+        retention = timedelta(hours=config.get('RETENTION_HOURS', 24))
+        dispatcher = NotificationDispatcher()
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        last_report = time.monotonic()
+        while self.running:
+            try:
+                handled = dispatcher.dispatch_once()
+            except Exception as err:
+                logger.error(f'Notification dispatcher error | {err}')
+                handled = 0
+            finally:
+                close_old_connections()
+
+            if options['once'] and not handled:
+                break
+
+            if time.monotonic() - last_report >= options['stats_interval']:
+                dispatcher.purge(retention)
+                logger.info(f'Notification dispatcher stats | {dispatcher.stats()}')
+                last_report = time.monotonic()
+
+            if not handled:
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(f'Notification dispatcher stopped | {dispatcher.stats()}')
+
+    def stop(self, *args):
+        self.running = False
@@ -1,10 +1,123 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.utils import timezone
 
-class TimingMiddleware:
+from bugtracker.utils.logger import get_logger
+from bugtracker.utils.metrics import request_latency
+from bugtracker.utils.query_inspector import QueryInspector
+
+logger = get_logger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """
+    runs in whichever mode the rest of the stack is in, so async views are not pushed through a thread.
+    subclasses implement before(request) -> state and after(request, response, state) -> response
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = self.before(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(state)
+        return self.after(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.before(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(state)
+        return self.after(request, response, state)
+
+    def before(self, request):
+        return None
+
+    def finish(self, state) -> None:
+        pass
+
+    def after(self, request, response, state):
+        return response
+
+
+class TimingMiddleware(AsyncCapableMiddleware):
+    """
+    stamps request._start_time for the views and records every request into
+    the latency histograms, keyed by route name, method and status class
+    """
+
+    def before(self, request):
         request._start_time = timezone.now()
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+        return time.perf_counter()
+
+    def after(self, request, response, started):
+        request_latency.observe(
+            route=self.route_name(request),
+            method=request.method,
+            status_code=response.status_code,
+            seconds=time.perf_counter() - started
+        )
+        return response
+
+    @staticmethod
+    def route_name(request) -> str:
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unmatched'
+        return match.view_name or match.route
+
+
+class QueryInspectorMiddleware(AsyncCapableMiddleware):
+    """
+    counts sql queries and db time for a sample of requests and flags repeated
+    query shapes (N+1). results go to debug response headers, the log and the
+    ApiLog rows written while the request is handled
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.config = getattr(settings, 'QUERY_INSPECTOR', {})
+
+    def before(self, request):
+        if not self.config.get('ENABLED') or random.random() >= self.config.get('SAMPLE_RATE', 1.0):
+            return None
+
+        # every connection reports to the active inspector, see query_inspector.install
+        inspector = QueryInspector(repeat_threshold=self.config.get('REPEAT_THRESHOLD', 5))
+        return inspector, inspector.activate()
+
+    def finish(self, state) -> None:
+        if state is not None:
+            QueryInspector.deactivate(state[1])
+
+    def after(self, request, response, state):
+        if state is None:
+            return response
+
+        inspector = state[0]
+        repeated = inspector.repeated()
+        if repeated:
+            logger.warning(
+                f'Repeated queries on {request.method} {request.path}: '
+                + '; '.join(f'{total}x {shape[:200]}' for shape, total in repeated.items())
+            )
+
+        if self.config.get('HEADERS'):
+            response['X-DB-Query-Count'] = str(inspector.count)
+            response['X-DB-Time-Ms'] = f'{inspector.db_time * 1000:.2f}'
+            response['X-DB-Repeated-Queries'] = str(len(repeated))
+        return response
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:27
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_bug_counters(apps, schema_editor):
+    Project = apps.get_model('tracker', 'Project')
+
+    projects = Project.objects.annotate(
+        total=Count('bugs'),
+        open=Count('bugs', filter=Q(bugs__status='OPEN')),
+        in_progress=Count('bugs', filter=Q(bugs__status='IN_PROGRESS')),
+        complete=Count('bugs', filter=Q(bugs__status='COMPLETE')),
+    )
+    for project in projects.iterator(chunk_size=1000):
+        Project.objects.filter(pk=project.pk).update(
+            bug_count=project.total,
+            open_bug_count=project.open,
+            in_progress_bug_count=project.in_progress,
+            complete_bug_count=project.complete,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_apilog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='complete_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='open_bug_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_bug_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:32
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+SEARCH_DOCUMENTS = {
+    'tracker_bug': (('title', 'A'), ('description', 'B')),
+    'tracker_project': (('name', 'A'), ('description', 'B')),
+}
+
+
+def _vector_sql(table, prefix):
+    return ' || '.join(
+        f"setweight(to_tsvector('english', coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in SEARCH_DOCUMENTS[table]
+    )
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, fields in SEARCH_DOCUMENTS.items():
+        columns = ', '.join(column for column, _ in fields)
+        schema_editor.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector_sql(table, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {columns}, search_vector ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        schema_editor.execute(f'UPDATE {table} SET search_vector = {_vector_sql(table, "")}')
+        schema_editor.execute(f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)')
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table in SEARCH_DOCUMENTS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_gin')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector_update()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_project_bug_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bug',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
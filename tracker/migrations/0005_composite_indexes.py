@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_search_vectors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['project', '-created_at', '-id'], name='activity_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['bug', '-created_at'], name='activity_bug_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apilog',
+            index=models.Index(fields=['api_name', '-created_at'], name='apilog_api_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['project', '-created_at'], name='bug_project_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['project', 'status'], name='bug_project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(condition=models.Q(('assigned_to__isnull', False)), fields=['assigned_to', '-created_at'], name='bug_assignee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(condition=models.Q(('created_by__isnull', False)), fields=['created_by', '-created_at'], name='bug_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['bug', 'created_at'], name='comment_bug_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apilog',
+            name='db_time',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apilog',
+            name='query_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apilog',
+            name='repeated_query_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
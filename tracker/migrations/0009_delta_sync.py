@@ -0,0 +1,83 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:42
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def populate_change_versions(apps, schema_editor):
+    Bug = apps.get_model('tracker', 'Bug')
+    Comment = apps.get_model('tracker', 'Comment')
+    ChangeCounter = apps.get_model('tracker', 'ChangeCounter')
+
+    # existing rows get distinct versions so a full sync (since=0) returns them
+    last_bug_id = Bug.objects.aggregate(last=Max('id'))['last'] or 0
+    last_comment_id = Comment.objects.aggregate(last=Max('id'))['last'] or 0
+    Bug.objects.update(change_version=F('id'))
+    Comment.objects.update(change_version=F('id') + last_bug_id)
+    ChangeCounter.objects.update_or_create(pk=1, defaults={'value': last_bug_id + last_comment_id})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_project_event_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+                ('purged_version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'ChangeCounter',
+                'verbose_name_plural': 'ChangeCounter',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('BUG', 'Bug'), ('COMMENT', 'Comment')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('project_id', models.PositiveBigIntegerField(null=True)),
+                ('change_version', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+            },
+        ),
+        migrations.AddField(
+            model_name='bug',
+            name='change_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='change_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['change_version'], name='bug_change_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['change_version'], name='comment_change_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['change_version'], name='tombstone_change_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ),
+        migrations.RunPython(populate_change_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bug',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
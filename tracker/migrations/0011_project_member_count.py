@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_member_counts(apps, schema_editor):
+    Project = apps.get_model('tracker', 'Project')
+
+    member_count = Project.members.through.objects.filter(
+        project_id=OuterRef('pk')
+    ).order_by().values('project_id').annotate(total=Count('pk')).values('total')
+    Project.objects.update(member_count=Coalesce(Subquery(member_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_optimistic_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_member_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+SEQUENCE = 'tracker_change_version_seq'
+
+
+def create_change_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Bug = apps.get_model('tracker', 'Bug')
+    Comment = apps.get_model('tracker', 'Comment')
+    Tombstone = apps.get_model('tracker', 'Tombstone')
+    ChangeCounter = apps.get_model('tracker', 'ChangeCounter')
+
+    # continue after every version the counter row handed out
+    last = max(
+        ChangeCounter.objects.aggregate(last=Max('value'))['last'] or 0,
+        *(model.objects.aggregate(last=Max('change_version'))['last'] or 0 for model in (Bug, Comment, Tombstone)),
+    )
+    schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {last + 1}')
+
+
+def drop_change_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_project_member_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bug',
+            name='bug_change_version_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_change_version_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tombstone',
+            name='tombstone_change_version_idx',
+        ),
+        migrations.AddField(
+            model_name='bug',
+            name='change_txid',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='changecounter',
+            name='purged_txid',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='change_txid',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='change_txid',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='bug',
+            index=models.Index(fields=['change_txid', 'change_version'], name='bug_change_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['change_txid', 'change_version'], name='comment_change_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['change_txid', 'change_version'], name='tombstone_change_key_idx'),
+        ),
+        migrations.RunPython(create_change_sequence, drop_change_sequence),
+    ]
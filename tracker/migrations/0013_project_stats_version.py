@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_change_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='stats_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
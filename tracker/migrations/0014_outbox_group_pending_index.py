@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_project_stats_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['group', 'id'], name='outbox_group_pending_idx'),
+        ),
+    ]
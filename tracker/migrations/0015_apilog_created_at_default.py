@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 12:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_outbox_group_pending_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apilog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,6 +1,15 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+
+
+def _include_change_version(save_kwargs) -> None:
+    # the pre_save receiver stamps a new version, a partial save has to write it too
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None and 'change_version' not in update_fields:
+        save_kwargs['update_fields'] = [*update_fields, 'change_version', 'change_txid']
 
 
 class Project(models.Model):
@@ -8,19 +17,53 @@ class Project(models.Model):
     description = models.TextField(blank=True)
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='owned_projects')
     members = models.ManyToManyField(User, related_name='projects', blank=True)
+    bug_count = models.PositiveIntegerField(default=0, editable=False)
+    open_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    in_progress_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    complete_bug_count = models.PositiveIntegerField(default=0, editable=False)
+    # recounted on every members change, see touch_project_on_members_change
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    # last sequence number handed to a project event, see NotificationService.enqueue_project_events
+    event_seq = models.PositiveBigIntegerField(default=0, editable=False)
+    # advanced with every bug change in the project, cached dashboard stats compare it, see SummaryService
+    stats_version = models.PositiveBigIntegerField(default=0, editable=False)
+    # advanced on every api write, checked against If-Match, see claim_version
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # written by a database trigger on PostgreSQL, see migration 0004
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # maintained by BugCounterService, never written from an in-memory instance
+    COUNTER_FIELDS = ('bug_count', 'open_bug_count', 'in_progress_bug_count', 'complete_bug_count')
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so an owner change can invalidate the previous owner's access
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            skipped = {
+                *self.COUNTER_FIELDS, 'member_count', 'event_seq', 'stats_version', 'version', 'search_vector',
+                *self.get_deferred_fields()
+            }
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Project"
         verbose_name_plural = f"{verbose_name}s"
 
-    # TODO: bug count? open bug count?
-
 class Bug(models.Model):
     class StatusChoice(models.TextChoices):
         OPEN = 'OPEN', _('Open')
@@ -40,31 +83,86 @@ class Bug(models.Model):
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_bugs')
     project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='bugs')
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_bugs')
+    # written by a database trigger on PostgreSQL, see migration 0004
+    search_vector = SearchVectorField(null=True, editable=False)
+    # stamped on every write together with the writing transaction, see SyncService
+    change_version = models.PositiveBigIntegerField(default=0, editable=False)
+    change_txid = models.PositiveBigIntegerField(default=0, editable=False)
+    # advanced on every api write, checked against If-Match, see claim_version
+    version = models.PositiveIntegerField(default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} - {self.project.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so counter updates can diff without re-reading the row
+        instance._counted_state = (instance.__dict__.get('project_id'), instance.__dict__.get('status'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            # version only moves through claim_version or F('version') + 1, a stale instance must not write it back
+            skipped = {'version', 'search_vector', *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped and field.name not in skipped
+            ]
+        _include_change_version(kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Bug"
         verbose_name_plural = f"{verbose_name}s"
+        indexes = [
+            models.Index(fields=['project', '-created_at'], name='bug_project_created_idx'),
+            models.Index(fields=['project', 'status'], name='bug_project_status_idx'),
+            models.Index(
+                fields=['assigned_to', '-created_at'], name='bug_assignee_created_idx',
+                condition=models.Q(assigned_to__isnull=False)
+            ),
+            models.Index(
+                fields=['created_by', '-created_at'], name='bug_creator_created_idx',
+                condition=models.Q(created_by__isnull=False)
+            ),
+            models.Index(fields=['change_txid', 'change_version'], name='bug_change_key_idx'),
+        ]
 
 class Comment(models.Model):
     bug = models.ForeignKey(Bug, on_delete=models.CASCADE, related_name='comments')
     commenter = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     message = models.TextField()
+    # stamped on every write together with the writing transaction, see SyncService
+    change_version = models.PositiveBigIntegerField(default=0, editable=False)
+    change_txid = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Comment by {self.commenter.username} on {self.bug.title}"
 
+    def save(self, *args, **kwargs):
+        _include_change_version(kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['created_at']
         verbose_name = "Comment"
         verbose_name_plural = f"{verbose_name}s"
+        indexes = [
+            models.Index(fields=['bug', 'created_at'], name='comment_bug_created_idx'),
+            models.Index(fields=['change_txid', 'change_version'], name='comment_change_key_idx'),
+        ]
 
 class ActivityLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
@@ -78,6 +176,11 @@ class ActivityLog(models.Model):
         ordering = ['created_at']
         verbose_name = "ActivityLog"
         verbose_name_plural = f"{verbose_name}s"
+        indexes = [
+            # keyset pagination of the activity feed walks (created_at, id) per project
+            models.Index(fields=['project', '-created_at', '-id'], name='activity_project_created_idx'),
+            models.Index(fields=['bug', '-created_at'], name='activity_bug_created_idx'),
+        ]
 
 class ApiLog(models.Model):
     class LevelChoice(models.TextChoices):
@@ -91,5 +194,75 @@ class ApiLog(models.Model):
     message = models.CharField(max_length=1000, null=True)
     details = models.TextField()
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    total_time = models.FloatField(null=True, blank=True)
+    query_count = models.PositiveIntegerField(null=True, blank=True)
+    db_time = models.FloatField(null=True, blank=True)
+    repeated_query_count = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['api_name', '-created_at'], name='apilog_api_created_idx'),
+        ]
+class NotificationOutbox(models.Model):
+    class StatusChoice(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        SENT = 'SENT', _('Sent')
+        FAILED = 'FAILED', _('Failed')
+
+    group = models.CharField(max_length=100)
+    # per-project event sequence, null for events outside a project stream
+    seq = models.PositiveBigIntegerField(null=True, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=StatusChoice.choices, default=StatusChoice.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    total_time = models.FloatField(null=True, blank=True)
\ No newline at end of file
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "NotificationOutbox"
+        verbose_name_plural = "NotificationOutbox"
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'], name='outbox_pending_idx',
+                condition=models.Q(status='PENDING')
+            ),
+            models.Index(fields=['status', 'dispatched_at'], name='outbox_status_dispatched_idx'),
+            models.Index(fields=['group', 'seq'], name='outbox_group_seq_idx', condition=models.Q(seq__isnull=False)),
+            models.Index(fields=['group', 'id'], name='outbox_group_pending_idx', condition=models.Q(status='PENDING')),
+        ]
+
+
+class ChangeCounter(models.Model):
+    # single row. the last change version handed out where there is no sequence, see SyncService.allocate_versions
+    value = models.PositiveBigIntegerField(default=0)
+    # newest purged tombstone, older cursors can no longer see every delete
+    purged_txid = models.PositiveBigIntegerField(default=0)
+    purged_version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "ChangeCounter"
+        verbose_name_plural = "ChangeCounter"
+
+class Tombstone(models.Model):
+    class KindChoice(models.TextChoices):
+        BUG = 'BUG', _('Bug')
+        COMMENT = 'COMMENT', _('Comment')
+
+    kind = models.CharField(max_length=10, choices=KindChoice.choices)
+    object_id = models.PositiveBigIntegerField()
+    # plain ids, the rows they pointed to may be gone
+    project_id = models.PositiveBigIntegerField(null=True)
+    change_version = models.PositiveBigIntegerField()
+    change_txid = models.PositiveBigIntegerField(default=0)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tombstone"
+        verbose_name_plural = f"{verbose_name}s"
+        indexes = [
+            models.Index(fields=['change_txid', 'change_version'], name='tombstone_change_key_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
@@ -1,7 +1,13 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from bugtracker.utils.sparse_fields import SparseFieldsMixin
+from bugtracker.utils.values_serializer import Nested, ValuesSerializer
 from tracker.models import Project, Bug, Comment, ActivityLog
 
+BULK_MAX_ITEMS = getattr(settings, 'BUG_BULK', {}).get('MAX_ITEMS', 500)
+MEMBERS_MAX_ITEMS = getattr(settings, 'PROJECT_MEMBERS', {}).get('BULK_MAX_ITEMS', 5000)
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,56 +16,168 @@ class UserSerializer(serializers.ModelSerializer):
             'id', 'username', 'email', 'first_name', 'last_name'
         ]
 
-class ProjectSerializer(serializers.ModelSerializer):
+USER_COLUMNS = {name: name for name in UserSerializer.Meta.fields}
+
+
+def user_id_field():
+    # a user that was not expanded, see SparseFieldsMixin
+    return serializers.PrimaryKeyRelatedField(read_only=True)
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
-    members = UserSerializer(many=True, read_only=True)
-    bug_count = serializers.SerializerMethodField()
+
+    collapsed_fields = {
+        'owner': user_id_field,
+    }
 
     class Meta:
         model = Project
+        # members are paged through /projects/{id}/members/
         fields = [
-            'id', 'name', 'description', 'owner', 'members', 'bug_count', 'created_at', 'updated_at'
+            'id', 'name', 'description', 'owner', 'member_count', 'bug_count', 'open_bug_count',
+            'in_progress_bug_count', 'complete_bug_count', 'version', 'created_at', 'updated_at'
         ]
 
-    def get_bug_count(self, obj):
-        return obj.bugs.count()
-
-
-class BugSerializer(serializers.ModelSerializer):
+class ProjectMembersSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['add', 'remove'])
+    user_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MEMBERS_MAX_ITEMS
+    )
+
+    def validate_user_ids(self, value):
+        return list(dict.fromkeys(value))
+
+class ProjectValuesSerializer(ValuesSerializer):
+    """
+    list fast path for ProjectSerializer
+    """
+    model = Project
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'owner': Nested('owner', USER_COLUMNS),
+        'member_count': 'member_count',
+        'bug_count': 'bug_count',
+        'open_bug_count': 'open_bug_count',
+        'in_progress_bug_count': 'in_progress_bug_count',
+        'complete_bug_count': 'complete_bug_count',
+        'version': 'version',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+class BugSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
     project_name = serializers.CharField(source='project.name', read_only=True)
     comment_count = serializers.SerializerMethodField()
 
+    collapsed_fields = {
+        'created_by': user_id_field,
+        'assigned_to': user_id_field,
+    }
+
     class Meta:
         model = Bug
         fields = [
             'id', 'title', 'description', 'status', 'priority', 'assigned_to', 'project',
-            'project_name', 'created_by', 'comment_count', 'created_at', 'updated_at'
+            'project_name', 'created_by', 'comment_count', 'version', 'created_at', 'updated_at'
         ]
 
     def get_comment_count(self, obj):
+        # annotated by BugViewSet.get_queryset, counted only for freshly saved instances
+        if hasattr(obj, 'comment_count'):
+            return obj.comment_count
         return obj.comments.count()
 
     def create(self, validated_data):
         validated_data['created_by'] = self.context.get('request').user
         return super().create(validated_data)
 
-class CommentSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        # only the changed columns are written, the version was already claimed by the view
+        changed_fields = [field for field, value in validated_data.items() if getattr(instance, field) != value]
+        for field in changed_fields:
+            setattr(instance, field, validated_data[field])
+        instance.save(update_fields=[*changed_fields, 'updated_at'])
+        return instance
+
+class BugValuesSerializer(ValuesSerializer):
+    """
+    list fast path for BugSerializer, expects BugViewSet's comment_count annotation
+    """
+    model = Bug
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'description': 'description',
+        'status': 'status',
+        'priority': 'priority',
+        'assigned_to': Nested('assigned_to', USER_COLUMNS),
+        'project': 'project',
+        'project_name': 'project__name',
+        'created_by': Nested('created_by', USER_COLUMNS),
+        'comment_count': 'comment_count',
+        'version': 'version',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+class BugBulkItemSerializer(serializers.ModelSerializer):
+    # plain ids, existence and access are checked once for the whole batch by BugBulkService
+    project = serializers.IntegerField(source='project_id')
+    assigned_to = serializers.IntegerField(source='assigned_to_id', required=False, allow_null=True)
+
+    class Meta:
+        model = Bug
+        fields = ['title', 'description', 'status', 'priority', 'project', 'assigned_to']
+
+class BugBulkSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['create', 'update', 'close'])
+    bugs = BugBulkItemSerializer(many=True, required=False, allow_empty=False, max_length=BULK_MAX_ITEMS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+    status = serializers.ChoiceField(choices=Bug.StatusChoice.choices, required=False)
+    priority = serializers.ChoiceField(choices=Bug.PriorityChoice.choices, required=False)
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if attrs['action'] == 'create':
+            if 'bugs' not in attrs:
+                raise serializers.ValidationError({'bugs': 'Required for create'})
+            return attrs
+
+        if 'ids' not in attrs:
+            raise serializers.ValidationError({'ids': f'Required for {attrs["action"]}'})
+        attrs['ids'] = list(dict.fromkeys(attrs['ids']))
+
+        attrs['changes'] = {
+            'assigned_to_id' if field == 'assigned_to' else field: attrs[field]
+            for field in ('status', 'priority', 'assigned_to') if field in attrs
+        }
+        if attrs['action'] == 'update' and not attrs['changes']:
+            raise serializers.ValidationError('Update needs at least one of status, priority, assigned_to')
+        return attrs
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     commenter = UserSerializer(read_only=True)
     bug_title = serializers.CharField(source='bug.title', read_only=True)
 
+    collapsed_fields = {
+        'commenter': user_id_field,
+    }
+
     class Meta:
         model = Comment
         fields = [
             'id', 'bug', 'bug_title', 'commenter', 'message', 'created_at', 'updated_at'
         ]
+        # bug comes from the url and commenter from the request, see CommentViewSet.perform_create
+        read_only_fields = ['bug']
 
-    def create(self, validated_data):
-        validated_data['created_by'] = self.context.get('request').user
-        return super().create(validated_data)
-
-class ActivityLogListSerializer(serializers.ModelSerializer):
+class ActivityLogListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     created_by = serializers.CharField(source='user.username', read_only=True)
     project_name = serializers.CharField(source='project.name', read_only=True)
 
@@ -69,7 +187,21 @@ class ActivityLogListSerializer(serializers.ModelSerializer):
             'id', 'project_name', 'action', 'description', 'created_by', 'created_at'
         ]
 
-class ActivityLogDetailSerializer(serializers.ModelSerializer):
+class ActivityLogListValuesSerializer(ValuesSerializer):
+    """
+    list fast path for ActivityLogListSerializer
+    """
+    model = ActivityLog
+    fields = {
+        'id': 'id',
+        'project_name': 'project__name',
+        'action': 'action',
+        'description': 'description',
+        'created_by': 'user__username',
+        'created_at': 'created_at',
+    }
+
+class ActivityLogDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = serializers.CharField(source='user.username', read_only=True)
     project_name = serializers.CharField(source='project.name', read_only=True)
     bug_title = serializers.CharField(source='bug.title', read_only=True)
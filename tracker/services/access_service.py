@@ -0,0 +1,170 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import QuerySet
+
+from bugtracker.utils.logger import get_logger
+from bugtracker.utils.lru_cache import TTLLRUCache
+from tracker.models import Project
+
+logger = get_logger(__name__)
+
+
+class ProjectAccessService:
+    """
+    ids of the projects a user owns or is a member of, cached per user in each process.
+    an entry is only used while it carries the user's access version from the shared
+    django cache; invalidating deletes the version, which revokes the entry in every worker
+    """
+    _cache = None
+
+    @classmethod
+    def cache(cls) -> TTLLRUCache:
+        """
+        user pk -> (access version, project ids)
+        """
+        if cls._cache is None:
+            config = getattr(settings, 'PROJECT_ACCESS_CACHE', {})
+            cls._cache = TTLLRUCache(
+                max_size=config.get('MAX_USERS', 10000),
+                ttl=config.get('TTL', 60),
+            )
+        return cls._cache
+
+    @staticmethod
+    def shared_cache():
+        return caches[getattr(settings, 'PROJECT_ACCESS_CACHE', {}).get('CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _version_key(user_id) -> str:
+        return f'project-access-version:{user_id}'
+
+    @classmethod
+    def _get_version(cls, user_id) -> str | None:
+        """
+        :return: the user's access version, created when missing; None when it cannot be read,
+                 then nothing is cached
+        """
+        key = cls._version_key(user_id)
+        try:
+            version = cls.shared_cache().get(key)
+            if version is None:
+                cls.shared_cache().add(key, uuid.uuid4().hex, timeout=None)
+                # None again when an invalidation deleted it in between
+                version = cls.shared_cache().get(key)
+        except Exception as err:
+            logger.warning(f'Project access version of user-{user_id} unavailable | {err}')
+            return None
+        return version
+
+    @classmethod
+    async def _aget_version(cls, user_id) -> str | None:
+        key = cls._version_key(user_id)
+        try:
+            version = await cls.shared_cache().aget(key)
+            if version is None:
+                await cls.shared_cache().aadd(key, uuid.uuid4().hex, timeout=None)
+                version = await cls.shared_cache().aget(key)
+        except Exception as err:
+            logger.warning(f'Project access version of user-{user_id} unavailable | {err}')
+            return None
+        return version
+
+    @classmethod
+    def _lookup(cls, user, version) -> frozenset | None:
+        cached = cls.cache().get(user.pk)
+        if version is None or cached is None or cached[0] != version:
+            return None
+        return cached[1]
+
+    @classmethod
+    def get_cached_project_ids(cls, user) -> frozenset | None:
+        """
+        :return: frozenset: project ids when the cached entry is current, None otherwise
+        """
+        if not user or not user.is_authenticated:
+            return frozenset()
+        return cls._lookup(user, cls._get_version(user.pk))
+
+    @classmethod
+    async def aget_cached_project_ids(cls, user) -> frozenset | None:
+        if not user or not user.is_authenticated:
+            return frozenset()
+        return cls._lookup(user, await cls._aget_version(user.pk))
+
+    @classmethod
+    def get_accessible_project_ids(cls, user) -> frozenset:
+        """
+        get ids of all projects the user owns or is a member of
+        :param user: auth user
+        :return: frozenset: project ids
+        """
+        if not user or not user.is_authenticated:
+            return frozenset()
+
+        version = cls._get_version(user.pk)
+        project_ids = cls._lookup(user, version)
+        if project_ids is None:
+            project_ids = frozenset(cls._accessible_ids_query(user))
+            if version is not None:
+                cls.cache().set(user.pk, (version, project_ids))
+        return project_ids
+
+    @classmethod
+    async def aget_accessible_project_ids(cls, user) -> frozenset:
+        if not user or not user.is_authenticated:
+            return frozenset()
+
+        version = await cls._aget_version(user.pk)
+        project_ids = cls._lookup(user, version)
+        if project_ids is None:
+            project_ids = frozenset([project_id async for project_id in cls._accessible_ids_query(user)])
+            if version is not None:
+                cls.cache().set(user.pk, (version, project_ids))
+        return project_ids
+
+    @staticmethod
+    def _accessible_ids_query(user) -> QuerySet:
+        # a UNION of two indexed lookups, OR across the members join cannot use an index
+        owned = Project.objects.filter(owner_id=user.pk).order_by().values_list('id', flat=True)
+        joined = Project.members.through.objects.filter(
+            user_id=user.pk
+        ).order_by().values_list('project_id', flat=True)
+        return owned.union(joined)
+
+    @classmethod
+    def has_access(cls, user, project_id) -> bool:
+        try:
+            return int(project_id) in cls.get_accessible_project_ids(user)
+        except (TypeError, ValueError):
+            return False
+
+    @classmethod
+    def invalidate_users(cls, user_ids) -> None:
+        """
+        delete the users' access versions now and again on commit, so a concurrent read
+        cannot cache the pre-commit state under a version that outlives the transaction
+        :param user_ids: iterable of user pks, None entries are ignored
+        :return:
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+
+        cls._delete_versions(user_ids)
+        transaction.on_commit(lambda: cls._delete_versions(user_ids))
+
+    @classmethod
+    def _delete_versions(cls, user_ids) -> None:
+        cls.cache().delete_many(user_ids)
+        try:
+            cls.shared_cache().delete_many([cls._version_key(user_id) for user_id in user_ids])
+        except Exception as err:
+            # other workers keep their entries until the TTL
+            logger.error(f'Failed to revoke cached project access of users {sorted(user_ids)} | {err}')
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.cache().clear()
@@ -1,36 +1,44 @@
-from django.db import models
 from django.db.models import QuerySet
 from django.core.exceptions import PermissionDenied
 
-from tracker.models import Project, ActivityLog
+from bugtracker.utils.async_queries import gather_queries
+from tracker.models import ActivityLog
+from tracker.services.access_service import ProjectAccessService
 
 
 class ActivityService:
     @classmethod
-    def get_user_projects(cls, user) -> QuerySet:
+    def get_user_project_ids(cls, user) -> frozenset:
         """
-        get all projects the user owns or is a member of
+        get ids of all projects the user owns or is a member of
         :param user: auth user
-        :return: QuerySet: projects user has access to
+        :return: frozenset: ids of projects user has access to
         """
         if not user or not user.is_authenticated:
             raise PermissionDenied('Authentication required')
 
-        return Project.objects.filter(
-            models.Q(owner=user) | models.Q(members=user)
-        ).distinct()
+        return ProjectAccessService.get_accessible_project_ids(user)
 
     @classmethod
     def get_user_activity_list(cls, user) -> QuerySet:
-        user_projects = cls.get_user_projects(user)
+        return cls._activity_queryset(cls.get_user_project_ids(user))
 
-        if not user_projects.exists():
+    @classmethod
+    async def aget_user_activity_list(cls, user) -> QuerySet:
+        if not user or not user.is_authenticated:
+            raise PermissionDenied('Authentication required')
+
+        return cls._activity_queryset(await ProjectAccessService.aget_accessible_project_ids(user))
+
+    @staticmethod
+    def _activity_queryset(project_ids) -> QuerySet:
+        if not project_ids:
             raise PermissionDenied('No accessible project found')
 
         return ActivityLog.objects.select_related(
             'project', 'bug', 'user'
         ).filter(
-            project__in=user_projects
+            project_id__in=project_ids
         )
 
     @classmethod
@@ -44,9 +52,9 @@ class ActivityService:
         if not user or not user.is_authenticated:
             raise PermissionDenied('Authentication required')
 
-        user_projects = cls.get_user_projects(user)
+        project_ids = cls.get_user_project_ids(user)
 
-        if not user_projects.exists():
+        if not project_ids:
             raise PermissionDenied("No accessible projects found")
 
         if not ActivityLog.objects.filter(pk=activity_id).exists():
@@ -57,7 +65,32 @@ class ActivityService:
                 'project', 'bug', 'user'
             ).get(
                 pk=activity_id,
-                project__in=user_projects
+                project_id__in=project_ids
             )
         except ActivityLog.DoesNotExist:
-            raise PermissionDenied("You do not have permission to access this activity")
\ No newline at end of file
+            raise PermissionDenied("You do not have permission to access this activity")
+
+    @classmethod
+    async def aget_user_activity(cls, user, activity_id) -> ActivityLog:
+        """
+        get_user_activity with the access check and the row fetched at the same time
+        """
+        if not user or not user.is_authenticated:
+            raise PermissionDenied('Authentication required')
+
+        activities = ActivityLog.objects.select_related('project', 'bug', 'user').filter(pk=activity_id)
+        project_ids = await ProjectAccessService.aget_cached_project_ids(user)
+        if project_ids is None:
+            project_ids, activity = await gather_queries(
+                lambda: ProjectAccessService.get_accessible_project_ids(user), activities.first
+            )
+        else:
+            activity = await activities.afirst()
+
+        if not project_ids:
+            raise PermissionDenied("No accessible projects found")
+        if activity is None:
+            raise ActivityLog.DoesNotExist(f"Activity-{activity_id} not found")
+        if activity.project_id not in project_ids:
+            raise PermissionDenied("You do not have permission to access this activity")
+        return activity
@@ -0,0 +1,195 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tracker.exceptions.bug_exceptions import BugAccessDeniedError, BugNotFoundError, BugValidationError
+from tracker.models import ActivityLog, Bug, Project
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.bug_counter_service import BugCounterService
+from tracker.services.notification_service import NotificationService
+from tracker.services.response_cache_service import ResponseCacheService
+from tracker.services.search_service import get_search_backend
+from tracker.services.summary_service import SummaryService
+from tracker.services.sync_service import SyncService
+
+
+class BugBulkService:
+    """
+    create/update/close many bugs with one access check and set-based writes.
+    bulk_create/bulk_update skip model signals, so every signal side effect
+    (counters, change versions, caches, search index, notifications) is applied here explicitly
+    """
+    UPDATABLE_FIELDS = ('status', 'priority', 'assigned_to_id')
+
+    @classmethod
+    def create_bugs(cls, request_user: User, items: list) -> list:
+        """
+        :param request_user: creator, needs access to every project
+        :param items: validated bug data, project_id/assigned_to_id as ids
+        :return: list: created bugs with project, created_by and assigned_to set
+        """
+        project_ids = {item['project_id'] for item in items}
+        cls._check_access(request_user, project_ids)
+        assignees = cls._get_assignees(item.get('assigned_to_id') for item in items)
+        projects = Project.objects.only('id', 'name').in_bulk(project_ids)
+
+        with transaction.atomic():
+            versions, txid = SyncService.allocate_versions(len(items))
+            bugs = [
+                Bug(created_by=request_user, change_version=version, change_txid=txid, **item)
+                for version, item in zip(versions, items)
+            ]
+            Bug.objects.bulk_create(bugs)
+
+            for bug in bugs:
+                bug.project = projects[bug.project_id]
+                bug.assigned_to = assignees.get(bug.assigned_to_id)
+                bug._counted_state = (bug.project_id, bug.status)
+                # read by BugSerializer instead of counting
+                bug.comment_count = 0
+
+            BugCounterService.apply_moves((None, bug._counted_state) for bug in bugs)
+            ActivityLog.objects.bulk_create([
+                ActivityLog(
+                    user=request_user,
+                    project_id=bug.project_id,
+                    bug=bug,
+                    action='created',
+                    description=f'Created bug: {bug.title}'
+                )
+                for bug in bugs
+            ])
+            cls._after_write(request_user, bugs, 'bugs_created', changes=None)
+
+        search_backend = get_search_backend()
+        for bug in bugs:
+            search_backend.index_instance(bug)
+        return bugs
+
+    @classmethod
+    def update_bugs(cls, request_user: User, bug_ids: list, changes: dict, event_type='bugs_updated') -> list:
+        """
+        :param request_user: needs access to the project of every bug
+        :param bug_ids: bugs to change, all or nothing
+        :param changes: subset of UPDATABLE_FIELDS -> new value
+        :param event_type: event_type of the project notifications
+        :return: list: ids of the updated bugs
+        """
+        assignees = cls._get_assignees([changes.get('assigned_to_id')])
+
+        accessible = ProjectAccessService.get_accessible_project_ids(request_user)
+        now = timezone.now()
+
+        with transaction.atomic():
+            bugs = list(
+                Bug.objects.select_for_update().filter(
+                    pk__in=bug_ids, project_id__in=accessible
+                ).defer('search_vector').order_by('pk')
+            )
+            missing = set(bug_ids) - {bug.pk for bug in bugs}
+            if missing:
+                raise BugNotFoundError(
+                    message='Some bugs were not found',
+                    details=f'Missing or inaccessible bug ids: {sorted(missing)}'
+                )
+
+            versions, txid = SyncService.allocate_versions(len(bugs))
+            moves, activities = [], []
+            for version, bug in zip(versions, bugs):
+                old_state = (bug.project_id, bug.status)
+                old_values = {field: getattr(bug, field) for field in changes}
+
+                for field, value in changes.items():
+                    setattr(bug, field, value)
+                if 'assigned_to_id' in changes:
+                    bug.assigned_to = assignees.get(bug.assigned_to_id)
+                bug.updated_at = now
+                bug.change_version = version
+                bug.change_txid = txid
+                # stale If-Match writes of these bugs must fail
+                bug.version = F('version') + 1
+
+                bug._counted_state = (bug.project_id, bug.status)
+                moves.append((old_state, bug._counted_state))
+                activities.extend(cls._activities(request_user, bug, old_values, event_type))
+
+            Bug.objects.bulk_update(bugs, [*changes, 'updated_at', 'change_version', 'change_txid', 'version'], batch_size=500)
+            BugCounterService.apply_moves(moves)
+            ActivityLog.objects.bulk_create(activities)
+            cls._after_write(request_user, bugs, event_type, changes)
+
+        return [bug.pk for bug in bugs]
+
+    @classmethod
+    def close_bugs(cls, request_user: User, bug_ids: list) -> list:
+        return cls.update_bugs(
+            request_user, bug_ids, {'status': Bug.StatusChoice.COMPLETE}, event_type='bugs_closed'
+        )
+
+    @staticmethod
+    def _check_access(request_user, project_ids) -> None:
+        denied = set(project_ids) - ProjectAccessService.get_accessible_project_ids(request_user)
+        if denied:
+            raise BugAccessDeniedError(
+                message='Permission denied for some projects',
+                details=f'User-{request_user.username} does not have access to projects {sorted(denied)}'
+            )
+
+    @staticmethod
+    def _get_assignees(user_ids) -> dict:
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        users = User.objects.in_bulk(user_ids) if user_ids else {}
+        missing = user_ids - set(users)
+        if missing:
+            raise BugValidationError(
+                message='Unknown assignee',
+                details=f'No users with ids {sorted(missing)}'
+            )
+        return users
+
+    @staticmethod
+    def _activities(request_user, bug, old_values, event_type) -> list:
+        # same actions a single update or close would log
+        base = dict(user=request_user, project_id=bug.project_id, bug=bug)
+        if event_type == 'bugs_closed':
+            return [ActivityLog(action='status changed', description=f'Closed bug: {bug.title}', **base)]
+
+        activities = []
+        if 'status' in old_values and old_values['status'] != bug.status:
+            activities.append(ActivityLog(
+                action='status_changed',
+                description=f'Changed status from {old_values["status"]} to {bug.status}',
+                **base
+            ))
+        if 'assigned_to_id' in old_values and old_values['assigned_to_id'] != bug.assigned_to_id:
+            assigned_name = bug.assigned_to.username if bug.assigned_to else 'Unassigned'
+            activities.append(ActivityLog(action='assigned', description=f'Assigned bug to {assigned_name}', **base))
+        if not activities:
+            activities.append(ActivityLog(action='updated', description=f'Updated bug: {bug.title}', **base))
+        return activities
+
+    @staticmethod
+    def _after_write(request_user, bugs, event_type, changes) -> None:
+        bug_ids_by_project = {}
+        for bug in bugs:
+            if bug.project_id is not None:
+                bug_ids_by_project.setdefault(bug.project_id, []).append(bug.pk)
+
+        SummaryService.invalidate_projects(bug_ids_by_project)
+        ResponseCacheService.invalidate_projects(bug_ids_by_project)
+
+        for project_id, bug_ids in bug_ids_by_project.items():
+            NotificationService.enqueue_project_event(
+                project_id,
+                {
+                    'type': 'bug_bulk_notification',
+                    'event_type': event_type,
+                    'bug_ids': bug_ids,
+                    'changes': {
+                        field.removesuffix('_id'): value for field, value in changes.items()
+                    } if changes else None,
+                    'project_id': project_id,
+                    'user': request_user.username
+                }
+            )
@@ -0,0 +1,122 @@
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from tracker.models import Project, Bug
+
+
+class BugCounterService:
+    STATUS_COUNTER_FIELDS = {
+        Bug.StatusChoice.OPEN: 'open_bug_count',
+        Bug.StatusChoice.IN_PROGRESS: 'in_progress_bug_count',
+        Bug.StatusChoice.COMPLETE: 'complete_bug_count',
+    }
+
+    @classmethod
+    def _deltas(cls, status, delta) -> dict:
+        deltas = {'bug_count': delta}
+        status_field = cls.STATUS_COUNTER_FIELDS.get(status)
+        if status_field:
+            deltas[status_field] = delta
+        return deltas
+
+    @classmethod
+    def apply(cls, project_id, deltas: dict) -> None:
+        """
+        apply counter deltas to a project with a single UPDATE
+        :param project_id: pk of project, ignored when None
+        :param deltas: counter field -> signed increment
+        :return:
+        """
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if project_id is None or not deltas:
+            return
+
+        # counters are part of the project representation, updated_at feeds its ETag
+        Project.objects.filter(pk=project_id).update(updated_at=timezone.now(), **{
+            field: Greatest(F(field) + Value(delta), Value(0))
+            for field, delta in deltas.items()
+        })
+
+    @classmethod
+    def on_bug_saved(cls, bug: Bug, created: bool) -> None:
+        """
+        move the bug's contribution from its previous project/status to the current one
+        :param bug: saved bug
+        :param created: whether the bug was just inserted
+        :return:
+        """
+        new_state = (bug.project_id, bug.status)
+        old_state = None if created else getattr(bug, '_counted_state', None)
+
+        if not created and old_state is None:
+            # instance was not loaded from the db, nothing to diff against
+            old_state = new_state
+
+        if old_state != new_state:
+            cls._move(old_state, new_state)
+
+        bug._counted_state = new_state
+
+    @classmethod
+    def on_bug_deleted(cls, bug: Bug) -> None:
+        state = getattr(bug, '_counted_state', None) or (bug.project_id, bug.status)
+        cls._move(state, None)
+
+    @classmethod
+    def _move(cls, old_state, new_state) -> None:
+        cls.apply_moves([(old_state, new_state)])
+
+    @classmethod
+    def apply_moves(cls, moves) -> None:
+        """
+        apply many bug moves with one UPDATE per affected project, for bulk writes that skip signals
+        :param moves: iterable of (old_state, new_state), each (project_id, status) or None
+        :return:
+        """
+        per_project = {}
+
+        for old_state, new_state in moves:
+            for state, sign in ((old_state, -1), (new_state, 1)):
+                if state is None:
+                    continue
+                project_id, status = state
+                deltas = per_project.setdefault(project_id, {})
+                for field, delta in cls._deltas(status, sign).items():
+                    deltas[field] = deltas.get(field, 0) + delta
+
+        for project_id, deltas in per_project.items():
+            cls.apply(project_id, deltas)
+
+    @classmethod
+    def rebuild(cls, project_ids=None) -> int:
+        """
+        recompute stored counters from the bug table
+        :param project_ids: limit to these projects, all when None
+        :return: int: number of projects whose counters changed
+        """
+        projects = Project.objects.all()
+        if project_ids:
+            projects = projects.filter(pk__in=project_ids)
+
+        counts = projects.annotate(
+            actual_bug_count=Count('bugs'),
+            actual_open_bug_count=Count('bugs', filter=Q(bugs__status=Bug.StatusChoice.OPEN)),
+            actual_in_progress_bug_count=Count('bugs', filter=Q(bugs__status=Bug.StatusChoice.IN_PROGRESS)),
+            actual_complete_bug_count=Count('bugs', filter=Q(bugs__status=Bug.StatusChoice.COMPLETE)),
+        ).only('pk', *Project.COUNTER_FIELDS)
+
+        stale = []
+        for project in counts.iterator(chunk_size=1000):
+            changed = False
+            for field in Project.COUNTER_FIELDS:
+                actual = getattr(project, f'actual_{field}')
+                if getattr(project, field) != actual:
+                    setattr(project, field, actual)
+                    changed = True
+            if changed:
+                project.updated_at = timezone.now()
+                stale.append(project)
+
+        Project.objects.bulk_update(stale, [*Project.COUNTER_FIELDS, 'updated_at'], batch_size=1000)
+        return len(stale)
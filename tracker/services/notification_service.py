@@ -0,0 +1,252 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, Min, OuterRef, Q
+from django.utils import timezone
+
+from bugtracker.utils import fast_json
+from bugtracker.utils.logger import get_logger
+from tracker.models import NotificationOutbox, Project
+
+logger = get_logger(__name__)
+
+
+def project_group(project_id) -> str:
+    return f'project_{project_id}'
+
+
+# fields of the websocket frame sent for each group event type
+FRAME_FIELDS = {
+    'bug_notification': (
+        'type', 'seq', 'event_type', 'bug_id', 'bug_title', 'bug_status', 'project_id', 'user'
+    ),
+    'bug_bulk_notification': ('type', 'seq', 'event_type', 'bug_ids', 'changes', 'project_id', 'user'),
+    'comment_notification': (
+        'type', 'seq', 'comment_id', 'bug_id', 'bug_title', 'commenter', 'message', 'project_id', 'created_at'
+    ),
+    'typing_indicator': ('type', 'user', 'bug_id', 'is_typing'),
+    'activity_log': ('type', 'activity'),
+}
+
+
+def encode_frame(event: dict) -> str:
+    """
+    the text frame clients receive for a group event. encoded once by the sender and
+    carried in the group message, so every socket in the group reuses the same string
+    """
+    return fast_json.dumps_str({field: event.get(field) for field in FRAME_FIELDS[event['type']]})
+
+
+def with_frame(event: dict) -> dict:
+    if event.get('type') not in FRAME_FIELDS:
+        return event
+    return {'type': event['type'], 'seq': event.get('seq'), 'frame': encode_frame(event)}
+
+
+class NotificationService:
+    @staticmethod
+    def enqueue(group: str, payload: dict) -> NotificationOutbox:
+        """
+        write a websocket notification to the outbox. call inside the transaction
+        of the change it describes so it is only sent if that change commits
+        :param group: channel layer group
+        :param payload: consumer event, 'type' names the consumer handler
+        :return: NotificationOutbox
+        """
+        return NotificationOutbox.objects.create(group=group, payload=payload)
+
+    @staticmethod
+    def enqueue_many(group: str, payloads: list) -> list:
+        return NotificationOutbox.objects.bulk_create(
+            [NotificationOutbox(group=group, payload=payload) for payload in payloads]
+        )
+
+    @staticmethod
+    def enqueue_project_event(project_id, payload: dict) -> NotificationOutbox | None:
+        rows = NotificationService.enqueue_project_events(project_id, [payload])
+        return rows[0] if rows else None
+
+    @staticmethod
+    def enqueue_project_events(project_id, payloads: list) -> list:
+        """
+        write events to the project stream, numbered with the next per-project sequence numbers.
+        the counter update locks the project row until commit, so numbers commit in order.
+        a project deleted meanwhile has no stream left, its events are dropped
+        :param project_id: project pk
+        :param payloads: consumer events, each gets a 'seq' key
+        :return: list: NotificationOutbox rows, empty when the project is gone
+        """
+        if not payloads:
+            return []
+
+        if not Project.objects.filter(pk=project_id).update(event_seq=F('event_seq') + len(payloads)):
+            logger.info(f'Project-{project_id} no longer exists, dropped {len(payloads)} event(s)')
+            return []
+        # the updated row stays locked, it cannot be deleted before this transaction ends
+        last_seq = Project.objects.filter(pk=project_id).values_list('event_seq', flat=True).get()
+
+        group = project_group(project_id)
+        rows = []
+        for seq, payload in enumerate(payloads, start=last_seq - len(payloads) + 1):
+            payload = {**payload, 'seq': seq}
+            rows.append(NotificationOutbox(group=group, seq=seq, payload=payload))
+        return NotificationOutbox.objects.bulk_create(rows)
+
+    @staticmethod
+    def get_project_events_since(project_id, last_seq: int, limit=None) -> tuple:
+        """
+        events a client missed, read from the outbox rows kept for the retention window
+        :param project_id: project pk
+        :param last_seq: last sequence number the client has seen
+        :param limit: most events replayed, a larger gap needs a full resync
+        :return: tuple: (payloads in seq order, current seq, resync required)
+        """
+        if limit is None:
+            limit = getattr(settings, 'NOTIFICATION_OUTBOX', {}).get('REPLAY_LIMIT', 500)
+
+        current_seq = Project.objects.filter(pk=project_id).values_list('event_seq', flat=True).first() or 0
+        missed = current_seq - last_seq
+        if missed == 0:
+            return [], current_seq, False
+        if missed < 0 or missed > limit:
+            return [], current_seq, True
+
+        payloads = list(
+            NotificationOutbox.objects.filter(
+                group=project_group(project_id),
+                seq__gt=last_seq,
+                seq__lte=current_seq
+            ).order_by('seq').values_list('payload', flat=True)
+        )
+        # purged rows leave a gap that cannot be replayed
+        if len(payloads) != missed:
+            return [], current_seq, True
+        return payloads, current_seq, False
+
+    @staticmethod
+    def get_outbox_stats(window_seconds=60) -> dict:
+        """
+        lag and throughput read from the outbox table, so they cover every dispatcher process
+        """
+        now = timezone.now()
+        stats = NotificationOutbox.objects.aggregate(
+            pending=Count('pk', filter=Q(status=NotificationOutbox.StatusChoice.PENDING)),
+            failed=Count('pk', filter=Q(status=NotificationOutbox.StatusChoice.FAILED)),
+            oldest_pending=Min('created_at', filter=Q(status=NotificationOutbox.StatusChoice.PENDING)),
+            sent_in_window=Count('pk', filter=Q(
+                status=NotificationOutbox.StatusChoice.SENT,
+                dispatched_at__gte=now - timedelta(seconds=window_seconds)
+            )),
+        )
+        oldest_pending = stats.pop('oldest_pending')
+        stats['lag_seconds'] = (now - oldest_pending).total_seconds() if oldest_pending else 0.0
+        stats['sent_per_second'] = stats.pop('sent_in_window') / window_seconds
+        return stats
+
+
+class NotificationDispatcher:
+    """
+    drains the outbox in id order, sending one channel layer message per group per batch.
+    failed groups are retried with exponential backoff until max_attempts, their later rows
+    are held back meanwhile. one dispatcher per database keeps a group's events in order
+    """
+
+    def __init__(self, batch_size=None, max_attempts=None, channel_layer=None):
+        config = getattr(settings, 'NOTIFICATION_OUTBOX', {})
+        self.batch_size = batch_size or config.get('BATCH_SIZE', 500)
+        self.max_attempts = max_attempts or config.get('MAX_ATTEMPTS', 5)
+        self.max_backoff = config.get('MAX_BACKOFF_SECONDS', 60)
+        self.channel_layer = channel_layer or get_channel_layer()
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.group_sends = 0
+
+    def dispatch_once(self) -> int:
+        """
+        send one batch of due notifications
+        :return: int: number of outbox rows handled
+        """
+        now = timezone.now()
+        # a group's rows wait behind its oldest row while that one backs off, events stay in order
+        backing_off = NotificationOutbox.objects.filter(
+            group=OuterRef('group'),
+            id__lt=OuterRef('id'),
+            status=NotificationOutbox.StatusChoice.PENDING,
+            available_at__gt=now
+        )
+
+        with transaction.atomic():
+            # id order: a retried row is due again before anything enqueued after it
+            rows = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True).filter(
+                    ~Exists(backing_off),
+                    status=NotificationOutbox.StatusChoice.PENDING,
+                    available_at__lte=now
+                ).order_by('id')[:self.batch_size]
+            )
+            if not rows:
+                return 0
+
+            by_group = {}
+            for row in rows:
+                by_group.setdefault(row.group, []).append(row)
+
+            for group, items in by_group.items():
+                try:
+                    async_to_sync(self.channel_layer.group_send)(
+                        group,
+                        {
+                            'type': 'notification_batch',
+                            'events': [with_frame(item.payload) for item in items]
+                        }
+                    )
+                    self.group_sends += 1
+                except Exception as err:
+                    logger.warning(f'Notification dispatch to {group} failed | {err}')
+                    self._mark_failed(items, str(err), now)
+                else:
+                    for item in items:
+                        item.status = NotificationOutbox.StatusChoice.SENT
+                        item.dispatched_at = now
+                    self.sent += len(items)
+
+            NotificationOutbox.objects.bulk_update(
+                rows, ['status', 'attempts', 'last_error', 'available_at', 'dispatched_at']
+            )
+        return len(rows)
+
+    def _mark_failed(self, items, error, now) -> None:
+        for item in items:
+            item.attempts += 1
+            item.last_error = error[:1000]
+            if item.attempts >= self.max_attempts:
+                item.status = NotificationOutbox.StatusChoice.FAILED
+                item.dispatched_at = now
+                self.failed += 1
+            else:
+                backoff = min(2 ** item.attempts, self.max_backoff)
+                item.available_at = now + timedelta(seconds=backoff)
+                self.retried += 1
+
+    def purge(self, older_than: timedelta) -> int:
+        """
+        delete sent rows dispatched before now - older_than
+        """
+        deleted, _ = NotificationOutbox.objects.filter(
+            status=NotificationOutbox.StatusChoice.SENT,
+            dispatched_at__lt=timezone.now() - older_than
+        ).delete()
+        return deleted
+
+    def stats(self) -> dict:
+        return {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retried': self.retried,
+            'group_sends': self.group_sends,
+        }
@@ -1,22 +1,78 @@
-from django.db import models
-from django.db.models import QuerySet, Q
+from django.db import transaction
+from django.db.models import QuerySet
 
+from bugtracker.utils.conditional import claim_version
 from bugtracker.utils.logger import get_logger
 from tracker.models import Project, ActivityLog, User
-from tracker.exceptions.project_exceptions import ProjectNotFoundError, ProjectAccessDeniedError, ProjectUpdateError, ProjectCreationError, ProjectDeletionError
+from tracker.services.access_service import ProjectAccessService
+from tracker.exceptions.project_exceptions import ProjectNotFoundError, ProjectAccessDeniedError, ProjectConflictError, ProjectUpdateError, ProjectValidationError, ProjectCreationError, ProjectDeletionError
 
 
 logger = get_logger(__name__)
 
 class ProjectService:
     @staticmethod
-    def get_project_list(request_user: User) -> QuerySet:
+    def get_project_list(request_user: User, with_owner=True) -> QuerySet:
+        """
+        :param with_owner: join the owner
+        :return: QuerySet
+        """
         qs = Project.objects.filter(
-            models.Q(owner=request_user) | models.Q(members=request_user)
-        ).distinct().select_related('owner').prefetch_related('members')
+            pk__in=ProjectAccessService.get_accessible_project_ids(request_user)
+        ).defer('search_vector')
+
+        if with_owner:
+            qs = qs.select_related('owner')
 
         return qs.order_by("-created_at")
 
+    @staticmethod
+    def get_member_list(request_user: User, project_id: int) -> QuerySet:
+        project = ProjectService.get_project_by_id(request_user, project_id)
+        return User.objects.filter(projects=project).order_by('id')
+
+    @staticmethod
+    def change_members(request_user: User, project_id: int, user_ids: list, add: bool) -> Project:
+        """
+        add or remove many members with one batched m2m write
+        :param user_ids: distinct user pks
+        :param add: add when True, remove otherwise
+        :return: Project: with member_count refreshed
+        """
+        project = ProjectService.get_project_by_id(request_user, project_id)
+
+        if project.owner_id != request_user.pk:
+            raise ProjectAccessDeniedError(
+                message=f"Permission denied for project-{project_id}",
+                details=f"Only project owner can manage members of project-{project_id}"
+            )
+
+        if add:
+            found = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+            missing = set(user_ids) - found
+            if missing:
+                raise ProjectValidationError(
+                    message='Unknown users',
+                    details=f'No users with ids {sorted(missing)}'
+                )
+
+        with transaction.atomic():
+            # add() inserts only the missing links, remove() is a single DELETE; both signal once with every id
+            if add:
+                project.members.add(*user_ids)
+            else:
+                project.members.remove(*user_ids)
+
+            ActivityLog.objects.create(
+                user=request_user,
+                project=project,
+                action='updated',
+                description=f"{'Added' if add else 'Removed'} {len(user_ids)} member(s)"
+            )
+
+        project.refresh_from_db(fields=['member_count', 'updated_at'])
+        return project
+
     @staticmethod
     def create_project(validated_data: dict, request_user: User) -> Project:
         try:
@@ -52,8 +108,7 @@ class ProjectService:
                 details=f"Project-{project_id} does not exist"
             )
         else:
-            has_access = project.owner == request_user or request_user in project.members.all()
-            if not has_access:
+            if not ProjectAccessService.has_access(request_user, project.pk):
                 raise ProjectAccessDeniedError(
                     message=f"Permission denied for project-{project_id}",
                     details=f"User-{request_user.username} does not have access to project-{project_id}"
@@ -61,19 +116,35 @@ class ProjectService:
             return project
 
     @staticmethod
-    def update_project(request_user: User, project_id: int, validated_data: dict) -> Project:
+    def update_project(request_user: User, project_id: int, validated_data: dict, expected_version: int = None) -> Project:
+        """
+        write only the changed columns, refusing if the project moved past expected_version
+        :param expected_version: version the client read (If-Match), defaults to the one loaded here
+        :return: Project
+        """
         project = ProjectService.get_project_by_id(request_user, project_id)
 
         original_name = project.name
         changes = []
+        changed_fields = []
+
+        for key, value in validated_data.items():
+            old_value = getattr(project, key, None)
+            if old_value != value:
+                setattr(project, key, value)
+                changes.append(f"{key}: {old_value} -> {value}")
+                changed_fields.append(key)
 
         try:
-            for key, value in validated_data.items():
-                old_value = getattr(project, key, None)
-                if old_value != value:
-                    setattr(project, key, value)
-                    changes.append(f"{key}: {old_value} -> {value}")
-            project.save()
+            with transaction.atomic():
+                if not claim_version(project, expected_version):
+                    raise ProjectConflictError(
+                        message=f"Project-{project.pk} was modified by someone else",
+                        details=f"Expected version {expected_version or project.version}, reload and retry"
+                    )
+                project.save(update_fields=[*changed_fields, 'updated_at'])
+        except ProjectConflictError:
+            raise
         except Exception as err:
             logger.error(f'Failed to update project-{project.pk} | {err}')
             raise ProjectUpdateError(
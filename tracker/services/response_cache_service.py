@@ -0,0 +1,52 @@
+from django.db import transaction
+
+from bugtracker.utils.response_cache import CachedResponseMixin, bump_tags
+from tracker.services.access_service import ProjectAccessService
+
+
+def project_tag(project_id) -> str:
+    return f'project:{project_id}'
+
+
+def user_tag(user_id) -> str:
+    return f'user:{user_id}'
+
+
+class ResponseCacheService:
+    """
+    tags for cached read responses: one per project the response may include, plus one
+    for the user's access, since gaining a project changes their lists without touching it
+    """
+
+    @staticmethod
+    def get_user_tags(user) -> list:
+        project_ids = ProjectAccessService.get_accessible_project_ids(user)
+        return [user_tag(user.pk), *(project_tag(project_id) for project_id in project_ids)]
+
+    @staticmethod
+    def invalidate_projects(project_ids) -> None:
+        """
+        bump now and again on commit, so a read racing the transaction cannot keep the old state
+        :param project_ids: iterable of project pks, None entries are ignored
+        :return:
+        """
+        tags = {project_tag(project_id) for project_id in project_ids if project_id is not None}
+        if tags:
+            bump_tags(tags)
+            transaction.on_commit(lambda: bump_tags(tags))
+
+    @staticmethod
+    def invalidate_users(user_ids) -> None:
+        tags = {user_tag(user_id) for user_id in user_ids if user_id is not None}
+        if tags:
+            bump_tags(tags)
+            transaction.on_commit(lambda: bump_tags(tags))
+
+
+class ProjectCachedResponseMixin(CachedResponseMixin):
+    """
+    response caching for views whose output is limited to the user's accessible projects
+    """
+
+    def get_cache_tags(self):
+        return ResponseCacheService.get_user_tags(self.request.user)
@@ -0,0 +1,228 @@
+import bisect
+import heapq
+import re
+import threading
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import Case, F, FloatField, QuerySet, Value, When
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from tracker.models import Project, Bug
+
+
+# searchable text per model with its weight, highest first
+SEARCH_DOCUMENTS = {
+    Bug: (('title', 'A'), ('description', 'B')),
+    Project: (('name', 'A'), ('description', 'B')),
+}
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text) -> list:
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+class BaseSearchBackend:
+    def search(self, queryset: QuerySet, text: str, rank: bool = True) -> QuerySet:
+        """
+        narrow queryset to rows matching every term (prefix match on the last characters typed)
+        :param queryset: queryset of a model in SEARCH_DOCUMENTS
+        :param text: raw ?search= value
+        :param rank: order by relevance ahead of the existing ordering
+        :return: QuerySet
+        """
+        raise NotImplementedError
+
+    def index_instance(self, instance) -> None:
+        pass
+
+    def remove_instance(self, instance) -> None:
+        pass
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    uses the weighted search_vector column that the tracker triggers keep current on write,
+    served by a GIN index
+    """
+    config = 'english'
+
+    def search(self, queryset, text, rank=True):
+        terms = tokenize(text)
+        if not terms:
+            return queryset
+
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=self.config)
+        queryset = queryset.filter(search_vector=query)
+
+        if rank:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.annotate(
+                search_rank=SearchRank(F('search_vector'), query)
+            ).order_by('-search_rank', *ordering)
+        return queryset
+
+
+class _ModelIndex:
+    WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = SEARCH_DOCUMENTS[model]
+        self.postings = {}
+        self.documents = {}
+        self._sorted_tokens = []
+        self._dirty = False
+
+    def build(self):
+        names = [name for name, _ in self.fields]
+        rows = self.model._default_manager.values_list('pk', *names)
+        for pk, *values in rows.iterator(chunk_size=2000):
+            self.add(pk, values)
+
+    def add(self, pk, values):
+        self.remove(pk)
+
+        scores = {}
+        for (_, weight), value in zip(self.fields, values):
+            for token in tokenize(value):
+                scores[token] = scores.get(token, 0.0) + self.WEIGHTS[weight]
+
+        for token, score in scores.items():
+            self.postings.setdefault(token, {})[pk] = score
+        self.documents[pk] = tuple(scores)
+        self._dirty = True
+
+    def remove(self, pk):
+        for token in self.documents.pop(pk, ()):
+            matches = self.postings.get(token)
+            if matches is None:
+                continue
+            matches.pop(pk, None)
+            if not matches:
+                del self.postings[token]
+        self._dirty = True
+
+    def match(self, terms) -> dict:
+        """
+        :return: dict: pk -> score for documents containing a prefix match of every term
+        """
+        if self._dirty:
+            self._sorted_tokens = sorted(self.postings)
+            self._dirty = False
+
+        result = None
+        for term in terms:
+            scores = {}
+            start = bisect.bisect_left(self._sorted_tokens, term)
+            for token in self._sorted_tokens[start:]:
+                if not token.startswith(term):
+                    break
+                for pk, score in self.postings[token].items():
+                    scores[pk] = scores.get(pk, 0.0) + score
+
+            if result is None:
+                result = scores
+            else:
+                result = {pk: result[pk] + score for pk, score in scores.items() if pk in result}
+            if not result:
+                return {}
+        return result or {}
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """
+    in-process inverted index for SQLite and tests. built from the table on first
+    search and kept current by signals, so it only sees writes made by this process.
+    only the max_candidates best scoring matches the queryset can see reach the ranking query
+    """
+
+    def __init__(self, max_candidates=None):
+        self.max_candidates = max_candidates or getattr(settings, 'SEARCH_MAX_CANDIDATES', 1000)
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _get_index(self, model) -> _ModelIndex:
+        index = self._indexes.get(model)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(model)
+                if index is None:
+                    index = _ModelIndex(model)
+                    index.build()
+                    self._indexes[model] = index
+        return index
+
+    def search(self, queryset, text, rank=True):
+        terms = tokenize(text)
+        if not terms:
+            return queryset
+
+        index = self._get_index(queryset.model)
+        with self._lock:
+            scores = index.match(terms)
+
+        if len(scores) > self.max_candidates:
+            # cap what the caller can see, not the whole table: other projects' matches must not crowd it out
+            visible = set(queryset.order_by().filter(pk__in=list(scores)).values_list('pk', flat=True))
+            scores = {pk: score for pk, score in scores.items() if pk in visible}
+            scores = dict(heapq.nlargest(self.max_candidates, scores.items(), key=lambda item: (item[1], -item[0])))
+
+        queryset = queryset.filter(pk__in=list(scores))
+        if rank and scores:
+            # scores are sums of a few weights, one WHEN per distinct score keeps the CASE small
+            pks_by_score = {}
+            for pk, score in scores.items():
+                pks_by_score.setdefault(score, []).append(pk)
+
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.annotate(
+                search_rank=Case(
+                    *(When(pk__in=pks, then=Value(score)) for score, pks in pks_by_score.items()),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+            ).order_by('-search_rank', *ordering)
+        return queryset
+
+    def index_instance(self, instance):
+        index = self._indexes.get(type(instance))
+        if index is not None:
+            with self._lock:
+                index.add(instance.pk, [getattr(instance, name) for name, _ in index.fields])
+
+    def remove_instance(self, instance):
+        index = self._indexes.get(type(instance))
+        if index is not None:
+            with self._lock:
+                index.remove(instance.pk)
+
+
+_backend = None
+
+
+@receiver(setting_changed)
+def reset_search_backend(setting, **kwargs):
+    global _backend
+    if setting in ('SEARCH_BACKEND', 'SEARCH_MAX_CANDIDATES'):
+        _backend = None
+
+
+def get_search_backend() -> BaseSearchBackend:
+    """
+    SEARCH_BACKEND is a dotted path, or 'auto' to pick by database vendor
+    """
+    global _backend
+
+    if _backend is None:
+        path = getattr(settings, 'SEARCH_BACKEND', 'auto')
+        if path == 'auto':
+            _backend = PostgresSearchBackend() if connection.vendor == 'postgresql' else InvertedIndexSearchBackend()
+        else:
+            _backend = import_string(path)()
+    return _backend
@@ -1,36 +1,172 @@
-from django.db import models
-from django.db.models import QuerySet
+import threading
+
+from django.conf import settings
+from django.db.models import Count, F, Q
 from django.core.exceptions import PermissionDenied
 
-from tracker.models import Project, Bug
+from bugtracker.utils.async_queries import gather_queries, run_query
+from bugtracker.utils.lru_cache import TTLLRUCache
+from tracker.models import Bug, Project
+from tracker.services.access_service import ProjectAccessService
+
+_EMPTY_STATS = ('total_bugs', 'assigned_to_me', 'created_by_me', 'open_bugs', 'in_progress_bugs', 'complete_bugs')
 
 
 class SummaryService:
+    """
+    dashboard stats are cached per user together with the stats_version of every
+    project they were computed from. any bug change in a project advances its
+    stats_version in the writing transaction, so entries cached by every worker go
+    stale at once; a hit costs one primary key lookup instead of the aggregation
+    """
+    _cache = None
+    _lookups_lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def cache(cls) -> TTLLRUCache:
+        if cls._cache is None:
+            config = getattr(settings, 'DASHBOARD_STATS_CACHE', {})
+            cls._cache = TTLLRUCache(
+                max_size=config.get('MAX_USERS', 10000),
+                ttl=config.get('TTL', 30),
+            )
+        return cls._cache
+
     @classmethod
-    def get_user_projects(cls, user) -> QuerySet:
+    def get_user_project_ids(cls, user) -> frozenset:
         """
-        get all projects the user owns or is a member of
+        get ids of all projects the user owns or is a member of
         :param user: auth user
-        :return: QuerySet: projects user has access to
+        :return: frozenset: ids of projects user has access to
         """
         if not user or not user.is_authenticated:
             raise PermissionDenied('Authentication required')
 
-        return Project.objects.filter(
-            models.Q(owner=user) | models.Q(members=user)
-        ).distinct()
+        return ProjectAccessService.get_accessible_project_ids(user)
 
     @classmethod
     def get_dashboard_stats(cls, user):
-        user_projects = cls.get_user_projects(user)
-        bugs = Bug.objects.filter(project__in=user_projects)
+        project_ids = cls.get_user_project_ids(user)
+        # read before the counts, a write landing in between leaves the entry stale, never wrong
+        fingerprint = cls._fingerprint(project_ids, cls._get_versions(project_ids))
+
+        cached = cls.cache().get(user.pk)
+        if cached is not None and cached[0] == fingerprint:
+            cls._count_lookup(hit=True)
+            return dict(cached[1])
+
+        cls._count_lookup(hit=False)
+        stats = {'total_projects': len(project_ids), **cls._aggregate_bug_stats(user, project_ids)}
+        cls.cache().set(user.pk, (fingerprint, stats))
+        return dict(stats)
+
+    @classmethod
+    async def aget_dashboard_stats(cls, user):
+        if not user or not user.is_authenticated:
+            raise PermissionDenied('Authentication required')
+
+        project_ids = await ProjectAccessService.aget_cached_project_ids(user)
+        if project_ids is None:
+            # the access check and the versions do not depend on each other
+            project_ids, versions = await gather_queries(
+                lambda: ProjectAccessService.get_accessible_project_ids(user),
+                lambda: cls._get_user_versions(user),
+            )
+        else:
+            versions = await run_query(cls._get_versions, project_ids)
+        fingerprint = cls._fingerprint(project_ids, versions)
+
+        cached = cls.cache().get(user.pk)
+        if cached is not None and cached[0] == fingerprint:
+            cls._count_lookup(hit=True)
+            return dict(cached[1])
+
+        cls._count_lookup(hit=False)
+        if project_ids:
+            counts = await Bug.objects.filter(project_id__in=project_ids).aaggregate(**cls._bug_aggregates(user))
+        else:
+            counts = dict.fromkeys(_EMPTY_STATS, 0)
+
+        stats = {'total_projects': len(project_ids), **counts}
+        cls.cache().set(user.pk, (fingerprint, stats))
+        return dict(stats)
+
+    @staticmethod
+    def _get_versions(project_ids) -> dict:
+        """
+        :return: dict: project id -> stats_version
+        """
+        if not project_ids:
+            return {}
+        return dict(Project.objects.filter(pk__in=project_ids).values_list('id', 'stats_version'))
 
+    @staticmethod
+    def _get_user_versions(user) -> dict:
+        """
+        stats_version of every project the user owns or is a member of, without the access lookup
+        """
+        return dict(
+            Project.objects.filter(
+                Q(owner_id=user.pk)
+                | Q(pk__in=Project.members.through.objects.filter(user_id=user.pk).values('project_id'))
+            ).values_list('id', 'stats_version')
+        )
+
+    @classmethod
+    def _aggregate_bug_stats(cls, user, project_ids) -> dict:
+        """
+        every bug count in a single conditional aggregation query
+        :param project_ids: accessible project ids
+        """
+        if not project_ids:
+            return dict.fromkeys(_EMPTY_STATS, 0)
+        return Bug.objects.filter(project_id__in=project_ids).aggregate(**cls._bug_aggregates(user))
+
+    @staticmethod
+    def _bug_aggregates(user) -> dict:
+        return {
+            'total_bugs': Count('pk'),
+            'assigned_to_me': Count('pk', filter=Q(assigned_to_id=user.pk)),
+            'created_by_me': Count('pk', filter=Q(created_by_id=user.pk)),
+            'open_bugs': Count('pk', filter=Q(status=Bug.StatusChoice.OPEN)),
+            'in_progress_bugs': Count('pk', filter=Q(status=Bug.StatusChoice.IN_PROGRESS)),
+            'complete_bugs': Count('pk', filter=Q(status=Bug.StatusChoice.COMPLETE)),
+        }
+
+    @staticmethod
+    def _fingerprint(project_ids, versions) -> tuple:
+        return tuple((project_id, versions.get(project_id, 0)) for project_id in sorted(project_ids))
+
+    @staticmethod
+    def invalidate_projects(project_ids) -> None:
+        """
+        mark cached stats built from these projects as stale, in the caller's transaction
+        :param project_ids: iterable of project pks, None entries are ignored
+        :return:
+        """
+        project_ids = {project_id for project_id in project_ids if project_id is not None}
+        if project_ids:
+            Project.objects.filter(pk__in=project_ids).update(stats_version=F('stats_version') + 1)
+
+    @classmethod
+    def _count_lookup(cls, hit: bool) -> None:
+        with cls._lookups_lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """
+        stale entries count as misses, unlike the raw cache counters
+        """
+        lookups = cls.hits + cls.misses
         return {
-            'total_projects': user_projects.count(),
-            'total_bugs': bugs.count(),
-            'assigned_to_me': bugs.filter(assigned_to=user).count(),
-            'created_by_me': bugs.filter(created_by=user).count(),
-            'open_bugs': bugs.filter(status=Bug.StatusChoice.OPEN).count(),
-            'in_progress_bugs': bugs.filter(status=Bug.StatusChoice.IN_PROGRESS).count(),
-            'complete_bugs': bugs.filter(status=Bug.StatusChoice.COMPLETE).count(),
-        }
\ No newline at end of file
+            'size': cls.cache().stats()['size'],
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'hit_ratio': cls.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,269 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tracker.models import Bug, ChangeCounter, Comment, Tombstone
+from tracker.services.access_service import ProjectAccessService
+
+
+class SyncService:
+    """
+    every bug and comment write is stamped with a change version and the id of its transaction,
+    deletes leave a tombstone stamped the same way. on PostgreSQL versions come from a sequence,
+    so writers never wait on each other, and a version may commit after a higher one. changes
+    are therefore read in (txid, version) order and only from transactions older than every other
+    one still running, see get_horizon; nothing can commit behind a cursor later. elsewhere the
+    ChangeCounter row hands out versions and txid stays 0, the database serializes writers anyway
+    """
+    COUNTER_ID = 1
+    SEQUENCE = 'tracker_change_version_seq'
+
+    @classmethod
+    def allocate_versions(cls, count=1) -> tuple:
+        """
+        :param count: number of versions to reserve
+        :return: tuple: (the versions in ascending order, id of the writing transaction)
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT nextval('{cls.SEQUENCE}'), txid_current() FROM generate_series(1, %s)", [count]
+                )
+                rows = cursor.fetchall()
+            return sorted(version for version, _ in rows), rows[0][1]
+
+        updated = ChangeCounter.objects.filter(pk=cls.COUNTER_ID).update(value=F('value') + count)
+        if not updated:
+            ChangeCounter.objects.get_or_create(pk=cls.COUNTER_ID)
+            ChangeCounter.objects.filter(pk=cls.COUNTER_ID).update(value=F('value') + count)
+        last = ChangeCounter.objects.filter(pk=cls.COUNTER_ID).values_list('value', flat=True).get()
+        return list(range(last - count + 1, last + 1)), 0
+
+    @staticmethod
+    def get_horizon() -> int | None:
+        """
+        :return: int: every other transaction below this id has finished, None where there are no txids
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT txid_snapshot_xmax(snapshot), ARRAY(SELECT txid_snapshot_xip(snapshot)), '
+                'txid_current_if_assigned() FROM txid_current_snapshot() AS snapshot'
+            )
+            xmax, running, own = cursor.fetchone()
+        # the reader's own writes are visible to it and anything it writes later sorts after them
+        return min((txid for txid in running if txid != own), default=xmax)
+
+    @classmethod
+    def stamp(cls, instance) -> None:
+        versions, txid = cls.allocate_versions()
+        instance.change_version, instance.change_txid = versions[0], txid
+
+    @classmethod
+    def touch_bugs(cls, bug_ids) -> None:
+        """
+        re-version bugs whose representation changed without a save, e.g. comment_count,
+        so delta sync and conditional GET see the change
+        :param bug_ids: iterable of bug pks
+        :return:
+        """
+        bug_ids = [bug_id for bug_id in bug_ids if bug_id is not None]
+        if not bug_ids:
+            return
+
+        versions, txid = cls.allocate_versions(len(bug_ids))
+        for bug_id, version in zip(bug_ids, versions):
+            Bug.objects.filter(pk=bug_id).update(
+                updated_at=timezone.now(),
+                change_version=version,
+                change_txid=txid
+            )
+
+    @classmethod
+    def touch_comments(cls, bug_ids) -> None:
+        """
+        re-version the comments of bugs that moved project, clients of the new project never got them
+        :param bug_ids: iterable of bug pks
+        :return:
+        """
+        comment_ids = list(Comment.objects.filter(bug_id__in=bug_ids).order_by('pk').values_list('pk', flat=True))
+        if not comment_ids:
+            return
+
+        versions, txid = cls.allocate_versions(len(comment_ids))
+        Comment.objects.bulk_update(
+            [
+                Comment(pk=comment_id, change_version=version, change_txid=txid)
+                for comment_id, version in zip(comment_ids, versions)
+            ],
+            ['change_version', 'change_txid'],
+            batch_size=500
+        )
+
+    @classmethod
+    def record_deletes(cls, kind, rows) -> None:
+        """
+        write tombstones for deleted rows
+        :param kind: Tombstone.KindChoice
+        :param rows: list of (object_id, project_id)
+        :return:
+        """
+        if not rows:
+            return
+
+        versions, txid = cls.allocate_versions(len(rows))
+        Tombstone.objects.bulk_create([
+            Tombstone(kind=kind, object_id=object_id, project_id=project_id, change_version=version, change_txid=txid)
+            for version, (object_id, project_id) in zip(versions, rows)
+        ])
+
+    @staticmethod
+    def access_key(project_ids) -> str:
+        """
+        fingerprint of the projects a cursor was issued for
+        """
+        return hashlib.sha1(','.join(map(str, sorted(project_ids))).encode()).hexdigest()[:12]
+
+    @classmethod
+    def format_cursor(cls, key, project_ids) -> str:
+        return f'{key[0]}-{key[1]}-{cls.access_key(project_ids)}'
+
+    @staticmethod
+    def parse_cursor(value: str) -> tuple | None:
+        """
+        :param value: cursor from a previous response, 0 for a full sync
+        :return: tuple: (txid, version, access key), None for a full sync
+        :raise ValueError: when the value is not a cursor
+        """
+        value = str(value).strip()
+        if value == '0':
+            return None
+        if value.isdigit():
+            # issued before cursors carried a txid, it gets a resync
+            return 0, int(value), None
+
+        txid, version, access = value.split('-')
+        if not (txid.isdigit() and version.isdigit() and access):
+            raise ValueError(value)
+        return int(txid), int(version), access
+
+    @classmethod
+    def get_changes(cls, user, since: tuple | None, limit=None) -> dict | None:
+        """
+        bugs and comments written, and tombstones for those deleted, after the cursor.
+        each source is read through its (change_txid, change_version) index, so the cost follows the number of changes
+        :param user: auth user, only projects they can access are included
+        :param since: parsed cursor from the previous call, see parse_cursor; None for a full sync
+        :param limit: most changes returned, has_more is set when there are more
+        :return: dict, or None when the client must resync: tombstones after the cursor were purged,
+            or the projects the user can access changed since the cursor was issued, so rows may have
+            to be dropped (access lost) or were never sent (access gained)
+        """
+        if limit is None:
+            limit = getattr(settings, 'SYNC', {}).get('MAX_CHANGES', 500)
+
+        project_ids = ProjectAccessService.get_accessible_project_ids(user)
+        # read first: every row of a transaction below it is already visible to the queries below
+        horizon = cls.get_horizon()
+
+        purged = ChangeCounter.objects.filter(
+            pk=cls.COUNTER_ID
+        ).values_list('purged_txid', 'purged_version').first() or (0, 0)
+
+        after = Q()
+        if since is not None:
+            txid, version, access = since
+            if (txid, version) < purged or access != cls.access_key(project_ids):
+                return None
+            after = Q(change_txid__gt=txid) | Q(change_txid=txid, change_version__gt=version)
+        if horizon is not None:
+            after &= Q(change_txid__lt=horizon)
+
+        comment_count = Comment.objects.filter(
+            bug=OuterRef('pk')
+        ).order_by().values('bug').annotate(total=Count('pk')).values('total')
+
+        bugs = list(
+            Bug.objects.filter(
+                after, project_id__in=project_ids
+            ).select_related(
+                'project', 'created_by', 'assigned_to'
+            ).defer(
+                'search_vector', 'project__search_vector'
+            ).annotate(
+                comment_count=Coalesce(Subquery(comment_count), 0)
+            ).order_by('change_txid', 'change_version')[:limit + 1]
+        )
+        comments = list(
+            Comment.objects.filter(
+                after, bug__project_id__in=project_ids
+            ).select_related(
+                'commenter', 'bug'
+            ).defer(
+                'bug__search_vector'
+            ).order_by('change_txid', 'change_version')[:limit + 1]
+        )
+        tombstones = list(
+            Tombstone.objects.filter(
+                after, project_id__in=project_ids
+            ).order_by('change_txid', 'change_version')[:limit + 1]
+        )
+
+        def key(row):
+            return row.change_txid, row.change_version
+
+        keys = sorted(key(row) for row in (*bugs, *comments, *tombstones))
+        has_more = len(keys) > limit
+        if has_more:
+            cursor = keys[limit - 1]
+        elif since is None:
+            # a completed full sync holds every live row, the purged deletes no longer matter to it
+            cursor = max(keys[-1], purged) if keys else purged
+        else:
+            cursor = keys[-1] if keys else since[:2]
+
+        def upto(rows):
+            return [row for row in rows if key(row) <= cursor]
+
+        bugs, comments = upto(bugs), upto(comments)
+        # a bug that moved between two visible projects comes back as itself, not as a delete
+        current = {Tombstone.KindChoice.BUG: {bug.pk for bug in bugs}, Tombstone.KindChoice.COMMENT: set()}
+        deleted = {kind: [] for kind in Tombstone.KindChoice.values}
+        for tombstone in upto(tombstones):
+            if tombstone.object_id not in current[tombstone.kind]:
+                deleted[tombstone.kind].append(tombstone.object_id)
+
+        return {
+            'bugs': bugs,
+            'comments': comments,
+            'deleted': deleted,
+            'cursor': cls.format_cursor(cursor, project_ids),
+            'has_more': has_more,
+        }
+
+    @classmethod
+    def purge_tombstones(cls, older_than: timedelta) -> int:
+        """
+        delete old tombstones, cursors from before them get a resync
+        :return: int: number of tombstones deleted
+        """
+        newest = Tombstone.objects.filter(
+            deleted_at__lt=timezone.now() - older_than
+        ).order_by('-change_txid', '-change_version').values_list('change_txid', 'change_version').first()
+        if newest is None:
+            return 0
+
+        txid, version = newest
+        counter, _ = ChangeCounter.objects.get_or_create(pk=cls.COUNTER_ID)
+        if (counter.purged_txid, counter.purged_version) < newest:
+            ChangeCounter.objects.filter(pk=cls.COUNTER_ID).update(purged_txid=txid, purged_version=version)
+        deleted, _ = Tombstone.objects.filter(
+            Q(change_txid__lt=txid) | Q(change_txid=txid, change_version__lte=version)
+        ).delete()
+        return deleted
@@ -0,0 +1,191 @@
+import csv
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from bugtracker.utils.logger import get_logger
+from tracker.models import ActivityLog, Bug, Comment, Project
+from tracker.serializers import BugBulkItemSerializer
+from tracker.services.bug_bulk_service import BugBulkService
+
+logger = get_logger(__name__)
+
+
+class ExportService:
+    """
+    project data as flat rows, read through a chunked (server-side on postgres) cursor
+    so memory stays constant however large the project is
+    """
+    # resource -> (model, project lookup, exported columns; related values use their username)
+    RESOURCES = {
+        'bugs': (Bug, 'project_id', {
+            'id': 'id',
+            'title': 'title',
+            'description': 'description',
+            'status': 'status',
+            'priority': 'priority',
+            'assigned_to': 'assigned_to__username',
+            'created_by': 'created_by__username',
+            'created_at': 'created_at',
+            'updated_at': 'updated_at',
+        }),
+        'comments': (Comment, 'bug__project_id', {
+            'id': 'id',
+            'bug_id': 'bug_id',
+            'commenter': 'commenter__username',
+            'message': 'message',
+            'created_at': 'created_at',
+            'updated_at': 'updated_at',
+        }),
+        'activity': (ActivityLog, 'project_id', {
+            'id': 'id',
+            'bug_id': 'bug_id',
+            'user': 'user__username',
+            'action': 'action',
+            'description': 'description',
+            'created_at': 'created_at',
+        }),
+    }
+
+    @classmethod
+    def columns(cls, resource) -> list:
+        return list(cls.RESOURCES[resource][2])
+
+    @classmethod
+    def iter_rows(cls, project_id, resource, chunk_size=None):
+        """
+        :param project_id: project pk, access is checked by the caller
+        :param resource: key of RESOURCES
+        :param chunk_size: rows fetched per round trip
+        :return: generator of dicts keyed by column
+        """
+        if chunk_size is None:
+            chunk_size = getattr(settings, 'DATA_TRANSFER', {}).get('EXPORT_CHUNK_SIZE', 2000)
+
+        model, project_lookup, columns = cls.RESOURCES[resource]
+        rows = model.objects.filter(**{project_lookup: project_id}).order_by('id').values_list(*columns.values())
+        for values in rows.iterator(chunk_size=chunk_size):
+            yield dict(zip(columns, values))
+
+    @staticmethod
+    def ndjson_lines(rows):
+        for row in rows:
+            yield json.dumps(row, default=str) + '\n'
+
+
+class ImportService:
+    """
+    ingest bug rows (as written by ExportService) into a project in batched transactions.
+    each batch goes through BugBulkService, so counters, versions, caches, search and
+    notifications are kept current; a bad row is reported and skipped, a failed batch is
+    reported row by row and the import carries on
+    """
+    COLUMNS = ('title', 'description', 'status', 'priority', 'assigned_to')
+
+    def __init__(self, project: Project, request_user: User, batch_size=None):
+        self.project = project
+        self.request_user = request_user
+        self.batch_size = batch_size or getattr(settings, 'DATA_TRANSFER', {}).get('IMPORT_BATCH_SIZE', 500)
+
+        self.rows = 0
+        self.imported = 0
+        self.errors = []
+        self.started = None
+        self.elapsed = 0.0
+
+    @staticmethod
+    def read_ndjson(stream):
+        """
+        :return: generator of (line number, row dict or None when the line is not valid json)
+        """
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+    @staticmethod
+    def read_csv(stream):
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+    def run(self, numbered_rows) -> dict:
+        """
+        :param numbered_rows: iterable of (line number, row dict or None)
+        :return: dict: stats, see stats()
+        """
+        self.started = time.perf_counter()
+        batch = []
+        for line_number, row in numbered_rows:
+            self.rows += 1
+            if row is None:
+                self.errors.append({'line': line_number, 'errors': 'Not a valid row'})
+                continue
+
+            batch.append((line_number, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+
+        self.elapsed = time.perf_counter() - self.started
+        return self.stats()
+
+    def _import_batch(self, batch) -> None:
+        checked = []
+        for line_number, row in batch:
+            # ndjson values can be any json type, the username lookup below needs a string
+            assignee = row.get('assigned_to') or None
+            if assignee is not None and not isinstance(assignee, str):
+                self.errors.append({'line': line_number, 'errors': {'assigned_to': 'Expected a username'}})
+                continue
+            checked.append((line_number, row, assignee))
+
+        usernames = {assignee for _, _, assignee in checked if assignee}
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+
+        items, lines = [], []
+        for line_number, row, assignee in checked:
+            if assignee and assignee not in user_ids:
+                self.errors.append({'line': line_number, 'errors': {'assigned_to': f'Unknown user {assignee}'}})
+                continue
+
+            data = {column: row[column] for column in self.COLUMNS if row.get(column) not in (None, '')}
+            data['project'] = self.project.pk
+            data['assigned_to'] = user_ids.get(assignee)
+
+            serializer = BugBulkItemSerializer(data=data)
+            if not serializer.is_valid():
+                self.errors.append({'line': line_number, 'errors': serializer.errors})
+                continue
+            items.append(serializer.validated_data)
+            lines.append(line_number)
+
+        if not items:
+            return
+
+        try:
+            BugBulkService.create_bugs(self.request_user, items)
+        except Exception as err:
+            logger.error(f'Import batch into project-{self.project.pk} failed | {err}')
+            self.errors.extend({'line': line_number, 'errors': f'Batch failed: {err}'} for line_number in lines)
+        else:
+            self.imported += len(items)
+
+    def stats(self) -> dict:
+        elapsed = self.elapsed or (time.perf_counter() - self.started if self.started else 0.0)
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'failed': len(self.errors),
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed else 0.0,
+            'errors': self.errors,
+        }
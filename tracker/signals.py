@@ -0,0 +1,192 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tracker.models import ActivityLog, Bug, Comment, Project, Tombstone
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.bug_counter_service import BugCounterService
+from tracker.services.response_cache_service import ResponseCacheService
+from tracker.services.summary_service import SummaryService
+from tracker.services.search_service import get_search_backend
+from tracker.services.sync_service import SyncService
+
+
+# connected before the counter receivers, which overwrite _counted_state
+@receiver(post_save, sender=Bug)
+def invalidate_dashboard_stats_on_bug_save(sender, instance, **kwargs):
+    previous_project_id = getattr(instance, '_counted_state', (None, None))[0]
+    SummaryService.invalidate_projects([previous_project_id, instance.project_id])
+
+@receiver(post_delete, sender=Bug)
+def invalidate_dashboard_stats_on_bug_delete(sender, instance, **kwargs):
+    SummaryService.invalidate_projects([instance.project_id])
+
+@receiver(post_save, sender=Bug)
+def invalidate_response_cache_on_bug_save(sender, instance, **kwargs):
+    previous_project_id = getattr(instance, '_counted_state', (None, None))[0]
+    ResponseCacheService.invalidate_projects([previous_project_id, instance.project_id])
+
+@receiver(post_delete, sender=Bug)
+def invalidate_response_cache_on_bug_delete(sender, instance, **kwargs):
+    ResponseCacheService.invalidate_projects([instance.project_id])
+
+@receiver(post_save, sender=Bug)
+def update_bug_counters_on_save(sender, instance, created, **kwargs):
+    BugCounterService.on_bug_saved(instance, created)
+
+@receiver(post_delete, sender=Bug)
+def update_bug_counters_on_delete(sender, instance, **kwargs):
+    BugCounterService.on_bug_deleted(instance)
+
+@receiver(post_save, sender=Project)
+def invalidate_access_on_owner_change(sender, instance, created, **kwargs):
+    previous_owner_id = getattr(instance, '_loaded_owner_id', None)
+    ResponseCacheService.invalidate_projects([instance.pk])
+    if created or previous_owner_id != instance.owner_id:
+        ProjectAccessService.invalidate_users([previous_owner_id, instance.owner_id])
+        ResponseCacheService.invalidate_users([previous_owner_id, instance.owner_id])
+    instance._loaded_owner_id = instance.owner_id
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_access_on_members_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # the affected users are gone once the rows are cleared
+        if reverse:
+            instance._cleared_member_ids = [instance.pk]
+        else:
+            instance._cleared_member_ids = list(instance.members.values_list('id', flat=True))
+        return
+
+    if action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_member_ids', [])
+    elif action in ('post_add', 'post_remove'):
+        user_ids = [instance.pk] if reverse else pk_set or []
+    else:
+        return
+
+    ProjectAccessService.invalidate_users(user_ids)
+    ResponseCacheService.invalidate_users(user_ids)
+
+@receiver(m2m_changed, sender=Project.members.through)
+def touch_project_on_members_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # member_count is part of the project representation, updated_at feeds its ETag
+    if reverse and action == 'pre_clear':
+        instance._cleared_project_ids = list(instance.projects.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        project_ids = [instance.pk]
+    elif action == 'post_clear':
+        project_ids = getattr(instance, '_cleared_project_ids', [])
+    else:
+        project_ids = pk_set or []
+
+    # recounted rather than adjusted, remove() reports the ids asked for, not the ones removed
+    _recount_members(project_ids)
+
+@receiver(pre_delete, sender=User)
+def remember_projects_on_member_delete(sender, instance, **kwargs):
+    # the cascade drops the member rows without m2m_changed
+    instance._member_project_ids = list(instance.projects.values_list('id', flat=True))
+
+@receiver(post_delete, sender=User)
+def recount_members_on_member_delete(sender, instance, **kwargs):
+    _recount_members(getattr(instance, '_member_project_ids', []))
+
+def _recount_members(project_ids):
+    if not project_ids:
+        return
+    member_count = Project.members.through.objects.filter(
+        project_id=OuterRef('pk')
+    ).order_by().values('project_id').annotate(total=Count('pk')).values('total')
+    Project.objects.filter(pk__in=project_ids).update(
+        updated_at=timezone.now(), member_count=Coalesce(Subquery(member_count), 0)
+    )
+    ResponseCacheService.invalidate_projects(project_ids)
+
+@receiver(pre_delete, sender=Project)
+def invalidate_access_on_project_delete(sender, instance, **kwargs):
+    member_ids = list(instance.members.values_list('id', flat=True))
+    ProjectAccessService.invalidate_users([instance.owner_id, *member_ids])
+    SummaryService.invalidate_projects([instance.pk])
+    ResponseCacheService.invalidate_projects([instance.pk])
+
+@receiver(post_save, sender=Bug)
+@receiver(post_save, sender=Project)
+def update_search_index_on_save(sender, instance, **kwargs):
+    get_search_backend().index_instance(instance)
+
+@receiver(post_delete, sender=Bug)
+@receiver(post_delete, sender=Project)
+def update_search_index_on_delete(sender, instance, **kwargs):
+    get_search_backend().remove_instance(instance)
+
+# connected before stamp_change_version, the tombstone has to sort before the moved bug
+@receiver(pre_save, sender=Bug)
+def record_bug_move_tombstone(sender, instance, update_fields=None, **kwargs):
+    previous_project_id = getattr(instance, '_counted_state', (None, None))[0]
+    if instance._state.adding or previous_project_id == instance.project_id:
+        return
+    if update_fields is not None and 'project' not in update_fields:
+        return
+
+    # clients that only see the previous project have to drop the bug
+    if previous_project_id is not None:
+        SyncService.record_deletes(Tombstone.KindChoice.BUG, [(instance.pk, previous_project_id)])
+    instance._project_moved = True
+
+@receiver(pre_save, sender=Bug)
+@receiver(pre_save, sender=Comment)
+def stamp_change_version(sender, instance, **kwargs):
+    SyncService.stamp(instance)
+
+@receiver(post_save, sender=Bug)
+def touch_comments_on_bug_move(sender, instance, **kwargs):
+    # clients that only see the new project never got the bug's older comments
+    if instance.__dict__.pop('_project_moved', False):
+        SyncService.touch_comments([instance.pk])
+
+@receiver(post_delete, sender=Bug)
+def record_bug_tombstone(sender, instance, **kwargs):
+    SyncService.record_deletes(Tombstone.KindChoice.BUG, [(instance.pk, instance.project_id)])
+
+@receiver(post_delete, sender=Comment)
+def record_comment_tombstone(sender, instance, origin=None, **kwargs):
+    # comments removed with their bug are covered by the bug tombstone
+    if isinstance(origin, Bug) or (isinstance(origin, QuerySet) and origin.model is Bug):
+        return
+    SyncService.record_deletes(Tombstone.KindChoice.COMMENT, [(instance.pk, instance.bug.project_id)])
+    SyncService.touch_bugs([instance.bug_id])
+
+@receiver(post_save, sender=Comment)
+def touch_bug_on_comment_create(sender, instance, created, **kwargs):
+    # the bug's comment_count changed
+    if created:
+        SyncService.touch_bugs([instance.bug_id])
+
+@receiver(post_save, sender=Comment)
+def invalidate_response_cache_on_comment_save(sender, instance, **kwargs):
+    ResponseCacheService.invalidate_projects([instance.bug.project_id])
+
+@receiver(post_delete, sender=Comment)
+def invalidate_response_cache_on_comment_delete(sender, instance, origin=None, **kwargs):
+    # comments removed with their bug are covered by the bug's invalidation
+    if isinstance(origin, Bug) or (isinstance(origin, QuerySet) and origin.model is Bug):
+        return
+    ResponseCacheService.invalidate_projects([instance.bug.project_id])
+
+@receiver(post_save, sender=ActivityLog)
+def invalidate_response_cache_on_activity(sender, instance, created, **kwargs):
+    ResponseCacheService.invalidate_projects([instance.project_id])
+
+@receiver(pre_delete, sender=Project)
+def record_project_bug_tombstones(sender, instance, **kwargs):
+    # the bugs stay but lose their project, so they leave every synced view
+    bug_ids = Bug.objects.filter(project_id=instance.pk).values_list('id', flat=True)
+    SyncService.record_deletes(Tombstone.KindChoice.BUG, [(bug_id, instance.pk) for bug_id in bug_ids])
+
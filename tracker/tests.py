@@ -1,3 +1,2083 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import pickle
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from bugtracker.utils import apilog_writer, apilogger, fast_json
+from bugtracker.utils.apilog_writer import ApiLogWriter
+from bugtracker.utils.async_queries import gather_queries
+from bugtracker.utils.fast_json import FastJSONParser, FastJSONRenderer
+from bugtracker.utils.channel_layers import HashRing
+from bugtracker.utils.lru_cache import TTLLRUCache
+from bugtracker.utils.metrics import LatencyHistogram, LatencyRegistry, render_prometheus_values, request_latency
+from bugtracker.utils.query_inspector import QueryInspector, query_shape
+from bugtracker.utils.response_cache import get_response_cache, reset_response_cache
+from tracker.models import Project, Bug, Comment, ActivityLog, ApiLog, NotificationOutbox
+from tracker.api.activity_api import ActivityLogListApiView
+from tracker.consumers import BugTrackerConsumer, TypingThrottle
+from tracker.middleware import QueryInspectorMiddleware
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.bug_counter_service import BugCounterService
+from tracker.services.notification_service import NotificationDispatcher, NotificationService, project_group
+from tracker.services.search_service import (
+    InvertedIndexSearchBackend, PostgresSearchBackend, get_search_backend, reset_search_backend
+)
+from tracker.services.summary_service import SummaryService
+from tracker.services.sync_service import SyncService
+from tracker.services.transfer_service import ImportService
+from tracker.views import DashboardStatsAPIView
+
+
+class BugQueryBudgetTests(APITestCase):
+    """
+    bug list/detail must cost the same number of queries regardless of page size
+    """
+    LIST_QUERIES = 3  # etag fingerprint + page count + page rows
+    DETAIL_QUERIES = 2  # etag fingerprint + row
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='pwd')
+        cls.member = User.objects.create_user(username='member', password='pwd')
+        cls.project = Project.objects.create(name='Budget', owner=cls.user)
+        cls.project.members.add(cls.member)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        # budgets are measured with a warm access cache
+        ProjectAccessService.clear()
+        ProjectAccessService.get_accessible_project_ids(self.user)
+
+    def seed_bugs(self, count):
+        bugs = [
+            Bug.objects.create(
+                title=f'Bug {i}',
+                description='desc',
+                project=self.project,
+                created_by=self.user,
+                assigned_to=self.user if i % 2 else self.member,
+            )
+            for i in range(count)
+        ]
+        for bug in bugs:
+            Comment.objects.create(bug=bug, commenter=self.member, message='comment')
+        return bugs
+
+    def test_list_query_count_is_constant(self):
+        self.seed_bugs(3)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            small = self.client.get(reverse('bug-list'), {'page_size': 3})
+
+        self.seed_bugs(30)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            large = self.client.get(reverse('bug-list'), {'page_size': 30})
+
+        self.assertEqual(small.status_code, 200)
+        self.assertEqual(len(large.data['results']), 30)
+
+    def test_list_payload_uses_annotations(self):
+        self.seed_bugs(2)
+        response = self.client.get(reverse('bug-list'))
+
+        row = response.data['results'][0]
+        self.assertEqual(row['comment_count'], 1)
+        self.assertEqual(row['project_name'], 'Budget')
+        self.assertEqual(row['created_by']['username'], 'owner')
+
+    def test_custom_list_actions_query_count_is_constant(self):
+        self.seed_bugs(20)
+        with self.assertNumQueries(1):
+            assigned = self.client.get(reverse('bug-assigned-to-me'))
+        with self.assertNumQueries(1):
+            created = self.client.get(reverse('bug-my-created'))
+
+        self.assertEqual(len(assigned.data), 10)
+        self.assertEqual(len(created.data), 20)
+
+    def test_detail_query_count(self):
+        bug = self.seed_bugs(1)[0]
+        with self.assertNumQueries(self.DETAIL_QUERIES):
+            response = self.client.get(reverse('bug-detail', args=[bug.pk]))
+
+        self.assertEqual(response.data['comment_count'], 1)
+
+    def test_not_modified_costs_only_the_fingerprint(self):
+        bug = self.seed_bugs(3)[0]
+        etag = self.client.get(reverse('bug-list'))['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('bug-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Comment.objects.create(bug=bug, commenter=self.member, message='another')
+        response = self.client.get(reverse('bug-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since_never_hides_a_delete_from_a_list(self):
+        bugs = self.seed_bugs(3)
+        response = self.client.get(reverse('bug-list'))
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(timezone.now().timestamp() + 60)
+
+        # the newest row is untouched, only the etag's count tells the lists apart
+        bugs[-1].delete()
+        response = self.client.get(reverse('bug-list'), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+        detail = self.client.get(reverse('bug-detail', args=[bugs[0].pk]))
+        self.assertIn('Last-Modified', detail)
+        response = self.client.get(
+            reverse('bug-detail', args=[bugs[0].pk]), HTTP_IF_MODIFIED_SINCE=detail['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_sparse_list_skips_joins_and_counts(self):
+        self.seed_bugs(3)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('bug-list'), {'fields': 'id,title,assigned_to'})
+
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'assigned_to'})
+        self.assertIsInstance(response.data['results'][0]['assigned_to'], int)
+        page_query = context.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', page_query)
+        self.assertNotIn('tracker_comment', page_query)
+
+        response = self.client.get(reverse('bug-list'), {'fields': 'id', 'expand': 'assigned_to'})
+        self.assertIn(response.data['results'][0]['assigned_to']['username'], {'owner', 'member'})
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class QueryPlanTests(APITestCase):
+    """
+    each endpoint's main query must be answerable from an index.
+    on postgres sequential scans are disabled so the planner only falls back to one when no index fits
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='pwd')
+        cls.other = User.objects.create_user(username='other', password='pwd')
+
+        cls.projects = [Project.objects.create(name=f'Project {i}', owner=cls.user) for i in range(3)]
+        Project.objects.create(name='Foreign', owner=cls.other)
+
+        for project in cls.projects:
+            for i in range(20):
+                bug = Bug.objects.create(
+                    title=f'{project.name} bug {i}',
+                    description='desc',
+                    project=project,
+                    created_by=cls.user if i % 2 else cls.other,
+                    assigned_to=cls.user if i % 3 else None,
+                    status=Bug.StatusChoice.OPEN if i % 2 else Bug.StatusChoice.COMPLETE,
+                )
+                Comment.objects.create(bug=bug, commenter=cls.user, message='comment')
+                ActivityLog.objects.create(
+                    user=cls.user, project=project, bug=bug, action='created', description=bug.title
+                )
+        cls.bug = Bug.objects.filter(project=cls.projects[0]).first()
+
+        ApiLog.objects.bulk_create([
+            ApiLog(api_name=f'api-{i % 5}', level=ApiLog.LevelChoice.INFO, details='') for i in range(50)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        ProjectAccessService.clear()
+
+    def main_queries(self, url, table, params=None) -> list:
+        """
+        every row-fetching query the endpoint issues against table
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+            and 'COUNT(*)' not in query['sql']
+        ]
+        self.assertTrue(queries, f'No query on {table} issued by {url}')
+        return queries
+
+    def explain(self, sql, params=None) -> list:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}', params)
+                return [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertAllIndexed(self, queries):
+        for sql in queries:
+            self.assertIndexed(sql)
+
+    def assertIndexed(self, sql, params=None):
+        plan = self.explain(sql, params)
+        if connection.vendor == 'postgresql':
+            scans = [line for line in plan if 'Seq Scan' in line]
+        else:
+            scans = [line for line in plan if re.fullmatch(r'SCAN \S+( AS \S+)?', line.strip())]
+        self.assertFalse(scans, f'Sequential scan in plan for {sql}:\n' + '\n'.join(plan))
+
+    def test_bug_list_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse('bug-list'), 'tracker_bug'))
+
+    def test_bug_list_filtered_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse('bug-list'), 'tracker_bug', {'project': self.projects[1].pk}))
+
+    def test_assigned_to_me_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse('bug-assigned-to-me'), 'tracker_bug'))
+
+    def test_my_created_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse('bug-my-created'), 'tracker_bug'))
+
+    def test_comment_list_plan(self):
+        url = reverse('bug-comments-list', kwargs={'bug_pk': self.bug.pk})
+        self.assertAllIndexed(self.main_queries(url, 'tracker_comment'))
+
+    def test_activity_list_plan(self):
+        url = reverse(ActivityLogListApiView.api_name)
+        self.assertAllIndexed(self.main_queries(url, 'tracker_activitylog', {'pagination': 'cursor'}))
+
+    def test_activity_list_by_bug_plan(self):
+        url = reverse(ActivityLogListApiView.api_name)
+        self.assertAllIndexed(self.main_queries(url, 'tracker_activitylog', {'bug': self.bug.pk}))
+
+    def test_dashboard_stats_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse(DashboardStatsAPIView.api_name), 'tracker_bug'))
+
+    def test_project_list_plan(self):
+        self.assertAllIndexed(self.main_queries(reverse('project-list'), 'tracker_project'))
+
+    def test_api_log_by_name_plan(self):
+        queryset = ApiLog.objects.filter(api_name='api-1').order_by('-created_at')
+        self.assertIndexed(*queryset.query.sql_with_params())
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class ValuesSerializerParityTests(APITestCase):
+    """
+    list endpoints must render the same bytes with and without the values_list fast path
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='parity', password='pwd', email='p@example.com', first_name='Pär')
+        cls.member = User.objects.create_user(username='member', password='pwd')
+        cls.outsider = User.objects.create_user(username='outsider', password='pwd')
+
+        cls.project = Project.objects.create(name='Parity', description='säkert', owner=cls.user)
+        cls.project.members.add(cls.outsider, cls.member)
+        # owner gone, still visible to members
+        orphan = Project.objects.create(name='Orphan', owner=None)
+        orphan.members.add(cls.user)
+        Project.objects.create(name='Empty', owner=cls.user)
+
+        for i in range(12):
+            bug = Bug.objects.create(
+                title=f'Bug "{i}"  ',
+                description='desc',
+                project=cls.project if i % 4 else orphan,
+                created_by=cls.user if i % 3 else None,
+                assigned_to=cls.member if i % 2 else None,
+                priority=Bug.PriorityChoice.HIGH,
+            )
+            if i % 2:
+                Comment.objects.create(bug=bug, commenter=cls.member, message='comment')
+            ActivityLog.objects.create(
+                user=cls.user if i % 5 else None, project=bug.project, bug=bug, action='created', description=bug.title
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertSameResponse(self, url, params=None):
+        with override_settings(FAST_SERIALIZERS={'ENABLED': False}):
+            expected = self.client.get(url, params)
+        with override_settings(FAST_SERIALIZERS={'ENABLED': True}):
+            actual = self.client.get(url, params)
+
+        self.assertEqual(expected.status_code, 200)
+        self.assertEqual(actual.status_code, 200)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+    def test_bug_list(self):
+        response = self.assertSameResponse(reverse('bug-list'), {'page_size': 5, 'page': 2})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_bug_list_filtered_and_ordered(self):
+        self.assertSameResponse(reverse('bug-list'), {'project': self.project.pk, 'ordering': 'priority'})
+
+    def test_bug_custom_list_actions(self):
+        self.assertSameResponse(reverse('bug-assigned-to-me'))
+        self.assertSameResponse(reverse('bug-my-created'))
+
+    def test_project_list(self):
+        response = self.assertSameResponse(reverse('project-list'))
+        member_counts = [project['member_count'] for project in response.data['results'] if project['name'] == 'Parity']
+        self.assertEqual(member_counts, [2])
+
+    def test_activity_list(self):
+        url = reverse(ActivityLogListApiView.api_name)
+        self.assertSameResponse(url)
+        self.assertSameResponse(url, {'bug': Bug.objects.order_by('pk').first().pk})
+
+    def test_activity_list_keyset_pages(self):
+        url = reverse(ActivityLogListApiView.api_name)
+        first = self.assertSameResponse(url, {'pagination': 'cursor', 'page_size': 5})
+        self.assertSameResponse(first.data['next'])
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class ProjectMemberTests(APITestCase):
+    """
+    bulk member changes write the through table once and keep member_count in step
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pwd')
+        cls.users = User.objects.bulk_create([User(username=f'user-{i}') for i in range(50)])
+        cls.project = Project.objects.create(name='Members', owner=cls.owner)
+        cls.url = reverse('project-members-list', kwargs={'project_pk': cls.project.pk})
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    def change(self, action, user_ids):
+        return self.client.post(self.url, {'action': action, 'user_ids': user_ids}, format='json')
+
+    def test_bulk_add_is_one_insert(self):
+        user_ids = [user.pk for user in self.users]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.change('add', user_ids)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['member_count'], 50)
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT') and 'tracker_project_members' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+
+    def test_remove_and_delete_recount(self):
+        self.change('add', [user.pk for user in self.users])
+        self.change('remove', [user.pk for user in self.users[:10]])
+        self.users[20].delete()
+
+        self.assertEqual(Project.objects.get(pk=self.project.pk).member_count, 39)
+        response = self.client.get(self.url, {'search': 'user-2'})
+        self.assertEqual([user['username'] for user in response.data['results']], [f'user-{i}' for i in range(21, 30)])
+
+    def test_only_owner_changes_members(self):
+        self.change('add', [self.users[0].pk])
+        self.client.force_authenticate(self.users[0])
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.change('remove', [self.users[0].pk]).status_code, 403)
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class ProjectAccessRevocationTests(APITestCase):
+    """
+    removing a member, clearing members, changing the owner or deleting the project revokes
+    cached access in every worker, not only the one that made the change
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='access-owner', password='pwd')
+        cls.member = User.objects.create_user(username='access-member', password='pwd')
+        cls.successor = User.objects.create_user(username='access-successor', password='pwd')
+        cls.project = Project.objects.create(name='Guarded', owner=cls.owner)
+        cls.project.members.add(cls.member)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        # a second process: its own in-memory entries, the same shared cache
+        self.other_worker = TTLLRUCache()
+
+    @contextmanager
+    def in_other_worker(self):
+        previous, ProjectAccessService._cache = ProjectAccessService._cache, self.other_worker
+        try:
+            yield
+        finally:
+            ProjectAccessService._cache = previous
+
+    def has_access(self, user, other_worker=False) -> bool:
+        if other_worker:
+            with self.in_other_worker():
+                return ProjectAccessService.has_access(user, self.project.pk)
+        return ProjectAccessService.has_access(user, self.project.pk)
+
+    def warm(self, *users):
+        for user in users:
+            self.assertTrue(self.has_access(user))
+            self.assertTrue(self.has_access(user, other_worker=True))
+
+    def test_cached_entries_are_reused(self):
+        self.warm(self.member)
+        with self.assertNumQueries(0):
+            self.assertTrue(self.has_access(self.member, other_worker=True))
+
+    def test_members_remove_revokes_access(self):
+        self.warm(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.remove(self.member)
+
+        self.assertFalse(self.has_access(self.member, other_worker=True))
+        self.assertFalse(self.has_access(self.member))
+        self.assertTrue(self.has_access(self.owner))
+
+        self.client.force_authenticate(self.member)
+        with self.in_other_worker():
+            response = self.client.get(reverse('project-detail', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_members_clear_revokes_access(self):
+        self.warm(self.member)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.projects.clear()
+
+        self.assertFalse(self.has_access(self.member, other_worker=True))
+
+    def test_owner_change_revokes_and_grants_access(self):
+        self.warm(self.owner)
+        self.assertFalse(self.has_access(self.successor, other_worker=True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.owner = self.successor
+            self.project.save()
+
+        self.assertFalse(self.has_access(self.owner, other_worker=True))
+        self.assertTrue(self.has_access(self.successor, other_worker=True))
+
+    def test_project_delete_revokes_access(self):
+        self.warm(self.owner, self.member)
+        project_id = self.project.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+
+        with self.in_other_worker():
+            self.assertNotIn(project_id, ProjectAccessService.get_accessible_project_ids(self.owner))
+            self.assertNotIn(project_id, ProjectAccessService.get_accessible_project_ids(self.member))
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class BugCounterTests(APITestCase):
+    """
+    stored per-project counters follow creates, status changes, moves and deletes,
+    and rebuild_bug_counters repairs them when they drift
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='counter', password='pwd')
+        cls.first = Project.objects.create(name='First', owner=cls.user)
+        cls.second = Project.objects.create(name='Second', owner=cls.user)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+
+    def create_bug(self, project, status='OPEN'):
+        return Bug.objects.create(title='Bug', description='desc', status=status, project=project, created_by=self.user)
+
+    def assertCounters(self, project, total, open=0, in_progress=0, complete=0):
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.bug_count, project.open_bug_count, project.in_progress_bug_count, project.complete_bug_count),
+            (total, open, in_progress, complete)
+        )
+
+    def test_create_status_change_move_and_delete(self):
+        bug = self.create_bug(self.first)
+        self.create_bug(self.first, status='COMPLETE')
+        self.assertCounters(self.first, 2, open=1, complete=1)
+
+        bug.status = Bug.StatusChoice.IN_PROGRESS
+        bug.save()
+        self.assertCounters(self.first, 2, in_progress=1, complete=1)
+
+        bug.project = self.second
+        bug.status = Bug.StatusChoice.OPEN
+        bug.save(update_fields=['project', 'status'])
+        self.assertCounters(self.first, 1, complete=1)
+        self.assertCounters(self.second, 1, open=1)
+
+        # a reloaded instance diffs against the state it was loaded with
+        Bug.objects.get(pk=bug.pk).delete()
+        self.assertCounters(self.second, 0)
+
+        bug = self.create_bug(None)
+        bug.project = self.second
+        bug.save()
+        self.assertCounters(self.second, 1, open=1)
+
+    def test_status_change_through_the_api(self):
+        bug = self.create_bug(self.first)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.patch(reverse('bug-detail', args=[bug.pk]), {'status': 'COMPLETE'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertCounters(self.first, 1, complete=1)
+
+        self.assertEqual(self.client.delete(reverse('bug-detail', args=[bug.pk])).status_code, 204)
+        self.assertCounters(self.first, 0)
+
+    def test_apply_moves_updates_each_project_once(self):
+        self.create_bug(self.first)
+        self.create_bug(self.first)
+        with CaptureQueriesContext(connection) as queries:
+            BugCounterService.apply_moves([
+                ((self.first.pk, 'OPEN'), (self.first.pk, 'COMPLETE')),
+                ((self.first.pk, 'OPEN'), (self.second.pk, 'IN_PROGRESS')),
+                (None, (self.second.pk, 'OPEN')),
+            ])
+        self.assertEqual(len(queries), 2)
+        self.assertCounters(self.first, 1, complete=1)
+        self.assertCounters(self.second, 2, open=1, in_progress=1)
+
+        # counters never go below zero
+        BugCounterService.apply_moves([((self.second.pk, 'COMPLETE'), None)])
+        self.assertCounters(self.second, 1, open=1, in_progress=1)
+
+    def test_rebuild_command_repairs_drift(self):
+        self.create_bug(self.first)
+        self.create_bug(self.first, status='IN_PROGRESS')
+        self.create_bug(self.second, status='COMPLETE')
+        Project.objects.update(bug_count=7, open_bug_count=0, in_progress_bug_count=3, complete_bug_count=0)
+
+        out = io.StringIO()
+        call_command('rebuild_bug_counters', '--project', str(self.first.pk), stdout=out)
+        self.assertIn('Repaired bug counters on 1 project(s)', out.getvalue())
+        self.assertCounters(self.first, 2, open=1, in_progress=1)
+        self.assertCounters(self.second, 7, in_progress=3)
+
+        out = io.StringIO()
+        call_command('rebuild_bug_counters', stdout=out)
+        self.assertIn('on 1 project(s)', out.getvalue())
+        self.assertCounters(self.second, 1, complete=1)
+        self.assertEqual(BugCounterService.rebuild(), 0)
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class BugVersionConflictTests(APITestCase):
+    """
+    every bug write advances the version, so a write carrying an older If-Match gets a 409
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='pwd')
+        cls.project = Project.objects.create(name='Versions', owner=cls.user)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.bug = Bug.objects.create(title='Bug', description='desc', project=self.project, created_by=self.user)
+        self.url = reverse('bug-detail', kwargs={'pk': self.bug.pk})
+
+    def patch(self, data, version):
+        return self.client.patch(self.url, data, format='json', HTTP_IF_MATCH=f'"{version}"')
+
+    def test_stale_patch_conflicts(self):
+        version = self.client.get(self.url).data['version']
+        self.assertEqual(self.patch({'title': 'First'}, version).status_code, 200)
+
+        self.assertEqual(self.patch({'title': 'Second'}, version).status_code, 409)
+        self.assertEqual(Bug.objects.get(pk=self.bug.pk).title, 'First')
+
+    def test_close_then_stale_patch_conflicts(self):
+        version = self.client.get(self.url).data['version']
+        self.assertEqual(self.client.post(reverse('bug-close', kwargs={'pk': self.bug.pk})).status_code, 200)
+
+        self.assertEqual(self.patch({'status': Bug.StatusChoice.OPEN}, version).status_code, 409)
+        self.assertEqual(Bug.objects.get(pk=self.bug.pk).status, Bug.StatusChoice.COMPLETE)
+
+    def test_bulk_update_then_stale_patch_conflicts(self):
+        version = self.client.get(self.url).data['version']
+        response = self.client.post(
+            reverse('bug-bulk'), {'action': 'update', 'ids': [self.bug.pk], 'priority': Bug.PriorityChoice.HIGH},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.patch({'priority': Bug.PriorityChoice.LOW}, version).status_code, 409)
+        self.assertEqual(Bug.objects.get(pk=self.bug.pk).priority, Bug.PriorityChoice.HIGH)
+
+    def test_full_save_keeps_claimed_version(self):
+        stale = Bug.objects.get(pk=self.bug.pk)
+        self.patch({'title': 'Claimed'}, stale.version)
+
+        stale.description = 'other'
+        stale.save()
+        self.assertEqual(Bug.objects.get(pk=self.bug.pk).version, stale.version + 1)
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class DeltaSyncTests(APITestCase):
+    """
+    /changes/ cursors: every write shows up once, deletes and project moves as tombstones,
+    purged tombstones and changed project access ask for a resync
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='syncer', password='pwd')
+        cls.other = User.objects.create_user(username='other', password='pwd')
+        cls.project = Project.objects.create(name='Synced', owner=cls.user)
+        cls.hidden = Project.objects.create(name='Hidden', owner=cls.other)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('v1-changes')
+
+    def create_bug(self, project=None, title='Bug'):
+        return Bug.objects.create(title=title, description='desc', project=project or self.project, created_by=self.user)
+
+    def changes(self, since='0', **params):
+        return self.client.get(self.url, {'since': since, **params})
+
+    def sync(self, since='0', **params):
+        response = self.changes(since, **params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_cursor_returns_each_change_once(self):
+        first = self.create_bug(title='First')
+        data = self.sync()
+        self.assertEqual([bug['id'] for bug in data['bugs']], [first.pk])
+
+        self.assertEqual(self.sync(data['cursor'])['bugs'], [])
+        second = self.create_bug(title='Second')
+        Comment.objects.create(bug=first, commenter=self.user, message='hi')
+        self.create_bug(project=self.hidden)
+
+        later = self.sync(data['cursor'])
+        # the comment re-versions its bug, comment_count changed
+        self.assertEqual([bug['id'] for bug in later['bugs']], [second.pk, first.pk])
+        self.assertEqual(len(later['comments']), 1)
+
+    def test_limit_truncates_and_pages_through(self):
+        bugs = [self.create_bug(title=f'Bug {i}') for i in range(5)]
+
+        seen, cursor, pages = [], '0', 0
+        while True:
+            data = self.sync(cursor, limit=2)
+            seen += [bug['id'] for bug in data['bugs']]
+            cursor, pages = data['cursor'], pages + 1
+            self.assertLessEqual(len(data['bugs']), 2)
+            if not data['has_more']:
+                break
+
+        self.assertEqual(seen, [bug.pk for bug in bugs])
+        self.assertEqual(pages, 3)
+
+    def test_deletes_leave_tombstones(self):
+        bug = self.create_bug()
+        comment = Comment.objects.create(bug=self.create_bug(), commenter=self.user, message='hi')
+        cursor = self.sync()['cursor']
+
+        expected = {'bugs': [bug.pk], 'comments': [comment.pk]}
+        comment.delete()
+        bug.delete()
+        self.assertEqual(self.sync(cursor)['deleted'], expected)
+
+    def test_moved_bug_leaves_previous_project(self):
+        bug = self.create_bug()
+        Comment.objects.create(bug=bug, commenter=self.user, message='hi')
+        cursor = self.sync()['cursor']
+
+        bug.project = self.hidden
+        bug.save()
+        data = self.sync(cursor)
+        self.assertEqual(data['deleted']['bugs'], [bug.pk])
+        self.assertEqual(data['bugs'], [])
+
+        # the other side gets the bug and its older comments
+        self.client.force_authenticate(self.other)
+        data = self.sync()
+        self.assertEqual([row['id'] for row in data['bugs']], [bug.pk])
+        self.assertEqual(len(data['comments']), 1)
+
+    def test_access_change_requires_resync(self):
+        self.create_bug()
+        cursor = self.sync()['cursor']
+
+        self.hidden.members.add(self.user)
+        ProjectAccessService.clear()
+        response = self.changes(cursor)
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.data['resync'])
+
+    def test_purged_tombstones_require_resync(self):
+        bug = self.create_bug()
+        cursor = self.sync()['cursor']
+        bug.delete()
+
+        self.assertEqual(SyncService.purge_tombstones(timedelta(seconds=-1)), 1)
+        self.assertEqual(self.changes(cursor).status_code, 410)
+        # a full sync still works and its cursor is past the purge
+        self.assertEqual(self.changes(self.sync()['cursor']).status_code, 200)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.changes('not-a-cursor').status_code, 400)
+        self.assertEqual(self.changes('0', limit=0).status_code, 400)
+        # issued before cursors carried a transaction id
+        self.assertEqual(self.changes('12').status_code, 410)
+
+
+class DashboardStatsCacheTests(APITestCase):
+    """
+    cached stats are reused until a bug in one of the user's projects changes, in any worker
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='dashboard', password='pwd')
+        cls.project = Project.objects.create(name='Stats', owner=cls.user)
+        cls.other = Project.objects.create(name='Unrelated', owner=None)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        SummaryService.cache().clear()
+
+    def stats(self) -> tuple:
+        """
+        :return: (stats, whether they came from the cache)
+        """
+        hits = SummaryService.hits
+        stats = SummaryService.get_dashboard_stats(self.user)
+        return stats, SummaryService.hits > hits
+
+    def create_bug(self, project):
+        return Bug.objects.create(title='Bug', description='desc', project=project, created_by=self.user)
+
+    def test_hit_then_invalidated_by_bug_write(self):
+        self.assertFalse(self.stats()[1])
+        with CaptureQueriesContext(connection) as queries:
+            stats, hit = self.stats()
+        self.assertTrue(hit)
+        # the versions lookup, not the aggregation
+        self.assertEqual(len(queries), 1)
+
+        bug = self.create_bug(self.project)
+        stats, hit = self.stats()
+        self.assertFalse(hit)
+        self.assertEqual(stats['total_bugs'], 1)
+
+        bug.status = Bug.StatusChoice.COMPLETE
+        bug.save()
+        stats, hit = self.stats()
+        self.assertFalse(hit)
+        self.assertEqual(stats['complete_bugs'], 1)
+
+    def test_unrelated_write_keeps_entry(self):
+        self.stats()
+        self.create_bug(self.other)
+        self.assertTrue(self.stats()[1])
+
+    def test_version_is_shared_storage(self):
+        self.stats()
+        # what a write handled by another worker leaves behind
+        Project.objects.filter(pk=self.project.pk).update(stats_version=F('stats_version') + 1)
+        self.assertFalse(self.stats()[1])
+
+
+class RecordingChannelLayer:
+    """
+    records group sends, failing the next sends to the groups in fail_groups
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.fail_groups = set()
+
+    async def group_send(self, group, message):
+        if group in self.fail_groups:
+            self.fail_groups.discard(group)
+            raise ConnectionError('layer down')
+        self.sent.append((group, [event['seq'] for event in message['events']]))
+
+
+class NotificationDispatcherTests(APITestCase):
+    """
+    a group whose send failed is retried with backoff, its later events wait behind it
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = Project.objects.create(name='Events')
+        cls.other = Project.objects.create(name='Other events')
+
+    def setUp(self):
+        self.layer = RecordingChannelLayer()
+        self.dispatcher = NotificationDispatcher(batch_size=50, max_attempts=3, channel_layer=self.layer)
+        self.group = project_group(self.project.pk)
+
+    def enqueue(self, project, count=1):
+        NotificationService.enqueue_project_events(project.pk, [{'type': 'bug_notification'}] * count)
+
+    def make_due(self):
+        NotificationOutbox.objects.filter(status=NotificationOutbox.StatusChoice.PENDING).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_failed_group_holds_back_later_events(self):
+        self.enqueue(self.project, 2)
+        self.enqueue(self.other)
+        self.layer.fail_groups.add(self.group)
+
+        self.assertEqual(self.dispatcher.dispatch_once(), 3)
+        self.assertEqual(self.layer.sent, [(project_group(self.other.pk), [1])])
+        self.assertEqual(self.dispatcher.retried, 2)
+
+        # enqueued while the first two back off
+        self.enqueue(self.project)
+        self.enqueue(self.other)
+        self.assertEqual(self.dispatcher.dispatch_once(), 1)
+        self.assertEqual(self.layer.sent[-1], (project_group(self.other.pk), [2]))
+
+        self.make_due()
+        self.dispatcher.dispatch_once()
+        self.assertEqual(self.layer.sent[-1], (self.group, [1, 2, 3]))
+        self.assertFalse(NotificationOutbox.objects.filter(status=NotificationOutbox.StatusChoice.PENDING).exists())
+
+    def test_gives_up_after_max_attempts(self):
+        self.enqueue(self.project)
+        for _ in range(3):
+            self.layer.fail_groups.add(self.group)
+            self.make_due()
+            self.dispatcher.dispatch_once()
+
+        row = NotificationOutbox.objects.get()
+        self.assertEqual((row.status, row.attempts), (NotificationOutbox.StatusChoice.FAILED, 3))
+        # later events are no longer held back by it
+        self.enqueue(self.project)
+        self.dispatcher.dispatch_once()
+        self.assertEqual(self.layer.sent, [(self.group, [2])])
+
+
+@override_settings(
+    API_LOG_BUFFER={'ENABLED': False},
+    SEARCH_BACKEND='tracker.services.search_service.InvertedIndexSearchBackend',
+)
+class InvertedIndexSearchTests(APITestCase):
+    """
+    the in-process index ranks title matches first, matches prefixes, follows saves and deletes
+    and serves ?search= on the bug and project lists
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='searcher', password='pwd')
+        cls.project = Project.objects.create(name='Payments gateway', description='card processing', owner=cls.user)
+        cls.hidden = Project.objects.create(name='Payments archive', owner=None)
+        cls.in_title = cls.create_bug('Checkout timeout', 'slow page')
+        cls.in_description = cls.create_bug('Slow page', 'checkout hangs')
+        cls.unrelated = cls.create_bug('Typo in footer', 'copy fix')
+        Bug.objects.create(title='Checkout timeout', description='', project=cls.hidden, created_by=cls.user)
+
+    @classmethod
+    def create_bug(cls, title, description):
+        return Bug.objects.create(title=title, description=description, project=cls.project, created_by=cls.user)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        # the index outlives test rollbacks, rebuild it from this test's rows
+        reset_search_backend('SEARCH_BACKEND')
+        self.client.force_authenticate(self.user)
+
+    def search(self, text, queryset=None) -> list:
+        queryset = Bug.objects.filter(project=self.project) if queryset is None else queryset
+        return list(get_search_backend().search(queryset, text).values_list('pk', flat=True))
+
+    def test_title_matches_rank_ahead_of_description_matches(self):
+        self.assertEqual(self.search('checkout'), [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(self.search('slow'), [self.in_description.pk, self.in_title.pk])
+
+    def test_every_term_must_match_and_the_last_may_be_a_prefix(self):
+        self.assertEqual(self.search('checkout tim'), [self.in_title.pk])
+        self.assertEqual(self.search('CHECK'), [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(self.search('checkout footer'), [])
+        # nothing to search for leaves the queryset alone
+        self.assertEqual(self.search('!!'), [self.unrelated.pk, self.in_description.pk, self.in_title.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.search('checkout')
+
+        self.unrelated.title = 'Checkout button misaligned'
+        self.unrelated.save()
+        self.assertEqual(self.search('misaligned'), [self.unrelated.pk])
+        self.assertEqual(self.search('footer'), [])
+
+        self.in_title.delete()
+        self.assertEqual(self.search('checkout'), [self.unrelated.pk, self.in_description.pk])
+
+        bug = self.create_bug('Refund email missing', '')
+        self.assertEqual(self.search('refund'), [bug.pk])
+
+    def test_candidates_are_capped_to_the_best_scores(self):
+        backend = InvertedIndexSearchBackend(max_candidates=1)
+        queryset = Bug.objects.filter(project=self.project)
+
+        with CaptureQueriesContext(connection) as queries:
+            pks = list(backend.search(queryset, 'checkout').values_list('pk', flat=True))
+        self.assertEqual(pks, [self.in_title.pk])
+        self.assertEqual(queries[-1]['sql'].count('CASE WHEN'), 1)
+
+    def test_cap_applies_to_rows_the_queryset_can_see(self):
+        # title matches in a hidden project outscore the user's description match
+        for _ in range(3):
+            Bug.objects.create(title='Slow checkout', description='', project=self.hidden, created_by=self.user)
+        backend = InvertedIndexSearchBackend(max_candidates=2)
+
+        pks = list(backend.search(Bug.objects.filter(project=self.project), 'checkout').values_list('pk', flat=True))
+        self.assertEqual(pks, [self.in_title.pk, self.in_description.pk])
+
+        with self.settings(SEARCH_MAX_CANDIDATES=2):
+            response = self.client.get(reverse('bug-list'), {'search': 'checkout'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.in_title.pk, self.in_description.pk])
+
+    def test_search_param_on_bug_list(self):
+        response = self.client.get(reverse('bug-list'), {'search': 'checkout'})
+        self.assertEqual(response.status_code, 200)
+        # ranked, and the bug in a project the user cannot see stays hidden
+        self.assertEqual([row['id'] for row in response.data['results']], [self.in_title.pk, self.in_description.pk])
+
+        response = self.client.get(reverse('bug-list'), {'search': 'checkout', 'ordering': 'created_at'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.in_title.pk, self.in_description.pk])
+
+        response = self.client.get(reverse('bug-list'), {'search': 'nothing matches'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_search_param_on_project_list(self):
+        response = self.client.get(reverse('project-list'), {'search': 'pay card'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.project.pk])
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False}, SEARCH_BACKEND='auto')
+class PostgresSearchTests(APITestCase):
+    """
+    the full text backend reads the trigger maintained search_vector, so it only runs on postgres
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pgsearcher', password='pwd')
+        cls.project = Project.objects.create(name='Search', owner=cls.user)
+        cls.in_title = Bug.objects.create(
+            title='Checkout timeout', description='slow page', project=cls.project, created_by=cls.user
+        )
+        cls.in_description = Bug.objects.create(
+            title='Slow page', description='checkout hangs', project=cls.project, created_by=cls.user
+        )
+
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('needs the postgres search_vector triggers')
+        ProjectAccessService.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_backend_is_picked_by_vendor(self):
+        self.assertIsInstance(get_search_backend(), PostgresSearchBackend)
+
+    def test_ranking_and_prefix_match(self):
+        queryset = PostgresSearchBackend().search(Bug.objects.filter(project=self.project), 'check')
+        self.assertEqual(list(queryset.values_list('pk', flat=True)), [self.in_title.pk, self.in_description.pk])
+
+    def test_vector_follows_saves(self):
+        self.in_description.title = 'Refund email missing'
+        self.in_description.save()
+
+        queryset = PostgresSearchBackend().search(Bug.objects.all(), 'refund')
+        self.assertEqual(list(queryset.values_list('pk', flat=True)), [self.in_description.pk])
+
+    def test_search_param_on_bug_list(self):
+        response = self.client.get(reverse('bug-list'), {'search': 'checkout'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.in_title.pk, self.in_description.pk])
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class BugBulkApiTests(APITestCase):
+    """
+    /bugs/bulk/ writes every bug or none, keeps the project counters right
+    and queues one notification per project
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='bulker', password='pwd')
+        cls.assignee = User.objects.create_user(username='assignee', password='pwd')
+        cls.first = Project.objects.create(name='First', owner=cls.user)
+        cls.second = Project.objects.create(name='Second', owner=cls.user)
+        cls.foreign = Project.objects.create(name='Foreign', owner=cls.assignee)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('bug-bulk')
+
+    def bulk(self, **data):
+        return self.client.post(self.url, data, format='json')
+
+    def create_bugs(self, *projects) -> list:
+        response = self.bulk(action='create', bugs=[
+            {'title': f'Bug {index}', 'description': 'desc', 'project': project.pk}
+            for index, project in enumerate(projects)
+        ])
+        self.assertEqual(response.status_code, 201)
+        return [row['id'] for row in response.data]
+
+    def assertCounters(self, project, total, open=0, in_progress=0, complete=0):
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.bug_count, project.open_bug_count, project.in_progress_bug_count, project.complete_bug_count),
+            (total, open, in_progress, complete)
+        )
+
+    def outbox(self) -> dict:
+        """
+        :return: dict: group -> bulk notification payloads
+        """
+        rows = {}
+        for row in NotificationOutbox.objects.order_by('id'):
+            if row.payload['type'] == 'bug_bulk_notification':
+                rows.setdefault(row.group, []).append(row.payload)
+        return rows
+
+    def test_create(self):
+        bug_ids = self.create_bugs(self.first, self.first, self.second)
+
+        bugs = Bug.objects.filter(pk__in=bug_ids)
+        self.assertEqual(bugs.count(), 3)
+        self.assertTrue(all(bug.created_by_id == self.user.pk for bug in bugs))
+        self.assertCounters(self.first, 2, open=2)
+        self.assertCounters(self.second, 1, open=1)
+
+        outbox = self.outbox()
+        self.assertEqual(set(outbox), {project_group(self.first.pk), project_group(self.second.pk)})
+        self.assertEqual([len(payloads) for payloads in outbox.values()], [1, 1])
+        self.assertEqual(outbox[project_group(self.first.pk)][0]['bug_ids'], bug_ids[:2])
+        self.assertEqual(outbox[project_group(self.first.pk)][0]['event_type'], 'bugs_created')
+
+    def test_update(self):
+        bug_ids = self.create_bugs(self.first, self.second)
+        NotificationOutbox.objects.all().delete()
+
+        response = self.bulk(action='update', ids=bug_ids, status='IN_PROGRESS', assigned_to=self.assignee.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['ids'], bug_ids)
+
+        for bug in Bug.objects.filter(pk__in=bug_ids):
+            self.assertEqual((bug.status, bug.assigned_to_id, bug.version), ('IN_PROGRESS', self.assignee.pk, 2))
+        self.assertCounters(self.first, 1, in_progress=1)
+        self.assertCounters(self.second, 1, in_progress=1)
+
+        outbox = self.outbox()
+        self.assertEqual(len(outbox), 2)
+        payload = outbox[project_group(self.first.pk)][0]
+        self.assertEqual(payload['changes'], {'status': 'IN_PROGRESS', 'assigned_to': self.assignee.pk})
+
+    def test_close(self):
+        bug_ids = self.create_bugs(self.first, self.first, self.first)
+        NotificationOutbox.objects.all().delete()
+
+        response = self.bulk(action='close', ids=bug_ids[:2])
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(set(Bug.objects.filter(status='COMPLETE').values_list('pk', flat=True)), set(bug_ids[:2]))
+        self.assertCounters(self.first, 3, open=1, complete=2)
+
+        outbox = self.outbox()
+        self.assertEqual(len(outbox[project_group(self.first.pk)]), 1)
+        self.assertEqual(outbox[project_group(self.first.pk)][0]['event_type'], 'bugs_closed')
+
+    def test_create_in_foreign_project_is_forbidden(self):
+        response = self.bulk(action='create', bugs=[
+            {'title': 'Mine', 'description': 'desc', 'project': self.first.pk},
+            {'title': 'Theirs', 'description': 'desc', 'project': self.foreign.pk},
+        ])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Bug.objects.exists())
+        self.assertCounters(self.first, 0)
+        self.assertEqual(self.outbox(), {})
+
+    def test_unknown_assignee_is_rejected(self):
+        bug_ids = self.create_bugs(self.first)
+        unknown = User.objects.order_by('-pk').values_list('pk', flat=True)[0] + 1
+
+        response = self.bulk(action='update', ids=bug_ids, assigned_to=unknown)
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(Bug.objects.get(pk=bug_ids[0]).assigned_to_id)
+
+        response = self.bulk(action='create', bugs=[
+            {'title': 'Bug', 'description': 'desc', 'project': self.first.pk, 'assigned_to': unknown}
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertCounters(self.first, 1, open=1)
+
+    def test_missing_ids_change_nothing(self):
+        bug_ids = self.create_bugs(self.first, self.first)
+        foreign_bug = Bug.objects.create(title='Theirs', description='desc', project=self.foreign, created_by=self.assignee)
+        NotificationOutbox.objects.all().delete()
+
+        for ids in ([*bug_ids, foreign_bug.pk + 100], [*bug_ids, foreign_bug.pk]):
+            response = self.bulk(action='close', ids=ids)
+            self.assertEqual(response.status_code, 404)
+
+        self.assertFalse(Bug.objects.filter(status='COMPLETE').exists())
+        self.assertEqual(list(Bug.objects.filter(pk__in=bug_ids).values_list('version', flat=True)), [1, 1])
+        self.assertCounters(self.first, 2, open=2)
+        self.assertEqual(self.outbox(), {})
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class DataTransferTests(APITestCase):
+    """
+    project export as ndjson and csv, and importing what it wrote back into another project
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='exporter', password='pwd')
+        cls.assignee = User.objects.create_user(username='fixer', password='pwd')
+        cls.source = Project.objects.create(name='Source', owner=cls.user)
+        cls.target = Project.objects.create(name='Target', owner=cls.user)
+        cls.foreign = Project.objects.create(name='Foreign', owner=cls.assignee)
+        cls.bugs = [
+            Bug.objects.create(
+                title='Crash, on "save"', description='line one\nline two', status='IN_PROGRESS',
+                priority='HIGH', assigned_to=cls.assignee, project=cls.source, created_by=cls.user
+            ),
+            Bug.objects.create(title='Typo', description='footer', project=cls.source, created_by=cls.user),
+        ]
+        Bug.objects.create(title='Elsewhere', description='desc', project=cls.foreign, created_by=cls.assignee)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        self.client.force_authenticate(self.user)
+
+    def export(self, project, **params):
+        return self.client.get(reverse('v1-project-export', args=[project.pk]), params)
+
+    def export_text(self, output) -> str:
+        response = self.export(self.source, output=output)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def run_import(self, rows, batch_size=None) -> dict:
+        return ImportService(self.target, self.user, batch_size=batch_size).run(rows)
+
+    def assertImported(self):
+        fields = ('title', 'description', 'status', 'priority', 'assigned_to_id', 'created_by_id')
+        self.assertEqual(
+            list(Bug.objects.filter(project=self.target).order_by('id').values_list(*fields)),
+            list(Bug.objects.filter(project=self.source).order_by('id').values_list(*fields)),
+        )
+        self.target.refresh_from_db()
+        self.assertEqual((self.target.bug_count, self.target.open_bug_count), (2, 1))
+
+    def test_ndjson_export(self):
+        rows = [json.loads(line) for line in self.export_text('ndjson').splitlines()]
+
+        self.assertEqual([row['id'] for row in rows], [bug.pk for bug in self.bugs])
+        self.assertEqual(list(rows[0]), ['id', 'title', 'description', 'status', 'priority', 'assigned_to',
+                                         'created_by', 'created_at', 'updated_at'])
+        self.assertEqual((rows[0]['assigned_to'], rows[1]['assigned_to']), ('fixer', None))
+        self.assertEqual(rows[0]['description'], 'line one\nline two')
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export_text('csv'))))
+
+        self.assertEqual([int(row['id']) for row in rows], [bug.pk for bug in self.bugs])
+        self.assertEqual((rows[0]['title'], rows[0]['assigned_to']), ('Crash, on "save"', 'fixer'))
+        self.assertEqual(rows[1]['assigned_to'], '')
+
+    def test_export_checks_access_and_params(self):
+        self.assertEqual(self.export(self.foreign).status_code, 403)
+        self.assertEqual(self.export(self.source, resource='users').status_code, 400)
+        self.assertEqual(self.export(self.source, output='xml').status_code, 400)
+
+    def test_ndjson_round_trip(self):
+        stream = io.StringIO(self.export_text('ndjson'))
+        stats = self.run_import(ImportService.read_ndjson(stream))
+
+        self.assertEqual((stats['rows'], stats['imported'], stats['errors']), (2, 2, []))
+        self.assertImported()
+
+    def test_csv_round_trip(self):
+        stream = io.StringIO(self.export_text('csv'), newline='')
+        stats = self.run_import(ImportService.read_csv(stream), batch_size=1)
+
+        self.assertEqual((stats['rows'], stats['imported'], stats['errors']), (2, 2, []))
+        self.assertImported()
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        lines = [
+            {'title': 'Good', 'description': 'desc', 'assigned_to': 'fixer'},
+            {'title': 'List assignee', 'description': 'desc', 'assigned_to': ['fixer']},
+            {'title': 'Dict assignee', 'description': 'desc', 'assigned_to': {'username': 'fixer'}},
+            {'title': 'Unknown assignee', 'description': 'desc', 'assigned_to': 'nobody'},
+            {'title': ['not', 'a', 'title'], 'description': 'desc'},
+            {'title': 'Bad status', 'description': 'desc', 'status': 'DONE'},
+        ]
+        stream = io.StringIO('\n'.join([*(json.dumps(line) for line in lines), '[1, 2]', '{oops']))
+        stats = self.run_import(ImportService.read_ndjson(stream), batch_size=4)
+
+        self.assertEqual((stats['rows'], stats['imported']), (8, 1))
+        errors = {error['line']: error['errors'] for error in stats['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(errors[2], {'assigned_to': 'Expected a username'})
+        self.assertEqual(errors[4], {'assigned_to': 'Unknown user nobody'})
+        self.assertIn('title', errors[5])
+        self.assertIn('status', errors[6])
+        self.assertEqual(list(Bug.objects.filter(project=self.target).values_list('title', 'assigned_to')),
+                         [('Good', self.assignee.pk)])
+
+
+@override_settings(
+    API_LOG_BUFFER={'ENABLED': False},
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    NOTIFICATION_OUTBOX={'REPLAY_LIMIT': 5},
+)
+class EventReplayTests(APITestCase):
+    """
+    project events are numbered in commit order, a reconnecting client gets what it missed
+    exactly once, or resync_required when the outbox no longer has it
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='listener', password='pwd')
+        cls.project = Project.objects.create(name='Replayed', owner=cls.user)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+
+    def enqueue(self, count) -> list:
+        rows = NotificationService.enqueue_project_events(self.project.pk, [
+            {'type': 'bug_notification', 'event_type': 'updated', 'bug_id': index, 'project_id': self.project.pk}
+            for index in range(count)
+        ])
+        return [row.seq for row in rows]
+
+    def test_events_are_numbered_in_order(self):
+        self.assertEqual(self.enqueue(2), [1, 2])
+        self.assertEqual(self.enqueue(1), [3])
+        self.assertIsNotNone(NotificationService.enqueue_project_event(self.project.pk, {'type': 'activity_log'}))
+
+        payloads, current_seq, resync = NotificationService.get_project_events_since(self.project.pk, 1)
+        self.assertEqual(([payload['seq'] for payload in payloads], current_seq, resync), ([2, 3, 4], 4, False))
+        self.assertEqual(NotificationService.get_project_events_since(self.project.pk, 4), ([], 4, False))
+
+    def test_events_of_a_deleted_project_are_dropped(self):
+        project_id = self.project.pk
+        self.enqueue(1)
+        self.project.delete()
+
+        self.assertEqual(NotificationService.enqueue_project_events(project_id, [{'type': 'activity_log'}]), [])
+        self.assertIsNone(NotificationService.enqueue_project_event(project_id, {'type': 'activity_log'}))
+        self.assertEqual(NotificationOutbox.objects.filter(group=project_group(project_id)).count(), 1)
+
+    def test_gaps_that_cannot_be_replayed_ask_for_resync(self):
+        self.enqueue(3)
+
+        # purged rows
+        NotificationOutbox.objects.filter(seq=2).delete()
+        self.assertEqual(NotificationService.get_project_events_since(self.project.pk, 1), ([], 3, True))
+        self.assertEqual(len(NotificationService.get_project_events_since(self.project.pk, 2)[0]), 1)
+
+        # more than REPLAY_LIMIT behind, or ahead of the stream
+        self.enqueue(5)
+        self.assertEqual(NotificationService.get_project_events_since(self.project.pk, 2), ([], 8, True))
+        self.assertEqual(NotificationService.get_project_events_since(self.project.pk, 9), ([], 8, True))
+
+    async def connect(self, last_seq=None) -> WebsocketCommunicator:
+        path = f'/ws/project/{self.project.pk}/'
+        if last_seq is not None:
+            path += f'?last_seq={last_seq}'
+        communicator = WebsocketCommunicator(BugTrackerConsumer.as_asgi(), path)
+        communicator.scope['user'] = self.user
+        communicator.scope['url_route'] = {'kwargs': {'project_id': self.project.pk}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def receive_seqs(self, communicator) -> list:
+        seqs = []
+        while not await communicator.receive_nothing(timeout=0.05):
+            seqs.append(json.loads(await communicator.receive_from())['seq'])
+        return seqs
+
+    async def test_replay_on_connect_skips_events_already_sent_live(self):
+        await database_sync_to_async(self.enqueue)(3)
+        communicator = await self.connect(last_seq=1)
+        self.assertEqual(await self.receive_seqs(communicator), [2, 3])
+
+        # a live batch overlapping the replay only delivers what the replay did not
+        await get_channel_layer().group_send(project_group(self.project.pk), {
+            'type': 'notification_batch',
+            'events': [
+                {'type': 'bug_notification', 'seq': seq, 'bug_id': 1, 'project_id': self.project.pk}
+                for seq in (2, 3, 4)
+            ],
+        })
+        self.assertEqual(await self.receive_seqs(communicator), [4])
+        await communicator.disconnect()
+
+    async def test_group_event_is_encoded_once_for_all_sockets(self):
+        first, second = await self.connect(), await self.connect()
+        await database_sync_to_async(self.enqueue)(1)
+        dispatcher = NotificationDispatcher(channel_layer=get_channel_layer())
+
+        with mock.patch.object(fast_json, 'dumps_str', wraps=fast_json.dumps_str) as dumps_str:
+            self.assertEqual(await database_sync_to_async(dispatcher.dispatch_once)(), 1)
+            frames = [await first.receive_from(), await second.receive_from()]
+
+        self.assertEqual(dumps_str.call_count, 1)
+        self.assertEqual(frames[0], frames[1])
+        self.assertEqual(json.loads(frames[0])['seq'], 1)
+        await first.disconnect()
+        await second.disconnect()
+
+    async def test_replay_request_after_purge_asks_for_resync(self):
+        await database_sync_to_async(self.enqueue)(3)
+        await database_sync_to_async(NotificationOutbox.objects.filter(seq=2).delete)()
+
+        communicator = await self.connect()
+        await communicator.send_json_to({'type': 'replay', 'last_seq': 1})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'resync_required', 'seq': 3})
+
+        await communicator.send_json_to({'type': 'replay', 'last_seq': 2})
+        self.assertEqual(await self.receive_seqs(communicator), [3])
+        await communicator.disconnect()
+
+
+class FakeRedis:
+    """
+    the few redis commands the response cache uses, kept in a dict shared by every client
+    """
+
+    def __init__(self, data=None):
+        self.data = {} if data is None else data
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        return []
+
+
+@override_settings(
+    API_LOG_BUFFER={'ENABLED': False},
+    RESPONSE_CACHE={'ENABLED': True, 'BACKEND': 'local', 'TTL': 60, 'MAX_ENTRIES': 100}
+)
+class ResponseCacheTests(APITestCase):
+    """
+    cached reads are served without queries until a write bumps one of their tags
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='cached', password='pwd')
+        cls.other = User.objects.create_user(username='other', password='pwd')
+        cls.project = Project.objects.create(name='Cached', owner=cls.user)
+        cls.bug = Bug.objects.create(title='Bug', description='desc', project=cls.project, created_by=cls.user)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def assertHit(self, url):
+        first, _ = self.get(url)
+        second, queries = self.get(url)
+        self.assertEqual(queries, 0)
+        self.assertEqual(second.content, first.content)
+        return second
+
+    def assertInvalidated(self, url, write):
+        before = self.assertHit(url)
+        write()
+        after, queries = self.get(url)
+        self.assertGreater(queries, 0)
+        self.assertNotEqual(after.content, before.content)
+
+    def test_bug_save_invalidates(self):
+        self.assertInvalidated(
+            reverse('bug-list'),
+            lambda: Bug.objects.create(title='New', description='desc', project=self.project, created_by=self.user)
+        )
+
+    def test_comment_save_invalidates(self):
+        self.assertInvalidated(
+            reverse('bug-comments-list', kwargs={'bug_pk': self.bug.pk}),
+            lambda: Comment.objects.create(bug=self.bug, commenter=self.user, message='hi')
+        )
+
+    def test_project_save_invalidates(self):
+        def rename():
+            self.project.name = 'Renamed'
+            self.project.save()
+        self.assertInvalidated(reverse('project-list'), rename)
+
+    def test_membership_invalidates(self):
+        shared = Project.objects.create(name='Shared', owner=self.other)
+        self.assertInvalidated(reverse('project-list'), lambda: shared.members.add(self.user))
+
+    def test_keys_are_per_user(self):
+        Project.objects.create(name='Elsewhere', owner=self.other)
+        mine = self.assertHit(reverse('project-list'))
+
+        self.client.force_authenticate(self.other)
+        theirs, _ = self.get(reverse('project-list'))
+        self.assertNotEqual(theirs.content, mine.content)
+
+    def test_redis_backend_shares_entries_and_ignores_foreign_payloads(self):
+        data = {}
+        with override_settings(RESPONSE_CACHE={
+            'ENABLED': True, 'BACKEND': 'redis', 'TTL': 60, 'REDIS_URL': 'redis://127.0.0.1:6379/1'
+        }):
+            get_response_cache().client = FakeRedis(data)
+            url = reverse('bug-list')
+            self.assertHit(url)
+
+            # a new worker reads what the first one stored
+            reset_response_cache('RESPONSE_CACHE')
+            get_response_cache().client = FakeRedis(data)
+            _, queries = self.get(url)
+            self.assertEqual(queries, 0)
+
+            # anything that is not an entry written by the cache is a miss, never unpickled
+            for key in [key for key in data if ':entry:' in key]:
+                data[key] = pickle.dumps({'tags': {}, 'status': 200})
+            _, queries = self.get(url)
+            self.assertGreater(queries, 0)
+
+
+class AsyncViewParityChecks:
+    """
+    the async read endpoints must answer like their sync counterparts, links aside
+    """
+
+    @classmethod
+    def create_fixtures(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pwd')
+        cls.member = User.objects.create_user(username='member', password='pwd')
+        cls.project = Project.objects.create(name='Async', owner=cls.owner)
+        cls.project.members.add(cls.member)
+        other = Project.objects.create(name='Other', owner=cls.owner)
+
+        for i in range(9):
+            bug = Bug.objects.create(
+                title=f'Bug {i}', description='desc', project=cls.project, created_by=cls.owner,
+                assigned_to=cls.member if i % 2 else None
+            )
+            ActivityLog.objects.create(user=cls.owner, project=cls.project, bug=bug, action='created', description=bug.title)
+        cls.hidden = ActivityLog.objects.create(user=cls.owner, project=other, action='created', description='hidden')
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.member)}'}
+
+    async def assertSameResponse(self, sync_path, async_path, status=200):
+        expected = await self.async_client.get(sync_path, headers=self.headers)
+        ProjectAccessService.clear()
+        actual = await self.async_client.get(async_path, headers=self.headers)
+
+        self.assertEqual(expected.status_code, status)
+        self.assertEqual(actual.status_code, status)
+        # pagination links point at the view that was called
+        sync_url, async_url = sync_path.partition('?')[0].encode(), async_path.partition('?')[0].encode()
+        self.assertEqual(actual.content, expected.content.replace(sync_url, async_url))
+
+    async def test_list_pages(self):
+        await self.assertSameResponse('/api/v1/activity/', '/api/v1/async/activity/')
+        await self.assertSameResponse('/api/v1/activity/?page=last&page_size=4', '/api/v1/async/activity/?page=last&page_size=4')
+        await self.assertSameResponse('/api/v1/activity/?page=9', '/api/v1/async/activity/?page=9', status=404)
+        await self.assertSameResponse('/api/bugs/?page_size=4', '/api/v1/async/bugs/?page_size=4')
+        await self.assertSameResponse('/api/bugs/?project=999', '/api/v1/async/bugs/?project=999', status=400)
+
+    async def test_detail_and_stats(self):
+        await self.assertSameResponse(f'/api/v1/activity/{self.hidden.pk}', f'/api/v1/async/activity/{self.hidden.pk}', status=401)
+        await self.assertSameResponse('/api/v1/dashboard-stats/', '/api/v1/async/dashboard-stats/')
+
+    async def test_unauthenticated(self):
+        self.headers = {}
+        await self.assertSameResponse('/api/bugs/', '/api/v1/async/bugs/', status=401)
+
+
+# the executor's threads hold their own connections and would not see the test transaction
+@override_settings(API_LOG_BUFFER={'ENABLED': False}, ASYNC_VIEWS={'CONCURRENT_QUERIES': False})
+class AsyncViewParityTests(AsyncViewParityChecks, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_fixtures()
+
+
+@override_settings(
+    API_LOG_BUFFER={'ENABLED': False},
+    ASYNC_VIEWS={'CONCURRENT_QUERIES': True, 'QUERY_THREADS': 4, 'CONNECTION_MAX_AGE': 300},
+)
+class ConcurrentAsyncViewParityTests(AsyncViewParityChecks, APITransactionTestCase):
+    """
+    the same checks with the queries gathered on the executor's threads, on committed rows
+    """
+
+    def setUp(self):
+        self.create_fixtures()
+        super().setUp()
+
+    def test_queries_run_on_the_executor(self):
+        results = async_to_sync(gather_queries)(
+            lambda: Bug.objects.count(), lambda: threading.current_thread().name, lambda: list(Project.objects.values_list('name', flat=True))
+        )
+        self.assertEqual(results[0], 9)
+        self.assertTrue(results[1].startswith('async-query'))
+        self.assertEqual(sorted(results[2]), ['Async', 'Other'])
+
+    def closes(self, max_age) -> int:
+        """
+        :return: connections the query threads closed over two gathers of two queries
+        """
+        config = {'CONCURRENT_QUERIES': True, 'QUERY_THREADS': 1, 'CONNECTION_MAX_AGE': max_age}
+        # sqlite ignores close() on an in-memory database, count the calls instead
+        with self.settings(ASYNC_VIEWS=config), mock.patch.object(type(connections['default']), 'close', autospec=True) as close:
+            for _ in range(2):
+                async_to_sync(gather_queries)(Bug.objects.exists, Bug.objects.exists)
+        return close.call_count
+
+    def test_query_threads_keep_their_connection(self):
+        self.assertEqual(self.closes(max_age=300), 0)
+        self.assertEqual(self.closes(max_age=0), 4)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TypingThrottleTests(SimpleTestCase):
+    """
+    typing frames: repeats dropped until the keepalive, changes in the debounce window coalesced,
+    token bucket cap, and idle bugs forgotten
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for target in ('tracker.consumers.time', 'bugtracker.utils.rate_limit.time'):
+            patcher = mock.patch(target, self.clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.forwarded = []
+
+    def throttle(self, rate=100.0, burst=100, debounce=0.02, keepalive=3.0) -> TypingThrottle:
+        async def forward(bug_id, is_typing):
+            self.forwarded.append((bug_id, is_typing))
+
+        return TypingThrottle(forward, rate=rate, burst=burst, debounce=debounce, keepalive=keepalive)
+
+    async def settle(self, throttle):
+        # trailing sends sleep on the real loop clock, the debounce is a few ms
+        await asyncio.gather(*throttle.timers.values())
+
+    async def test_repeats_are_dropped_until_the_keepalive(self):
+        throttle = self.throttle()
+        await throttle.offer(1, True)
+        self.clock.now += 1
+        await throttle.offer(1, True)
+        self.clock.now += 2.5
+        await throttle.offer(1, True)
+
+        self.assertEqual(self.forwarded, [(1, True), (1, True)])
+        self.assertEqual(throttle.counters['redundant'], 1)
+
+    async def test_changes_inside_the_debounce_window_are_coalesced(self):
+        throttle = self.throttle()
+        await throttle.offer(1, True)
+        await throttle.offer(1, False)
+        await throttle.offer(1, True)
+        await self.settle(throttle)
+
+        # the trailing send carries the last state, a repeat of what was forwarded
+        self.assertEqual(self.forwarded, [(1, True)])
+        self.assertEqual((throttle.counters['coalesced'], throttle.counters['redundant']), (1, 1))
+
+        await throttle.offer(2, True)
+        await throttle.offer(2, False)
+        await self.settle(throttle)
+        self.assertEqual(self.forwarded[1:], [(2, True), (2, False)])
+
+    async def test_token_bucket_never_blocks_clearing_an_indicator(self):
+        throttle = self.throttle(rate=1.0, burst=2)
+        for bug_id in (1, 2, 3):
+            await throttle.offer(bug_id, True)
+        self.assertEqual(self.forwarded, [(1, True), (2, True)])
+        self.assertEqual(throttle.counters['rate_limited'], 1)
+
+        self.clock.now += 0.1
+        await throttle.offer(1, False)
+        self.assertEqual(self.forwarded[-1], (1, False))
+
+        self.clock.now += 1
+        await throttle.offer(3, True)
+        self.assertEqual(self.forwarded[-1], (3, True))
+
+    async def test_idle_bugs_are_forgotten(self):
+        throttle = self.throttle()
+        for bug_id in range(1, 101):
+            await throttle.offer(bug_id, bug_id == 1)
+        self.assertEqual(len(throttle.last_sent), 100)
+
+        self.clock.now += 3.5
+        await throttle.offer(200, True)
+        # a start can still be refreshed by a keepalive repeat
+        self.assertEqual(list(throttle.last_sent), [1, 200])
+
+        self.clock.now += 3
+        await throttle.offer(200, True)
+        self.clock.now += 0.5
+        await throttle.offer(300, False)
+
+        # the abandoned indicator is cleared instead of being forgotten silently
+        self.assertEqual(list(throttle.last_sent), [200, 300])
+        self.assertEqual(self.forwarded[-3:], [(1, False), (200, True), (300, False)])
+        self.assertEqual(throttle.counters['expired'], 1)
+
+        await throttle.close()
+        self.assertEqual(self.forwarded[-1], (200, False))
+
+
+class LatencyHistogramTests(SimpleTestCase):
+    """
+    fixed buckets with prometheus `le` semantics, percentiles interpolated inside a bucket
+    """
+    BUCKETS = (0.1, 0.5, 1.0)
+
+    def test_bucketing(self):
+        histogram = LatencyHistogram(self.BUCKETS)
+        for seconds in (0.0, 0.1, 0.1001, 0.5, 0.75, 5.0):
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.counts, [2, 2, 1, 1])
+        self.assertEqual(histogram.cumulative_counts(), [2, 4, 5, 6])
+        self.assertEqual(histogram.count, 6)
+        self.assertAlmostEqual(histogram.sum, 6.4501)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram(self.BUCKETS)
+        self.assertEqual(histogram.percentile(0.5), 0.0)
+
+        for seconds in (0.05, 0.05, 0.3, 0.3):
+            histogram.observe(seconds)
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.1)
+        self.assertAlmostEqual(histogram.percentile(0.75), 0.3)
+        self.assertAlmostEqual(histogram.percentile(1.0), 0.5)
+
+        # a rank in the +Inf bucket reports the largest finite bound
+        histogram.observe(30.0)
+        self.assertEqual(histogram.percentile(1.0), 1.0)
+
+    def test_prometheus_text(self):
+        registry = LatencyRegistry(self.BUCKETS)
+        registry.observe('bug-list', 'GET', 200, 0.05)
+        registry.observe('bug-list', 'GET', 204, 0.3)
+        registry.observe('odd"route', 'POST', 503, 2.0)
+        lines = registry.render_prometheus().splitlines()
+
+        self.assertEqual(lines[:2], [
+            '# HELP http_request_duration_seconds Request latency by route, method and status class.',
+            '# TYPE http_request_duration_seconds histogram',
+        ])
+        labels = 'route="bug-list",method="GET",status="2xx"'
+        for line in (
+            f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1',
+            f'http_request_duration_seconds_bucket{{{labels},le="0.5"}} 2',
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2',
+            f'http_request_duration_seconds_sum{{{labels}}} 0.350000',
+            f'http_request_duration_seconds_count{{{labels}}} 2',
+            f'http_request_duration_seconds_quantile{{{labels},quantile="0.5"}} 0.100000',
+            'http_request_duration_seconds_count{route="odd\\"route",method="POST",status="5xx"} 1',
+        ):
+            self.assertIn(line, lines)
+        self.assertEqual(
+            render_prometheus_values('bugtracker_cache', 'Cache counters.', 'gauge', {'hits': 3}),
+            '# HELP bugtracker_cache Cache counters.\n# TYPE bugtracker_cache gauge\nbugtracker_cache{key="hits"} 3\n'
+        )
+
+
+@override_settings(API_LOG_BUFFER={'ENABLED': False})
+class MetricsApiTests(APITestCase):
+    """
+    requests are recorded by TimingMiddleware and exposed to staff only
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='metrics-user', password='pwd')
+        cls.staff = User.objects.create_user(username='metrics-staff', password='pwd', is_staff=True)
+
+    def setUp(self):
+        ProjectAccessService.clear()
+        request_latency.reset()
+        self.addCleanup(request_latency.reset)
+
+    def test_endpoints_are_staff_only(self):
+        for name in ('v1-metrics', 'v1-metrics-prometheus'):
+            self.client.force_authenticate(None)
+            self.assertEqual(self.client.get(reverse(name)).status_code, 401)
+            self.client.force_authenticate(self.user)
+            self.assertEqual(self.client.get(reverse(name)).status_code, 403)
+            self.client.force_authenticate(self.staff)
+            self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+    def test_requests_are_recorded(self):
+        self.client.force_authenticate(self.user)
+        self.client.get(reverse('bug-list'))
+        self.client.get(reverse('bug-list'))
+        self.client.get(reverse('bug-detail', args=[999999]))
+
+        self.client.force_authenticate(self.staff)
+        latency = {
+            (entry['route'], entry['method'], entry['status']): entry
+            for entry in self.client.get(reverse('v1-metrics')).data['latency']
+        }
+        self.assertEqual(latency[('bug-list', 'GET', '2xx')]['count'], 2)
+        self.assertEqual(latency[('bug-detail', 'GET', '4xx')]['count'], 1)
+        self.assertEqual(latency[('bug-list', 'GET', '2xx')]['buckets']['+Inf'], 2)
+
+        response = self.client.get(reverse('v1-metrics-prometheus'))
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{route="bug-list",method="GET",status="2xx"} 2', body)
+        self.assertIn('# TYPE bugtracker_dashboard_stats_cache gauge', body)
+
+
+class QueryInspectorTests(APITestCase):
+    """
+    repeated query shapes within a request are flagged, headers and the log line only when enabled
+    """
+    ENABLED = {'ENABLED': True, 'SAMPLE_RATE': 1.0, 'REPEAT_THRESHOLD': 3, 'HEADERS': True}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='inspected', password='pwd')
+        cls.bugs = [
+            Bug.objects.create(title=f'Bug {index}', description='desc', created_by=cls.user) for index in range(4)
+        ]
+
+    def n_plus_one(self, request):
+        # one query per bug instead of one for all of them
+        for bug in self.bugs:
+            Bug.objects.get(pk=bug.pk)
+        return HttpResponse('ok')
+
+    def call(self):
+        return QueryInspectorMiddleware(self.n_plus_one)(RequestFactory().get('/api/bugs/'))
+
+    def test_query_shape_ignores_literals(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM bug WHERE id = 12 AND title = 'it''s'  AND x IN (?, ?, ?)"),
+            'SELECT * FROM bug WHERE id = ? AND title = ? AND x IN (...)'
+        )
+        self.assertEqual(query_shape('SELECT 1 WHERE a = %s'), query_shape('SELECT 2 WHERE a = %s'))
+
+    def test_repeated_shapes_are_detected(self):
+        inspector = QueryInspector(repeat_threshold=3)
+        token = inspector.activate()
+        try:
+            self.n_plus_one(None)
+            list(Bug.objects.all())
+        finally:
+            QueryInspector.deactivate(token)
+
+        self.assertEqual(inspector.count, 5)
+        self.assertEqual(list(inspector.repeated().values()), [4])
+        self.assertIn('WHERE "tracker_bug"."id" = ?', next(iter(inspector.repeated())))
+
+    def test_headers_and_log_when_enabled(self):
+        with self.settings(QUERY_INSPECTOR=self.ENABLED), self.assertLogs('tracker.middleware', 'WARNING') as logs:
+            response = self.call()
+
+        self.assertEqual(response['X-DB-Query-Count'], '4')
+        self.assertEqual(response['X-DB-Repeated-Queries'], '1')
+        self.assertIn('X-DB-Time-Ms', response)
+        self.assertIn('Repeated queries on GET /api/bugs/: 4x SELECT', logs.output[0])
+
+    def test_headers_only_when_asked_for(self):
+        with self.settings(QUERY_INSPECTOR={**self.ENABLED, 'HEADERS': False}), self.assertLogs('tracker.middleware', 'WARNING'):
+            response = self.call()
+        self.assertNotIn('X-DB-Query-Count', response)
+
+    def test_nothing_when_disabled(self):
+        for config in ({**self.ENABLED, 'ENABLED': False}, {**self.ENABLED, 'SAMPLE_RATE': 0.0}):
+            with self.settings(QUERY_INSPECTOR=config), self.assertNoLogs('tracker.middleware', 'WARNING'):
+                response = self.call()
+            self.assertNotIn('X-DB-Query-Count', response)
+
+    def test_off_by_default(self):
+        with self.settings():
+            del settings.QUERY_INSPECTOR
+            with self.assertNoLogs('tracker.middleware', 'WARNING'):
+                response = self.call()
+        self.assertNotIn('X-DB-Query-Count', response)
+
+        # the shipped setting, unless the environment turns it on
+        if 'QUERY_INSPECTOR_ENABLED' not in os.environ:
+            self.assertFalse(settings.QUERY_INSPECTOR['ENABLED'])
+
+
+class ApiLogWriterTests(TestCase):
+    """
+    buffered api log writer: overflow policies, flush triggers, atexit flush and counters
+    """
+    def make_writer(self, **kwargs):
+        writer = ApiLogWriter(**kwargs)
+        # flushes are driven by the test, the background thread stays off
+        patcher = mock.patch.object(writer, '_ensure_worker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return writer
+
+    def make_record(self, name):
+        return ApiLog(api_name=name, level=ApiLog.LevelChoice.INFO, message=name, details='')
+
+    def pending_names(self, writer):
+        return [record.api_name for record in writer._queue.queue]
+
+    def test_drop_oldest_evicts_the_head_of_the_buffer(self):
+        writer = self.make_writer(max_size=2, overflow_policy=ApiLogWriter.DROP_OLDEST)
+
+        results = [writer.submit(self.make_record(name)) for name in ('first', 'second', 'third')]
+
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(self.pending_names(writer), ['second', 'third'])
+        self.assertEqual(writer.stats()['dropped'], 1)
+
+    def test_drop_newest_rejects_the_incoming_record(self):
+        writer = self.make_writer(max_size=2, overflow_policy=ApiLogWriter.DROP_NEWEST)
+
+        results = [writer.submit(self.make_record(name)) for name in ('first', 'second', 'third')]
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(self.pending_names(writer), ['first', 'second'])
+        self.assertEqual(writer.stats()['dropped'], 1)
+
+    def test_unknown_overflow_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ApiLogWriter(overflow_policy='drop_everything')
+
+    def test_full_batch_wakes_the_worker(self):
+        writer = self.make_writer(batch_size=3)
+
+        writer.submit(self.make_record('one'))
+        writer.submit(self.make_record('two'))
+        self.assertFalse(writer._wakeup.is_set())
+
+        writer.submit(self.make_record('three'))
+        self.assertTrue(writer._wakeup.is_set())
+
+    def test_flush_writes_in_batches(self):
+        writer = self.make_writer(batch_size=2)
+        for i in range(5):
+            writer.submit(self.make_record(f'api-{i}'))
+
+        with mock.patch.object(ApiLog.objects, 'bulk_create', wraps=ApiLog.objects.bulk_create) as bulk_create:
+            self.assertEqual(writer.flush(), 5)
+
+        self.assertEqual([len(c.args[0]) for c in bulk_create.call_args_list], [2, 2, 1])
+        self.assertEqual(ApiLog.objects.count(), 5)
+
+    def test_worker_flushes_on_interval_below_batch_size(self):
+        writer = ApiLogWriter(batch_size=100, flush_interval=0.01)
+        flushed = threading.Event()
+
+        with mock.patch.object(writer, 'flush', side_effect=lambda: flushed.set() or 0):
+            writer.submit(self.make_record('lonely'))
+            self.assertTrue(flushed.wait(2))
+            writer.shutdown(timeout=2)
+
+        self.assertFalse(writer._worker.is_alive())
+        self.assertEqual(writer.stats()['pending'], 1)
+
+    def test_process_writer_flushes_at_exit(self):
+        with override_settings(API_LOG_BUFFER={'ENABLED': True, 'BATCH_SIZE': 50}), \
+                mock.patch.object(apilog_writer, '_writer', None), \
+                mock.patch.object(apilog_writer.atexit, 'register') as register:
+            writer = apilog_writer.get_writer()
+            self.assertIs(apilog_writer.get_writer(), writer)
+
+            register.assert_called_once_with(writer.shutdown)
+            self.assertEqual(writer.batch_size, 50)
+
+            with mock.patch.object(writer, '_ensure_worker'):
+                writer.submit(self.make_record('at-exit'))
+
+            exit_hook = register.call_args.args[0]
+            exit_hook()
+
+        self.assertTrue(ApiLog.objects.filter(api_name='at-exit').exists())
+        self.assertEqual(writer.stats()['pending'], 0)
+
+    def test_stats_counters(self):
+        writer = self.make_writer(max_size=3, batch_size=10, overflow_policy=ApiLogWriter.DROP_NEWEST)
+        for i in range(4):
+            writer.submit(self.make_record(f'api-{i}'))
+
+        self.assertEqual(writer.stats(), {'enqueued': 3, 'flushed': 0, 'dropped': 1, 'failed': 0, 'pending': 3})
+
+        with mock.patch.object(ApiLog.objects, 'bulk_create', side_effect=RuntimeError('db down')):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.stats(), {'enqueued': 3, 'flushed': 0, 'dropped': 1, 'failed': 3, 'pending': 0})
+
+        writer.submit(self.make_record('after'))
+        writer.flush()
+        self.assertEqual(writer.stats(), {'enqueued': 4, 'flushed': 1, 'dropped': 1, 'failed': 3, 'pending': 0})
+
+    def test_buffered_log_keeps_the_time_it_was_logged(self):
+        writer = self.make_writer()
+        logged_at = timezone.now() - timedelta(minutes=5)
+
+        with override_settings(API_LOG_BUFFER={'ENABLED': True}), \
+                mock.patch.object(apilog_writer, 'get_writer', return_value=writer):
+            with mock.patch('bugtracker.utils.apilogger.timezone.now', return_value=logged_at):
+                apilogger.info('buffered_api', 'queued')
+            apilogger.flush()
+
+        self.assertEqual(ApiLog.objects.get(api_name='buffered_api').created_at, logged_at)
+
+
+@override_settings(FAST_JSON={'BACKEND': 'orjson'})
+class FastJSONTests(SimpleTestCase):
+    """
+    orjson renderer and parser must be drop-in replacements for DRF's json ones
+    """
+    def setUp(self):
+        if fast_json.orjson is None:
+            self.skipTest('needs orjson')
+
+    def payload(self):
+        return {
+            'created_at': datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'local_at': datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=dt_timezone(timedelta(hours=5, minutes=30))),
+            'naive_at': datetime(2026, 3, 1, 9, 30),
+            'due_date': date(2026, 3, 2),
+            'reminder': time(8, 15, 30, 250000),
+            'estimate': Decimal('12.50'),
+            'ratios': [Decimal('0.1'), Decimal('-3')],
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'status': gettext_lazy('Open'),
+            'title': 'naïve   line   break',
+            'nested': {1: [None, True, 3, 'x']},
+        }
+
+    def test_renderer_matches_stock_renderer(self):
+        data = self.payload()
+        self.assertTrue(fast_json.use_orjson())
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_uses_stock_renderer(self):
+        data = self.payload()
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(data, renderer_context=context),
+            JSONRenderer().render(data, renderer_context=context),
+        )
+
+    def test_parser_matches_stock_parser(self):
+        body = JSONRenderer().render(self.payload())
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_parse_errors_match_stock_parser(self):
+        for parser in (FastJSONParser(), JSONParser()):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(b'{"title": '))
+
+    def test_json_backend_gives_the_same_text(self):
+        data = self.payload()
+        fast = fast_json.dumps(data)
+        with self.settings(FAST_JSON={'BACKEND': 'json'}):
+            self.assertFalse(fast_json.use_orjson())
+            self.assertEqual(fast_json.dumps(data), fast)
+
+
+class HashRingTests(SimpleTestCase):
+    """
+    project groups keep their shard when hosts are reordered and mostly when one is added
+    """
+    groups = [f'project_{i}' for i in range(5000)]
+    hosts = [f'redis://10.0.0.{i}:6379' for i in range(5)]
+
+    def placement(self, hosts):
+        ring = HashRing(hosts)
+        return [hosts[ring.get_node(group)] for group in self.groups]
+
+    def test_host_order_does_not_matter(self):
+        self.assertEqual(self.placement(self.hosts[:4]), self.placement(self.hosts[:4][::-1]))
+
+    def test_adding_a_host_moves_its_share(self):
+        before, after = self.placement(self.hosts[:4]), self.placement(self.hosts)
+        moved = [new for old, new in zip(before, after) if old != new]
+
+        self.assertEqual(set(moved), {self.hosts[4]})
+        self.assertLess(len(moved) / len(self.groups), 0.3)
@@ -3,9 +3,15 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 
 from tracker import views
-from tracker.api.project_api import ProjectViewSet
+from tracker.api.project_api import ProjectMemberViewSet, ProjectViewSet
 from tracker.views import DashboardStatsAPIView
 from tracker.api.activity_api import ActivityLogListApiView, ActivityLogDetailApiView
+from tracker.api.async_api import (
+    AsyncActivityLogDetailApiView, AsyncActivityLogListApiView, AsyncBugListApiView, AsyncDashboardStatsApiView
+)
+from tracker.api.metrics_api import MetricsApiView, PrometheusMetricsApiView
+from tracker.api.sync_api import ChangesApiView
+from tracker.api.export_api import ProjectExportApiView
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet, basename='project')
@@ -14,10 +20,23 @@ router.register(r'bugs', views.BugViewSet, basename='bug')
 bugs_router = routers.NestedDefaultRouter(router, r'bugs', lookup='bug')
 bugs_router.register(r'comments', views.CommentViewSet, basename='bug-comments')
 
+projects_router = routers.NestedDefaultRouter(router, r'projects', lookup='project')
+projects_router.register(r'members', ProjectMemberViewSet, basename='project-members')
+
 urlpatterns = [
     path('', include(router.urls)),
     path('', include(bugs_router.urls)),
+    path('', include(projects_router.urls)),
     path('v1/activity/', ActivityLogListApiView.as_view(), name=ActivityLogListApiView.api_name),
     path('v1/activity/<int:pk>', ActivityLogDetailApiView.as_view(), name=ActivityLogDetailApiView.api_name),
-    path('v1/dashboard-stats/', DashboardStatsAPIView.as_view(), name=DashboardStatsAPIView.api_name)
+    path('v1/dashboard-stats/', DashboardStatsAPIView.as_view(), name=DashboardStatsAPIView.api_name),
+    path('v1/changes/', ChangesApiView.as_view(), name=ChangesApiView.api_name),
+    path('v1/projects/<int:project_id>/export/', ProjectExportApiView.as_view(), name=ProjectExportApiView.api_name),
+    # the same reads served on the event loop
+    path('v1/async/dashboard-stats/', AsyncDashboardStatsApiView.as_view(), name=AsyncDashboardStatsApiView.api_name),
+    path('v1/async/activity/', AsyncActivityLogListApiView.as_view(), name=AsyncActivityLogListApiView.api_name),
+    path('v1/async/activity/<int:pk>', AsyncActivityLogDetailApiView.as_view(), name=AsyncActivityLogDetailApiView.api_name),
+    path('v1/async/bugs/', AsyncBugListApiView.as_view(), name=AsyncBugListApiView.api_name),
+    path('v1/metrics/', MetricsApiView.as_view(), name=MetricsApiView.api_name),
+    path('v1/metrics/prometheus/', PrometheusMetricsApiView.as_view(), name=PrometheusMetricsApiView.api_name)
 ]
\ No newline at end of file
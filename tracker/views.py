@@ -1,37 +1,46 @@
 from datetime import datetime
 
-from django.db.models import QuerySet
-from django.utils import timezone
-from rest_framework import generics, status, filters, viewsets
-from rest_framework.decorators import api_view, permission_classes, action
-from rest_framework.exceptions import PermissionDenied, NotFound
-from django.core.exceptions import PermissionDenied
+from django.db.models import QuerySet, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import status, filters, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db import models
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.db import transaction
 from rest_framework.views import APIView
 
 
-from tracker.models import Project, Bug, Comment, ActivityLog
-from tracker.serializers import BugSerializer, CommentSerializer
+from tracker.models import Bug, Comment, ActivityLog
+from tracker.serializers import BugSerializer, BugBulkSerializer, BugValuesSerializer, CommentSerializer
+from tracker.filters import IndexedSearchFilter
 from bugtracker.utils.logger import get_logger
 from tracker.services.summary_service import SummaryService
+from tracker.services.access_service import ProjectAccessService
+from tracker.services.bug_bulk_service import BugBulkService
+from tracker.services.notification_service import NotificationService
+from tracker.services.response_cache_service import ProjectCachedResponseMixin
 from bugtracker.utils import apilogger
+from bugtracker.utils.conditional import ConditionalGetMixin, claim_version, get_expected_version
+from bugtracker.utils.sparse_fields import SparseFieldsViewMixin
+from bugtracker.utils.values_serializer import ValuesListMixin
+from tracker.exceptions.bug_exceptions import BugConflictError
 
 logger = get_logger(__name__)
 
 
-class BugViewSet(viewsets.ModelViewSet):
+class BugViewSet(ProjectCachedResponseMixin, ConditionalGetMixin, SparseFieldsViewMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling Bug CRUD op with filtering and real-time updates
     """
+    conditional_related = ('project', )
     serializer_class = BugSerializer
+    values_serializer_class = BugValuesSerializer
+    values_actions = ('list', 'assigned_to_me', 'my_created')
     permission_classes = (IsAuthenticated, )
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter, IndexedSearchFilter)
     filterset_fields = ['status', 'project', 'priority', 'assigned_to']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'updated_at', 'priority']
@@ -42,10 +51,26 @@ class BugViewSet(viewsets.ModelViewSet):
         only return bugs from projects user has aceess to
         :return: QuerySet
         """
-        user_projects = Project.objects.filter(
-            models.Q(owner=self.request.user) | models.Q(members=self.request.user)
-        ).distinct()
-        return Bug.objects.filter(project__in=user_projects)
+        project_ids = ProjectAccessService.get_accessible_project_ids(self.request.user)
+        sparse = self.get_sparse_fieldset()
+
+        queryset = Bug.objects.filter(
+            project_id__in=project_ids
+        ).defer('search_vector')
+
+        # joins and the comment count only for what the response renders
+        if sparse.includes('project_name'):
+            queryset = queryset.select_related('project').defer('project__search_vector')
+        related = [name for name in ('created_by', 'assigned_to') if sparse.expands(name)]
+        if related:
+            queryset = queryset.select_related(*related)
+
+        if sparse.includes('comment_count'):
+            comment_count = Comment.objects.filter(
+                bug=OuterRef('pk')
+            ).order_by().values('bug').annotate(total=Count('pk')).values('total')
+            queryset = queryset.annotate(comment_count=Coalesce(Subquery(comment_count), 0))
+        return queryset
 
     def perform_create(self, serializer):
         """
@@ -53,16 +78,17 @@ class BugViewSet(viewsets.ModelViewSet):
         :param serializer:
         :return:
         """
-        bug = serializer.save(created_by=self.request.user)
-        ActivityLog.objects.create(
-            user=self.request.user,
-            project=bug.project,
-            bug=bug,
-            action='created',
-            description=f'Created bug: {bug.title}'
-        )
+        with transaction.atomic():
+            bug = serializer.save(created_by=self.request.user)
+            ActivityLog.objects.create(
+                user=self.request.user,
+                project=bug.project,
+                bug=bug,
+                action='created',
+                description=f'Created bug: {bug.title}'
+            )
 
-        self.send_bug_notification(bug, 'bug_created')
+            self.send_bug_notification(bug, 'bug_created')
 
     def perform_update(self, serializer):
         """
@@ -70,41 +96,48 @@ class BugViewSet(viewsets.ModelViewSet):
         :param serializer:
         :return:
         """
-        old_bug = self.get_object()
-        old_status = old_bug.status
-        old_assigned = old_bug.assigned_to
-
-        bug = serializer.save()
-
-        if old_status != bug.status:
-            ActivityLog.objects.create(
-                user=self.request.user,
-                project=bug.project,
-                bug=bug,
-                action='status_changed',
-                description=f'Changed status from {old_status} to {bug.status}'
-            )
+        bug = serializer.instance
+        old_status = bug.status
+        old_assigned = bug.assigned_to_id
+        expected_version = get_expected_version(self.request)
+
+        with transaction.atomic():
+            if not claim_version(bug, expected_version):
+                raise BugConflictError(
+                    message=f'Bug-{bug.pk} was modified by someone else',
+                    details=f'Expected version {expected_version or bug.version}, reload and retry'
+                )
+            bug = serializer.save()
+
+            if old_status != bug.status:
+                ActivityLog.objects.create(
+                    user=self.request.user,
+                    project=bug.project,
+                    bug=bug,
+                    action='status_changed',
+                    description=f'Changed status from {old_status} to {bug.status}'
+                )
 
-        if old_assigned != bug.assigned_to:
-            assigned_name = bug.assigned_to.username if bug.assigned_to else 'Unassigned'
-            ActivityLog.objects.create(
-                user=self.request.user,
-                project=bug.project,
-                bug=bug,
-                action='assigned',
-                description=f'Assigned bug to {assigned_name}'
-            )
+            if old_assigned != bug.assigned_to_id:
+                assigned_name = bug.assigned_to.username if bug.assigned_to else 'Unassigned'
+                ActivityLog.objects.create(
+                    user=self.request.user,
+                    project=bug.project,
+                    bug=bug,
+                    action='assigned',
+                    description=f'Assigned bug to {assigned_name}'
+                )
 
-        if old_status == bug.status and old_assigned == bug.assigned_to:
-            ActivityLog.objects.create(
-                user=self.request.user,
-                project=bug.project,
-                bug=bug,
-                action='updated',
-                description=f'Updated bug: {bug.title}'
-            )
+            if old_status == bug.status and old_assigned == bug.assigned_to_id:
+                ActivityLog.objects.create(
+                    user=self.request.user,
+                    project=bug.project,
+                    bug=bug,
+                    action='updated',
+                    description=f'Updated bug: {bug.title}'
+                )
 
-        self.send_bug_notification(bug, 'bug_updated')
+            self.send_bug_notification(bug, 'bug_updated')
 
     @action(detail=False, methods=['get'])
     def assigned_to_me(self, request):
@@ -129,60 +162,98 @@ class BugViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
-    def close(self, request):
+    def close(self, request, pk=None):
         """
         quick close bug action
         :param request:
         :return:
         """
         bug = self.get_object()
-        bug.status = Bug.StatusChoice.COMPLETE
-        bug.save()
-
-        ActivityLog.objects.create(
-            user=request.user,
-            project=bug.project,
-            bug=bug,
-            action='status changed',
-            description=f'Closed bug: {bug.title}'
-        )
+        expected_version = get_expected_version(request)
+
+        with transaction.atomic():
+            if not claim_version(bug, expected_version):
+                raise BugConflictError(
+                    message=f'Bug-{bug.pk} was modified by someone else',
+                    details=f'Expected version {expected_version or bug.version}, reload and retry'
+                )
+            bug.status = Bug.StatusChoice.COMPLETE
+            bug.save(update_fields=['status', 'updated_at'])
+
+            ActivityLog.objects.create(
+                user=request.user,
+                project=bug.project,
+                bug=bug,
+                action='status changed',
+                description=f'Closed bug: {bug.title}'
+            )
 
-        self.send_bug_notification(bug, 'bug_closed')
+            self.send_bug_notification(bug, 'bug_closed')
         return Response(
             data={'message': 'Bug closed successfully'},
             status=status.HTTP_200_OK
         )
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        create, update or close many bugs in one transaction, with one notification per project.
+        create: {"action": "create", "bugs": [{...}, ...]}
+        update: {"action": "update", "ids": [...], "status"/"priority"/"assigned_to": ...}
+        close: {"action": "close", "ids": [...]}
+        :param request:
+        :return:
+        """
+        serializer = BugBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if data['action'] == 'create':
+            bugs = BugBulkService.create_bugs(request.user, data['bugs'])
+            return Response(
+                data=self.get_serializer(bugs, many=True).data,
+                status=status.HTTP_201_CREATED
+            )
+
+        if data['action'] == 'close':
+            bug_ids = BugBulkService.close_bugs(request.user, data['ids'])
+        else:
+            bug_ids = BugBulkService.update_bugs(request.user, data['ids'], data['changes'])
+
+        return Response(
+            data={'message': f'{len(bug_ids)} bug(s) {data["action"]}d', 'ids': bug_ids},
+            status=status.HTTP_200_OK
+        )
 
     def send_bug_notification(self, bug, event_type):
         """
-        send websocket notification for bug change
+        queue websocket notification for bug change, sent once the transaction commits
         :param bug:
         :param event_type:
         :return:
         """
-        try:
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f'project_{bug.project.id}',
-                {
-                    'type': 'bug_notification',
-                    'event_type': event_type,
-                    'bug_id': bug.id,
-                    'bug_title': bug.title,
-                    'bug_status': bug.status,
-                    'project_id': bug.project.id,
-                    'user': self.request.user.username,
-                    'assigned_to': bug.assigned_to.username if bug.assigned_to else None
-                }
-            )
-        except Exception as e:
-            print(f'Websocket notification failed: {e}')
+        if bug.project_id is None:
+            return
+
+        NotificationService.enqueue_project_event(
+            bug.project_id,
+            {
+                'type': 'bug_notification',
+                'event_type': event_type,
+                'bug_id': bug.id,
+                'bug_title': bug.title,
+                'bug_status': bug.status,
+                'project_id': bug.project_id,
+                'user': self.request.user.username,
+                'assigned_to': bug.assigned_to.username if bug.assigned_to else None
+            }
+        )
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ProjectCachedResponseMixin, ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """
     viewset for handling Comment CRUD operations with real-time updates
     """
+    conditional_related = ('bug', )
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticated, )
     filter_backends = (filters.OrderingFilter, )
@@ -195,14 +266,16 @@ class CommentViewSet(viewsets.ModelViewSet):
         """
         bug_id = self.kwargs.get('bug_pk')
         if bug_id:
-            user_projects = Project.objects.filter(
-                models.Q(owner=self.request.user) |
-                models.Q(members=self.request.user)
-            ).distinct()
+            sparse = self.get_sparse_fieldset()
+            related = [
+                relation for relation, needed in (
+                    ('bug', sparse.includes('bug_title')), ('commenter', sparse.expands('commenter'))
+                ) if needed
+            ]
             return Comment.objects.filter(
                 bug_id=bug_id,
-                bug__project__in=user_projects
-            )
+                bug__project_id__in=ProjectAccessService.get_accessible_project_ids(self.request.user)
+            ).select_related(*related)
         return Comment.objects.none()
 
     def perform_create(self, serializer):
@@ -214,56 +287,49 @@ class CommentViewSet(viewsets.ModelViewSet):
         bug_id = self.kwargs.get('bug_pk')
         bug = get_object_or_404(Bug, id=bug_id)
 
-        user_project = Project.objects.filter(
-            models.Q(owner=self.request.user) |
-            models.Q(members=self.request.user)
-        ).distinct()
-
-        if bug.project not in user_project:
+        if not ProjectAccessService.has_access(self.request.user, bug.project_id):
             raise PermissionDenied('You dont have permission to comment on this bug')
 
-        comment = serializer.save(
-            bug=bug,
-            commenter=self.request.user
-        )
+        with transaction.atomic():
+            comment = serializer.save(
+                bug=bug,
+                commenter=self.request.user
+            )
 
-        ActivityLog.objects.create(
-            user=self.request.user,
-            project=bug.project,
-            bug=bug,
-            action='commented',
-            description=f'Added comment: {comment.message[:50]}...'
-        )
+            ActivityLog.objects.create(
+                user=self.request.user,
+                project=bug.project,
+                bug=bug,
+                action='commented',
+                description=f'Added comment: {comment.message[:50]}...'
+            )
 
-        self.send_comment_notification(comment)
-        # Response?
+            self.send_comment_notification(comment)
 
     def send_comment_notification(self, comment):
         """
-        send websocket notification for new comments
+        queue websocket notification for new comments, sent once the transaction commits
         :param comment:
         :return:
         """
-        try:
-            channel_layer = get_channel_layer()
-            if channel_layer is not None:
-                async_to_sync(channel_layer.group_send)(
-                    f'Project_{comment.bug.project.id}',
-                    {
-                        'type': 'comment_notification',
-                        'comment_id': comment.id,
-                        'bug_id': comment.bug.id,
-                        'bug_title': comment.bug.title,
-                        'commenter': comment.commenter.username,
-                        'message': comment.message,
-                        'project_id': comment.bug.project.id,
-                        'created_at': comment.created_at.isoformat()
-                    }
-                )
-        except Exception as e:
-            print(f"WebSocket notification failed: {e}")
+        if comment.bug.project_id is None:
+            return
+
+        NotificationService.enqueue_project_event(
+            comment.bug.project_id,
+            {
+                'type': 'comment_notification',
+                'comment_id': comment.id,
+                'bug_id': comment.bug.id,
+                'bug_title': comment.bug.title,
+                'commenter': comment.commenter.username,
+                'message': comment.message,
+                'project_id': comment.bug.project_id,
+                'created_at': comment.created_at.isoformat()
+            }
+        )
 
-class DashboardStatsAPIView(APIView):
+class DashboardStatsAPIView(ProjectCachedResponseMixin, APIView):
     api_name = 'v1-dashboard-stats'
     permission_classes = (IsAuthenticated, )
 